@@ -3,10 +3,9 @@ from interactive_pipe.graphical.qt_gui import InteractivePipeQT
 from interactive_pipe.graphical.mpl_gui import InteractivePipeMatplotlib
 from interactive_pipe.graphical.nb_gui import InteractivePipeJupyter
 from interactive_pipe import interactive
-from interactive_pipe.data_objects.image import Image
+from interactive_pipe.data_objects.image_sequence import ImageSequence
 from pathlib import Path
 import torch
-from typing import List
 import numpy as np
 
 # Utilities functions - not anything to do with interactive pipe
@@ -28,11 +27,12 @@ def get_paths(img_folder: Path = Path(__file__).parent/"images"):
 
 # Interactive Filters = small legos!
 # --------------------------------------------------------------------------------------------
-def img_selector(img_list: List[Path], index: int = 0, global_params={}) -> np.ndarray:
+def img_selector(img_list: ImageSequence, index: int = 0, global_params={}) -> np.ndarray:
     """Select an image from the list - sets image title"""
-    img = Image.load_image(str(img_list[index]))
+    # Decoded on first access only, neighbours are prefetched in the background
+    img = img_list[index]
     # Please note the "image" key to set the title
-    title = f"Image {index:d}/{len(img_list)} {img_list[index].stem}"
+    title = f"Image {index:d}/{len(img_list)} {img_list.names[index]}"
     global_params["__output_styles"]["image"] = {"title": title}
     return img
 
@@ -65,7 +65,7 @@ def threshold(img: np.ndarray, threshold: float = 0.5, global_params={}) -> np.n
 
 # Interactive Pipeline = Plug all legos together
 # --------------------------------------------------------------------------------------------
-def image_pipeline(img_list: List[Path]):
+def image_pipeline(img_list: ImageSequence):
     image = img_selector(img_list)
     processed_image = blur_image(image)
     thresholded_image = threshold(processed_image)
@@ -77,7 +77,7 @@ def image_pipeline(img_list: List[Path]):
 # --------------------------------------------------------------------------------------------
 
 
-def main_demo(img_list: List[Path], backend="qt"):
+def main_demo(img_list: ImageSequence, backend="qt"):
     # Decorate image selector - similar to @interactive
     interactive(
         index=(0, [0, len(img_list)-1])  # from 0 to the number of images
@@ -98,5 +98,5 @@ def main_demo(img_list: List[Path], backend="qt"):
 
 
 if __name__ == "__main__":
-    img_list = get_paths()
+    img_list = ImageSequence(get_paths())
     main_demo(img_list)
@@ -1,6 +1,21 @@
 import logging
 from copy import deepcopy
 from typing import Any
+import numpy as np
+
+
+def safe_copy(buffer: Any) -> Any:
+    """Deepcopy a buffer, read-only arrays (like memory mapped files) are shared instead of copied.
+    Filters can't modify read-only arrays in place, copying them is not needed
+    and would load memory mapped data entirely in RAM.
+    """
+    if isinstance(buffer, np.ndarray) and not buffer.flags.writeable:
+        return buffer
+    if type(buffer) in (list, tuple):
+        return type(buffer)(safe_copy(elt) for elt in buffer)
+    if type(buffer) is dict:
+        return {key: safe_copy(val) for key, val in buffer.items()}
+    return deepcopy(buffer)
 
 
 class CachedResults:
@@ -66,7 +81,7 @@ class CachedResults:
         """
         if self.name is not None:
             logging.debug(f"OVERRIDE CACHE RESULTS - {self.name}")
-        self.result = new_result if not self.safe_buffer_deepcopy else deepcopy(
+        self.result = new_result if not self.safe_buffer_deepcopy else safe_copy(
             new_result)
 
     def __repr__(self) -> str:
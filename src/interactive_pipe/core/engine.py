@@ -1,10 +1,13 @@
 import logging
+import queue
 import sys
+import threading
 import time
 import traceback
-from copy import deepcopy
-from typing import List
-from interactive_pipe.core.cache import CachedResults
+from copy import copy
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from interactive_pipe.core.cache import CachedResults, safe_copy
 from interactive_pipe.core.filter import FilterCore
 
 
@@ -12,16 +15,53 @@ class PipelineEngine:
     def __init__(self, cache=False, safe_input_buffer_deepcopy=True) -> None:
         self.cache = cache
         self.safe_input_buffer_deepcopy = safe_input_buffer_deepcopy
+        # Version of each buffer, incremented each time it is recomputed (or provided as a new input)
+        self.buffer_versions: Dict[Any, int] = {}
+        # Names of the buffers which have been computed (or provided as new inputs) by the last run
+        self.updated_buffers = None
+        # Instrumentation of the last run: time spent in each filter (seconds), filters served from cache
+        self.filter_timings: Dict[str, float] = {}
+        self.cached_filters = set()
+        self._last_inputs = {}
 
-    def run(self, filters: List[FilterCore], imglst=None):
-        performances = []
-        logging.debug(100 * "-")
+    def __getstate__(self) -> dict:
+        # Previous inputs are only used to track changes, no need to copy or pickle them
+        state = self.__dict__.copy()
+        state["_last_inputs"] = {}
+        state["_updated_buffers"] = None
+        state["buffer_versions"] = {}
+        return state
+
+    @property
+    def updated_buffers(self) -> Optional[set]:
+        return self._updated_buffers
+
+    @updated_buffers.setter
+    def updated_buffers(self, updated_buffers: Optional[set]) -> None:
+        self._updated_buffers = updated_buffers
+        for name in (updated_buffers or []):
+            self.buffer_versions[name] = self.buffer_versions.get(name, 0) + 1
+
+    def changed_inputs(self, imglst=None) -> set:
+        """Names of the inputs which are not the same objects as during the previous run"""
+        if imglst is None:
+            current_inputs = {}
+        elif isinstance(imglst, list):
+            current_inputs = dict(enumerate(imglst))
+        else:
+            current_inputs = dict(imglst)
+        changed = set(key for key, val in current_inputs.items()
+                      if self._last_inputs.get(key, None) is not val)
+        self._last_inputs = current_inputs
+        return changed
+
+    def initialize_buffers(self, imglst=None) -> dict:
         result = {}
         if imglst is not None:
             if isinstance(imglst, list):
                 for input_index, inp in enumerate(imglst):
                     if self.safe_input_buffer_deepcopy:
-                        result[input_index] = deepcopy(inp)
+                        result[input_index] = safe_copy(inp)
                         logging.debug(
                             f"<<< Deepcopy input images {input_index}")
                     else:
@@ -29,9 +69,30 @@ class PipelineEngine:
             elif isinstance(imglst, dict):
                 if self.safe_input_buffer_deepcopy:
                     logging.debug(f"<<< Deepcopy input images")
-                    result = deepcopy(imglst)
+                    result = safe_copy(imglst)
                 else:
-                    result = imglst
+                    # shallow copy, outputs shall not be written to the inputs dictionary
+                    result = dict(imglst)
+        return result
+
+    @staticmethod
+    def dispatch_outputs(prc: FilterCore, out, result: dict) -> None:
+        # put prc output at the right position within result vector
+        if prc.outputs is not None:
+            for i, ido in enumerate(prc.outputs):
+                if isinstance(out, list) or isinstance(out, tuple):
+                    result[ido] = out[i]
+                # Simpler manner of defining a process fuction (do not return a list)
+                else:
+                    result[ido] = out
+
+    def run(self, filters: List[FilterCore], imglst=None):
+        performances = []
+        logging.debug(100 * "-")
+        updated_buffers = self.changed_inputs(imglst)
+        result = self.initialize_buffers(imglst)
+        filter_timings = {}
+        cached_filters = set()
 
         skip_calculation = True
         previous_calculation = False
@@ -50,6 +111,7 @@ class PipelineEngine:
                     f"-->  Load cached outputs from filter {idx}: {prc.name}")
                 out = prc.cache_mem.result
                 previous_calculation = False
+                cached_filters.add(prc.name)
             else:
                 logging.debug(
                     ("... " if previous_calculation else "!!! ") + f"Calculating {prc.name}")
@@ -72,18 +134,211 @@ class PipelineEngine:
                 if self.cache and prc.cache_mem is not None:  # cache result if cache available
                     logging.debug(f"<-- Storing result from {prc.name}")
                     prc.cache_mem.update(out)
-            # put prc output at the right position within result vector
-            if prc.outputs is not None:
-                for i, ido in enumerate(prc.outputs):
-                    if isinstance(out, list) or isinstance(out, tuple):
-                        result[ido] = out[i]
-                    # Simpler manner of defining a process fuction (do not return a list)
-                    else:
-                        result[ido] = out
+                if prc.outputs is not None:
+                    updated_buffers.update(prc.outputs)
+            self.dispatch_outputs(prc, out, result)
             toc = time.perf_counter()
+            filter_timings[prc.name] = toc - tic
             performances.append(f"{prc.name}: {toc - tic:0.4f} seconds")
 
         # Limit result using self.numfigs but with indices pointed by last filter
         logging.info("\n".join(performances))
         logging.info(f"Full buffer: {len(result)}")
+        self.updated_buffers = updated_buffers
+        self.filter_timings = filter_timings
+        self.cached_filters = cached_filters
+        return result
+
+    def run_pipelined(self, filters: List[FilterCore], imglst_stream: Iterable[Tuple[Any, Any]],
+                      max_buffered: int = 2) -> Iterator[Tuple[Any, dict]]:
+        """Stage-pipelined execution of a stream: filter k processes frame n while filter k+1 processes frame n-1.
+
+        - `imglst_stream` yields `(key, imglst)` pairs (key is a timestamp or a frame index for instance).
+        - each filter runs in its own thread, stages are connected by queues holding at most `max_buffered` frames.
+        - yields `(key, full buffer)` in the stream order.
+        Throughput is bounded by the slowest filter instead of the sum of all filters
+        (filters shall release the GIL, numpy & opencv do).
+        Parameters shall not be modified while streaming, no cache is used.
+        Filters shall not exchange per-frame data through global params as several frames are in flight.
+        """
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=max_buffered) for _ in range(len(filters)+1)]
+
+        def feed():
+            try:
+                for key, imglst in imglst_stream:
+                    if not self.__put(queues[0], (key, self.initialize_buffers(imglst), None), stop):
+                        return
+            except Exception as exc:
+                self.__put(queues[0], (None, None, exc), stop)
+            self.__put(queues[0], None, stop)
+
+        def stage(prc: FilterCore, input_queue: queue.Queue, output_queue: queue.Queue):
+            while True:
+                item = self.__get(input_queue, stop)
+                if item is None:
+                    self.__put(output_queue, None, stop)
+                    return
+                key, result, error = item
+                if error is None:
+                    try:
+                        routing_in = [result[idi] if idi is not None else None for idi in (prc.inputs or [])]
+                        self.dispatch_outputs(prc, prc.run(*routing_in), result)
+                    except Exception as exc:
+                        logging.error(f"Error in {prc.name} filter: {exc}")
+                        error = exc
+                if not self.__put(output_queue, (key, result, error), stop):
+                    return
+
+        threads = [threading.Thread(target=feed, name="pipelined_feed", daemon=True)]
+        for idx, prc in enumerate(filters):
+            threads.append(threading.Thread(target=stage, args=(prc, queues[idx], queues[idx+1]),
+                                            name=f"pipelined_{prc.name}", daemon=True))
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self.__get(queues[-1], stop)
+                if item is None:
+                    return
+                key, result, error = item
+                if error is not None:
+                    raise error
+                self.updated_buffers = set(result.keys())
+                yield key, result
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    @staticmethod
+    def __put(items: queue.Queue, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def __get(items: queue.Queue, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                return items.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def run_sweep(self, filters: List[FilterCore], imglst=None, sweep: Dict[str, Dict[str, list]] = {},
+                  upstream: Optional[dict] = None) -> List[dict]:
+        """Evaluate K parameters settings in a single pass over the filters.
+
+        ```
+        sweep = {
+            "filter_name": {"param_name": [value_0, ..., value_K-1]},
+        }
+        ```
+        - filters which are not impacted by the sweep are computed only once.
+        When `upstream` buffers are provided (see `run_upstream`), they are not computed at all
+        and `imglst` is ignored.
+        - swept filters declared with `vectorize=True` are computed once,
+        swept parameters are provided as arrays of shape (K, 1, ..., 1)
+        which broadcast along a new leading axis of the inputs.
+        - other impacted filters are computed K times.
+
+        Returns a list of K full buffers (one dictionary per parameter setting).
+        No cache is used or modified, filters parameters are left untouched
+        so several sweeps can be evaluated concurrently.
+        """
+        sweep_lengths = set(len(values) for params in sweep.values()
+                            for values in params.values())
+        assert len(
+            sweep_lengths) == 1, f"all swept parameters shall have the same amount of values {sweep_lengths}"
+        num_settings = sweep_lengths.pop()
+        self.__check_swept_filters(filters, sweep)
+        result = self.initialize_buffers(imglst) if upstream is None else dict(upstream)
+        swept_buffers = set()  # buffers carrying a leading axis of K settings
+        for prc in filters:
+            swept_params = sweep.get(prc.name, {})
+            routing_in = []
+            if prc.inputs:
+                routing_in = [
+                    result[idi] if idi is not None else None for idi in prc.inputs]
+            swept_inputs = [idi in swept_buffers for idi in (prc.inputs or [])]
+            if not swept_params and not any(swept_inputs):
+                if upstream is None:
+                    out = prc.run(*routing_in)
+                    self.dispatch_outputs(prc, out, result)
+                continue
+            if prc.vectorize:
+                logging.debug(f"Vectorized sweep {prc.name}")
+                routing_in = [np.stack(inp) if is_swept and isinstance(inp, list) else inp
+                              for inp, is_swept in zip(routing_in, swept_inputs)]
+                ndim = self.__broadcast_ndim(routing_in, swept_inputs)
+                params = {
+                    param_name: np.reshape(
+                        values, (num_settings,) + (1,)*(ndim-1))
+                    for param_name, values in swept_params.items()
+                }
+                out = self.__with_values(prc, params).run(*routing_in)
+            else:
+                logging.debug(f"Sweep {prc.name} - {num_settings} runs")
+                outs = []
+                for k in range(num_settings):
+                    routing_in_k = [inp[k] if is_swept else inp
+                                    for inp, is_swept in zip(routing_in, swept_inputs)]
+                    params = {param_name: values[k]
+                              for param_name, values in swept_params.items()}
+                    outs.append(self.__with_values(prc, params).run(*routing_in_k))
+                out = None if outs[0] is None else [
+                    [out_k[i] for out_k in outs] for i in range(len(outs[0]))]
+            if out is not None and prc.outputs is not None:
+                swept_buffers.update(prc.outputs)
+            self.dispatch_outputs(prc, out, result)
+        return [
+            {name: (buffer[k] if name in swept_buffers else buffer)
+             for name, buffer in result.items()}
+            for k in range(num_settings)
+        ]
+
+    def run_upstream(self, filters: List[FilterCore], imglst=None, swept_filters: Iterable[str] = []) -> dict:
+        """Compute only the filters which are not impacted by sweeping the parameters of `swept_filters`.
+
+        The returned buffer can be shared by several `run_sweep(..., upstream=...)` calls
+        (e.g. chunks of a long sweep) so the upstream part of the pipeline is computed once.
+        """
+        swept_filters = set(swept_filters)
+        self.__check_swept_filters(filters, swept_filters)
+        result = self.initialize_buffers(imglst)
+        impacted_buffers = set()
+        for prc in filters:
+            if prc.name in swept_filters or any(idi in impacted_buffers for idi in (prc.inputs or [])):
+                impacted_buffers.update(prc.outputs or [])
+                continue
+            routing_in = [result[idi] if idi is not None else None for idi in (prc.inputs or [])]
+            self.dispatch_outputs(prc, prc.run(*routing_in), result)
         return result
+
+    @staticmethod
+    def __check_swept_filters(filters: List[FilterCore], swept_filters: Iterable[str]) -> None:
+        available_filters_names = [prc.name for prc in filters]
+        for filter_name in swept_filters:
+            assert filter_name in available_filters_names, f"filter {filter_name} does not exist {available_filters_names}"
+
+    @staticmethod
+    def __broadcast_ndim(routing_in: list, swept_inputs: List[bool]) -> int:
+        for inp, is_swept in zip(routing_in, swept_inputs):
+            if is_swept:
+                return np.ndim(inp)
+        for inp in routing_in:
+            if inp is not None:
+                return 1 + np.ndim(inp)
+        return 1
+
+    @staticmethod
+    def __with_values(prc: FilterCore, new_values: dict) -> FilterCore:
+        # Shallow copy carrying the swept values, the filter itself is never modified
+        overridden = copy(prc)
+        overridden.values = new_values
+        return overridden
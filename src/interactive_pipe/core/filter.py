@@ -79,12 +79,19 @@ class FilterCore(PureFilter):
                  inputs: List[Union[int, str]] = [0],
                  outputs: List[Union[int, str]] = [0],
                  cache=True,
+                 vectorize=False,
                  ):
+        """
+        vectorize=True declares that `apply_fn` accepts array valued parameters
+        broadcasted along a new leading axis (and inputs stacked along that same axis).
+        This allows evaluating several parameters settings in a single call (see `PipelineEngine.run_sweep`)
+        """
         super().__init__(apply_fn=apply_fn, name=name,
                          default_params=default_params)
         self.inputs = inputs
         self.outputs = outputs
         self.cache = cache
+        self.vectorize = vectorize
         self.reset_cache()
 
     def reset_cache(self):
@@ -51,6 +51,20 @@ class PipelineCore:
         """
         return self.engine.run(self.filters, imglst=self.inputs)
 
+    @property
+    def updated_buffers(self) -> Optional[set]:
+        """Buffers which have been recomputed by the last run (the others were served from cache)
+        None if the pipeline has not run yet.
+        """
+        return self.engine.updated_buffers
+
+    @property
+    def buffer_versions(self) -> dict:
+        """Version of each buffer, incremented each time a run recomputes it.
+        Unlike `updated_buffers`, it remains valid when several runs happen between two displays.
+        """
+        return self.engine.buffer_versions
+
     @property
     def parameters(self):
         parameters = {}
@@ -83,6 +97,11 @@ class PipelineCore:
             self.filters[available_filters_names.index(
                 filter_name)].values = new_parameters[filter_name]
 
+    @property
+    def has_inputs(self) -> bool:
+        """True once the inputs have been set (`.inputs` can be accessed)"""
+        return self.__initialized_inputs
+
     @property
     def inputs(self):
         assert self.__initialized_inputs, "Cannot access unitialized inputs!"
@@ -0,0 +1,259 @@
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import traceback
+import weakref
+from copy import copy
+from typing import Dict, List, Optional
+import numpy as np
+from interactive_pipe.core.engine import PipelineEngine
+from interactive_pipe.core.filter import FilterCore
+
+
+def _compute_worker(connection, filters: List[FilterCore], cache: bool, safe_input_buffer_deepcopy: bool) -> None:
+    """Compute process main loop: apply the received deltas, run the filters, hand the buffers back.
+
+    Arrays are written to shared memory blocks (one per buffer, reused from one run to the next),
+    other buffers are pickled through the pipe.
+    """
+    from multiprocessing import resource_tracker
+    if os.name == "posix":
+        # The blocks are tracked by a tracker of the compute process only (not shared with the GUI process):
+        # it unlinks them if the compute process crashes.
+        resource_tracker._resource_tracker = resource_tracker.ResourceTracker()
+    engine = PipelineEngine(cache, safe_input_buffer_deepcopy=safe_input_buffer_deepcopy)
+    global_params = {}
+    for filt in filters:
+        filt.global_params = global_params
+        filt.reset_cache()
+    filters_outputs = set(out for filt in filters if filt.outputs is not None for out in filt.outputs)
+    inputs = None
+    blocks: Dict = {}
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break  # the GUI process is gone
+            if message is None:
+                break
+            if "inputs" in message:
+                inputs = message["inputs"]
+            for filter_index, values in message["parameters"].items():
+                filters[filter_index].values = values
+            for filter_index in message["reset_cache"]:
+                filters[filter_index].reset_cache()
+            global_params.update(message["global_params"])
+            try:
+                result = engine.run(filters, imglst=inputs)
+            except BaseException:
+                # The engine exits on filter failures, the compute process keeps serving
+                connection.send({"error": traceback.format_exc()})
+                continue
+            buffers = {}
+            for name in engine.updated_buffers & filters_outputs:
+                buffers[name] = _share_buffer(result[name], name, blocks)
+            connection.send({"buffers": buffers, "updated_buffers": engine.updated_buffers,
+                             "filter_timings": engine.filter_timings, "cached_filters": engine.cached_filters,
+                             "global_params": global_params})
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+
+def _share_buffer(buffer, name, blocks: dict):
+    from multiprocessing import shared_memory
+    if not isinstance(buffer, np.ndarray) or buffer.dtype.hasobject or buffer.nbytes == 0:
+        return ("value", buffer)
+    block = blocks.get(name, None)
+    if block is None or block.size < buffer.nbytes:
+        if block is not None:
+            block.close()
+            block.unlink()
+        block = shared_memory.SharedMemory(create=True, size=buffer.nbytes)
+        blocks[name] = block
+    np.ndarray(buffer.shape, dtype=buffer.dtype, buffer=block.buf)[...] = buffer
+    return ("shared_memory", block.name, buffer.shape, buffer.dtype.str)
+
+
+def _stop_worker(process, connection, attached_blocks: dict) -> None:
+    try:
+        connection.send(None)
+    except (OSError, ValueError):
+        pass
+    process.join(timeout=2.)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+    connection.close()
+    # Blocks are unlinked by the compute process (or by its resource tracker after a crash)
+    for block in attached_blocks.values():
+        block.close()
+    attached_blocks.clear()
+
+
+class ProcessPipelineEngine(PipelineEngine):
+    """Run the filters in a separate compute process.
+
+    The GUI process only hosts the window: filters heavy on the GIL can not make it stutter
+    and a crash in a filter does not take the window down (the compute process restarts at the next run).
+    - only modified filter parameters are sent to the compute process through a pipe,
+    inputs are sent when they change (compared by identity).
+    - recomputed array buffers come back through shared memory, the other buffers are pickled.
+    - global params are synchronized at each run (both ways),
+    except `excluded_global_params` (graphical objects living in the GUI process).
+    - on a filter error, the error is logged and the previous results are returned.
+
+    Filters are handed to the compute process at start (no pickling with the default "fork" start method).
+    """
+
+    def __init__(self, cache=False, safe_input_buffer_deepcopy=True, excluded_global_params: List[str] = [],
+                 start_method: Optional[str] = None) -> None:
+        if sys.version_info < (3, 8):
+            raise RuntimeError("The compute process engine requires Python >= 3.8 (multiprocessing.shared_memory)")
+        super().__init__(cache, safe_input_buffer_deepcopy=safe_input_buffer_deepcopy)
+        self.excluded_global_params = list(excluded_global_params)
+        self.start_method = start_method
+        self.__reset_worker_state()
+
+    @classmethod
+    def from_engine(cls, engine: PipelineEngine, **kwargs) -> "ProcessPipelineEngine":
+        return cls(engine.cache, safe_input_buffer_deepcopy=engine.safe_input_buffer_deepcopy, **kwargs)
+
+    def __reset_worker_state(self) -> None:
+        self._process = None
+        self._connection = None
+        self._finalizer = None
+        self._sent_parameters = {}
+        self._cache_ids = {}
+        self._attached_blocks = {}
+        self._buffer_blocks = {}
+        self._buffers = {}
+        self._result = None
+        self._last_inputs = {}
+
+    def __getstate__(self) -> dict:
+        # The compute process belongs to this engine only
+        state = super().__getstate__()
+        for key in ["_process", "_connection", "_finalizer", "_result"]:
+            state[key] = None
+        for key in ["_sent_parameters", "_cache_ids", "_attached_blocks", "_buffer_blocks", "_buffers"]:
+            state[key] = {}
+        return state
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self, filters: List[FilterCore]) -> None:
+        context = multiprocessing.get_context(self.start_method)
+        # Filters copies without their cached results nor the GUI global params
+        worker_filters = []
+        for filt in filters:
+            worker_filter = copy(filt)
+            worker_filter.global_params = {}
+            worker_filter.cache_mem = None
+            worker_filters.append(worker_filter)
+        self._connection, worker_connection = context.Pipe()
+        self._process = context.Process(
+            target=_compute_worker, name="compute_engine", daemon=True,
+            args=(worker_connection, worker_filters, self.cache, self.safe_input_buffer_deepcopy))
+        self._process.start()
+        worker_connection.close()
+        self._finalizer = weakref.finalize(
+            self, _stop_worker, self._process, self._connection, self._attached_blocks)
+        # Everything shall be sent again to the new process
+        self._sent_parameters = {}
+        self._cache_ids = {}
+        self._last_inputs = {}
+        self._buffers = {}
+        self._buffer_blocks = {}
+
+    def stop(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+        self._process = None
+        self._connection = None
+        self._finalizer = None
+
+    def __message(self, filters: List[FilterCore], imglst) -> dict:
+        message = {"parameters": {}, "reset_cache": []}
+        if self.changed_inputs(imglst) or self._result is None:
+            message["inputs"] = imglst
+        for filter_index, filt in enumerate(filters):
+            values = pickle.dumps(filt.values)
+            if self._sent_parameters.get(filter_index, None) != values:
+                message["parameters"][filter_index] = filt.values
+                self._sent_parameters[filter_index] = values
+            # The cache of a filter has been reset on the GUI side (new inputs, key events...)
+            if self._cache_ids.get(filter_index, None) != id(filt.cache_mem):
+                message["reset_cache"].append(filter_index)
+                self._cache_ids[filter_index] = id(filt.cache_mem)
+        global_params = filters[0].global_params if filters else {}
+        message["global_params"] = {key: val for key, val in global_params.items()
+                                    if key not in self.excluded_global_params}
+        return message
+
+    def __receive_buffer(self, name, description) -> object:
+        from multiprocessing import resource_tracker, shared_memory
+        if description[0] == "value":
+            return description[1]
+        _, block_name, shape, dtype = description
+        previous_block_name = self._buffer_blocks.get(name, None)
+        if previous_block_name is not None and previous_block_name != block_name:
+            # The compute process replaced the block of this buffer (larger buffer)
+            self._attached_blocks.pop(previous_block_name).close()
+        block = self._attached_blocks.get(block_name, None)
+        if block is None:
+            block = shared_memory.SharedMemory(name=block_name)
+            if os.name == "posix":
+                # Attaching registers the block again: the compute process owns it, it shall not be
+                # reported as leaked nor unlinked a second time by the tracker of the GUI process
+                resource_tracker.unregister(block._name, "shared_memory")
+            self._attached_blocks[block_name] = block
+        self._buffer_blocks[name] = block_name
+        # Copy out of the shared block: the compute process writes the next frame into the same block
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+
+    def __stale_result(self) -> dict:
+        self.updated_buffers = set()
+        self.filter_timings = {}
+        self.cached_filters = set()
+        return self._result
+
+    def run(self, filters: List[FilterCore], imglst=None):
+        if not self.is_running:
+            if self._process is not None:
+                logging.warning("Compute process stopped, restarting it")
+                self.stop()
+            self.start(filters)
+        message = self.__message(filters, imglst)
+        try:
+            self._connection.send(message)
+            reply = self._connection.recv()
+        except (EOFError, OSError):
+            logging.error(f"Compute process crashed (exit code {self._process.exitcode})")
+            self.stop()
+            if self._result is None:
+                raise RuntimeError("Compute process crashed during the first run")
+            return self.__stale_result()
+        if "error" in reply:
+            logging.error(reply["error"])
+            if self._result is None:
+                raise RuntimeError(f"Pipeline failed in the compute process\n{reply['error']}")
+            return self.__stale_result()
+        for name, description in reply["buffers"].items():
+            self._buffers[name] = self.__receive_buffer(name, description)
+        # Keep graphical objects, update everything else from the compute process
+        if filters:
+            filters[0].global_params.update(reply["global_params"])
+        result = {} if imglst is None else dict(enumerate(imglst) if isinstance(imglst, list) else imglst)
+        result.update(self._buffers)
+        self._result = result
+        self.updated_buffers = reply["updated_buffers"]
+        self.filter_timings = reply["filter_timings"]
+        self.cached_filters = reply["cached_filters"]
+        return result
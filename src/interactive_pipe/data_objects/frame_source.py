@@ -0,0 +1,102 @@
+import logging
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from interactive_pipe.data_objects.image import Image
+from interactive_pipe.data_objects.image_sequence import ImageSequence
+
+try:
+    import cv2
+except:
+    cv2 = None
+    logging.info("cv2 is not available, won't be able to read videos")
+
+
+class Frame(NamedTuple):
+    data: Any
+    timestamp: float  # seconds
+    index: int
+
+
+class FrameSource:
+    """Stream of timestamped frames, used as a pipeline input to process videos & image sequences.
+
+    - `FrameSource.from_video(path)` decodes a video file (requires opencv), timestamps come from the container.
+    - `FrameSource.from_images(paths, fps)` plays an image folder (or an `ImageSequence`) at a given frame rate.
+    - `FrameSource(frames, fps)` wraps any iterable (or generator function) of frames.
+
+    Iterating yields `Frame(data, timestamp, index)`.
+    Sources built from a file, a sequence or a generator function can be iterated several times (replay),
+    sources built from an iterator are single pass.
+
+    In a GUI, frame sources inputs are played in real time (late frames are dropped),
+    `HeadlessPipeline.run_stream` processes all frames.
+    """
+
+    def __init__(self, frames: Union[Iterable, Callable[[], Iterable]], fps: float = 25.,
+                 timestamps: Optional[List[float]] = None, length: Optional[int] = None):
+        self.frames = frames
+        self.fps = fps
+        self.timestamps = timestamps
+        if length is None and hasattr(frames, "__len__"):
+            length = len(frames)
+        self.length = length
+
+    @classmethod
+    def from_images(cls, paths: Union[List[Union[str, Path]], ImageSequence], fps: float = 25., **kwargs) -> "FrameSource":
+        sequence = paths if isinstance(paths, ImageSequence) else ImageSequence(paths, **kwargs)
+        return cls(sequence, fps=fps)
+
+    @classmethod
+    def from_video(cls, path: Union[str, Path], fps: Optional[float] = None) -> "FrameSource":
+        """Decode a video file, frames are RGB normalized in [0, 1] like `Image.load_image`.
+        fps: overrides the frame rate of the file (timestamps are then regularly spaced)
+        """
+        assert cv2 is not None, "Reading videos requires opencv"
+        path = Path(path)
+        assert path.exists(), f"{path} does not exist"
+        capture = cv2.VideoCapture(str(path))
+        file_fps = capture.get(cv2.CAP_PROP_FPS)
+        length = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        return VideoFrameSource(path, fps=fps if fps is not None else (file_fps if file_fps > 0 else 25.),
+                                use_file_timestamps=fps is None, length=length if length > 0 else None)
+
+    def read(self) -> Iterator[Tuple[Any, Optional[float]]]:
+        """Raw (data, timestamp or None) pairs"""
+        frames = self.frames() if callable(self.frames) else self.frames
+        for data in frames:
+            yield data, None
+
+    def __iter__(self) -> Iterator[Frame]:
+        for index, (data, timestamp) in enumerate(self.read()):
+            if timestamp is None:
+                timestamp = self.timestamps[index] if self.timestamps is not None else index / self.fps
+            yield Frame(data, timestamp, index)
+
+    def __len__(self) -> int:
+        if self.length is None:
+            raise TypeError("Unknown frame source length")
+        return self.length
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({'?' if self.length is None else self.length} frames, {self.fps:.2f} fps)"
+
+
+class VideoFrameSource(FrameSource):
+    def __init__(self, path: Path, fps: float = 25., use_file_timestamps: bool = True, length: Optional[int] = None):
+        super().__init__(None, fps=fps, length=length)
+        self.path = path
+        self.use_file_timestamps = use_file_timestamps
+
+    def read(self) -> Iterator[Tuple[Any, Optional[float]]]:
+        capture = cv2.VideoCapture(str(self.path))
+        try:
+            while True:
+                success, frame = capture.read()
+                if not success:
+                    break
+                timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000. if self.use_file_timestamps else None
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                yield Image.convert_dtype(frame, precision=8), timestamp
+        finally:
+            capture.release()
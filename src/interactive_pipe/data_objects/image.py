@@ -1,7 +1,9 @@
 from interactive_pipe.data_objects.data import Data
 import numpy as np
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Callable, List
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+import threading
 import logging
 image_backends = []
 
@@ -9,6 +11,11 @@ IMAGE_BACKEND_PILLOW = "pillow"
 IMAGE_BACKEND_OPENCV = "opencv"
 IMAGE_BACKENDS = [IMAGE_BACKEND_PILLOW, IMAGE_BACKEND_OPENCV]
 
+IMAGE_DTYPE_NATIVE = "native"  # keep the file integer dtype (uint8, uint16)
+
+# Lossless numpy formats, data is stored as is (float arrays are not quantized)
+NUMPY_EXTENSIONS = [".npy", ".npz"]
+
 try:
     import cv2
     image_backends.append(IMAGE_BACKEND_OPENCV)
@@ -22,6 +29,12 @@ except:
     logging.info("PIL is not available")
 assert len(image_backends) > 0
 
+try:
+    import tifffile
+except:
+    tifffile = None
+    logging.info("tifffile is not available, won't be able to memory map TIFF files")
+
 try:
     import matplotlib.pyplot as plt
 except:
@@ -29,84 +42,264 @@ except:
 
 
 class Image(Data):
+    """Image loading/saving
+
+    Loaded images are normalized in the [0, 1] range using `Image.default_dtype` (float64 by default).
+    The dtype policy can be changed globally (`Image.default_dtype = np.float32`)
+    or per call (`Image.load_image(path, dtype=IMAGE_DTYPE_NATIVE)` keeps the uint8/uint16 file data).
+
+    - 8 bits & 16 bits (`precision=16`) PNG/TIFF.
+    16 bits RGB images require opencv (PIL only supports 16 bits grayscale images).
+    - `.npy`/`.npz` store the arrays losslessly (float data is not quantized).
+
+    Large `.npy` arrays and uncompressed TIFF files (requires `tifffile`) can be memory mapped
+    (`Image.from_file(path, mmap=True)`): pages are only read from disk when filters access them.
+    Memory mapped data is read-only and kept in its native dtype.
+
+    Previews can be decoded at a reduced resolution (`Image.load_image(path, scale=0.25)`),
+    JPEG files are then decoded directly at the lower resolution which is several times faster.
+    """
+    default_dtype = np.float64
+
     def __init__(self, data, title="") -> None:
         super().__init__(data)
         self.title = title
         self.path = None
 
     def _set_file_extensions(self):
-        self.file_extensions = [".png", ".jpg", ".tif"]
+        self.file_extensions = [".png", ".jpg", ".tif", ".tiff"] + NUMPY_EXTENSIONS
 
-    def _save(self, path: Path, backend=None):
+    def _save(self, path: Path, backend=None, precision=8):
         assert path is not None, "Save requires a path"
         if self.title is not None:
             self.path = self.append_with_stem(path, self.title)
         else:
             self.path = path
-        self.save_image(self.data, self.path, backend=backend)
+        self.save_image(self.data, self.path,
+                        precision=precision, backend=backend)
 
-    def _load(self, path: Path, backend=None, title=None) -> np.ndarray:
+    def _load(self, path: Path, backend=None, title=None, dtype=None, mmap=False, scale=None) -> np.ndarray:
         if title is not None:
             self.title = title
         self.path = path
-        return self.load_image(path, backend=backend)
+        if mmap:
+            return self.load_image_mmap(path)
+        return self.load_image(path, backend=backend, dtype=dtype, scale=scale)
 
     @staticmethod
     def save_image(data, path: Path, precision=8, backend=None):
+        if isinstance(path, str):
+            path = Path(path)
+        if path.suffix in NUMPY_EXTENSIONS:
+            Image.save_image_numpy(data, path)
+            return
+        assert precision in [8, 16], f"precision={precision} shall be 8 or 16 bits"
         if backend is None:
             backend = IMAGE_BACKEND_PILLOW
+            if precision == 16 and np.ndim(data) == 3 and IMAGE_BACKEND_OPENCV in image_backends:
+                # PIL does not support 16 bits color images
+                backend = IMAGE_BACKEND_OPENCV
         assert backend in IMAGE_BACKENDS
         if backend == IMAGE_BACKEND_OPENCV:
             Image.save_image_cv2(data, path, precision)
         if backend == IMAGE_BACKEND_PILLOW:
             Image.save_image_PIL(data, path, precision)
 
+    @staticmethod
+    def save_image_numpy(data, path: Path):
+        if path.suffix == ".npz":
+            np.savez_compressed(path, image=data)
+        else:
+            np.save(path, data)
+
+    @staticmethod
+    def load_image_numpy(path: Path) -> np.ndarray:
+        loaded = np.load(path)
+        if isinstance(loaded, np.ndarray):
+            return loaded
+        with loaded:
+            return loaded["image"] if "image" in loaded.files else loaded[loaded.files[0]]
+
+    @staticmethod
+    def load_image_mmap(path: Path) -> np.ndarray:
+        """Memory map a `.npy` or uncompressed TIFF file (read-only, native dtype).
+        Falls back to a regular load when the file cannot be mapped.
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        if path.suffix == ".npy":
+            return np.load(path, mmap_mode="r")
+        if path.suffix in [".tif", ".tiff"] and tifffile is not None:
+            try:
+                return tifffile.memmap(str(path), mode="r")
+            except ValueError as exc:  # compressed or tiled data cannot be mapped
+                logging.warning(f"cannot memory map {path}: {exc}")
+        else:
+            logging.warning(f"memory mapping is not supported for {path}")
+        return Image.load_image(path, dtype=IMAGE_DTYPE_NATIVE)
+
     @staticmethod
     def rescale_dynamic(data, precision=8):
         amplitude = 2**precision-1
         return np.round(data*amplitude).clip(0, amplitude)
 
     @staticmethod
-    def normalize_dynamic(img, precision=8):
-        return img / (2.**precision-1)  # scale image data to [0, 1]
+    def quantize(data: np.ndarray, precision=8) -> np.ndarray:
+        """Convert [0, 1] data to uint8/uint16 for encoding.
+        Integer data already matching the precision is returned as is (no copy).
+        """
+        target_dtype = np.uint8 if precision == 8 else np.uint16
+        if data.dtype == target_dtype:
+            return data
+        amplitude = 2**precision-1
+        if np.issubdtype(data.dtype, np.integer):
+            data = Image.normalize_dynamic(
+                data, precision=8*data.dtype.itemsize, dtype=np.float32)
+        # round(data*amplitude).clip(0, amplitude) with a single temporary buffer
+        out = np.multiply(data, amplitude, dtype=np.float32)
+        np.rint(out, out=out)
+        np.clip(out, 0, amplitude, out=out)
+        return out.astype(target_dtype)
+
+    @staticmethod
+    def normalize_dynamic(img, precision=8, dtype=None):
+        # scale image data to [0, 1]
+        if dtype is None:
+            return img / (2.**precision-1)
+        # single pass: cast & scale
+        return np.multiply(img, 1./(2.**precision-1), dtype=dtype)
+
+    @staticmethod
+    def convert_dtype(img: np.ndarray, precision=None, dtype=None) -> np.ndarray:
+        """Apply the dtype policy to raw file data
+        precision: bit depth used to normalize integer data (deduced from the integer type when None)
+        """
+        if dtype is None:
+            dtype = Image.default_dtype
+        if isinstance(dtype, str) and dtype == IMAGE_DTYPE_NATIVE:
+            return img if img.flags.writeable else img.copy()
+        if not np.issubdtype(img.dtype, np.integer):
+            return img.astype(dtype, copy=False)
+        if precision is None:
+            precision = 8*img.dtype.itemsize
+        return Image.normalize_dynamic(img, precision=precision, dtype=dtype)
 
     @staticmethod
     def save_image_cv2(data, path: Path, precision=8):
         assert isinstance(path, Path)
-        out = Image.rescale_dynamic(data, precision=precision)
-        out = out.astype(np.uint8 if precision == 8 else np.uint16)
-        out = cv2.cvtColor(out, cv2.COLOR_BGR2RGB)
+        out = Image.quantize(data, precision=precision)
+        if out.ndim == 3 and out.shape[-1] == 3:
+            out = cv2.cvtColor(out, cv2.COLOR_RGB2BGR)
+        elif out.ndim == 3 and out.shape[-1] == 4:
+            out = cv2.cvtColor(out, cv2.COLOR_RGBA2BGRA)
         cv2.imwrite(str(path), out)
 
     @staticmethod
     def save_image_PIL(data, path: Path, precision=8):
-        assert precision == 8
         assert isinstance(path, Path)
-        out = Image.rescale_dynamic(data, precision=precision)
-        out = out.astype(np.uint8)  # PIL requires image data in uint8 format
-        out = PilImage.fromarray(out, 'RGB')
+        out = Image.quantize(data, precision=precision)
+        if precision == 16:
+            assert out.ndim == 2, "PIL only supports 16 bits grayscale images, use opencv backend"
+        # mode is deduced from the shape & type (L, RGB, RGBA, I;16)
+        out = PilImage.fromarray(out)
         out.save(str(path))
 
     @staticmethod
-    def load_image_cv2(path: Path, precision=8) -> np.ndarray:
-        img = cv2.imread(str(path))
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        return Image.normalize_dynamic(img, precision=precision)
+    def reduction_factor(scale: Optional[float] = None) -> int:
+        """Power of 2 reduction (1, 2, 4 or 8) matching a requested scale (0.5 -> 2, 0.3 -> 2, 0.25 -> 4)"""
+        if scale is None or scale >= 1.:
+            return 1
+        assert scale > 0, f"scale={scale} shall be positive"
+        reduction = 1
+        while reduction < 8 and 1./(2*reduction) >= scale:
+            reduction *= 2
+        return reduction
 
     @staticmethod
-    def load_image_PIL(path: Path, precision=8) -> np.ndarray:
+    def load_image_cv2(path: Path, precision=None, dtype=None, scale=None) -> np.ndarray:
+        reduction = Image.reduction_factor(scale)
+        if reduction > 1 and Path(path).suffix.lower() in [".jpg", ".jpeg"]:
+            # JPEG decoded directly at a reduced resolution
+            img = cv2.imread(str(path), getattr(
+                cv2, f"IMREAD_REDUCED_COLOR_{reduction}"))
+            reduction = 1
+        else:
+            # keep 16 bits data & alpha channel
+            img = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+        assert img is not None, f"cannot read {path}"
+        if reduction > 1:
+            img = img[::reduction, ::reduction]
+        if img.ndim == 3 and img.shape[-1] == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        elif img.ndim == 3 and img.shape[-1] == 4:
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2RGBA)
+        return Image.convert_dtype(img, precision=precision, dtype=dtype)
+
+    @staticmethod
+    def load_image_PIL(path: Path, precision=None, dtype=None, scale=None) -> np.ndarray:
         img = PilImage.open(path)
-        return Image.normalize_dynamic(np.array(img), precision=precision)
+        if img.mode in ["RGB", "RGBA"] and Image.is_16bits_PIL(img):
+            # PIL decodes 16 bits color images as 8 bits
+            if IMAGE_BACKEND_OPENCV in image_backends:
+                return Image.load_image_cv2(path, precision=precision, dtype=dtype, scale=scale)
+            logging.warning(f"{path} is truncated to 8 bits, opencv is required to load 16 bits color images")
+        # 16 bits grayscale images may be decoded as 32 bits integers (mode "I"),
+        # the tile raw mode tells the file bit depth (lost once the data is loaded)
+        is_16bits = img.mode.startswith("I;16") or (img.mode == "I" and Image.is_16bits_PIL(img))
+        reduction = Image.reduction_factor(scale)
+        remaining_reduction = 1
+        if reduction > 1:
+            width, height = img.size
+            target_size = (-(-width // reduction), -(-height // reduction))
+            # JPEG only: the decoder directly outputs a 1/2, 1/4 or 1/8 image
+            img.draft(img.mode, target_size)
+            remaining_reduction = reduction // round(width / img.size[0])
+            if remaining_reduction > 1 and img.mode in ["L", "LA", "RGB", "RGBA", "I", "F"]:
+                img = img.reduce(remaining_reduction)
+                remaining_reduction = 1
+        img_data = np.asarray(img)
+        if remaining_reduction > 1:
+            # modes PIL can't reduce (16 bits): subsample
+            img_data = img_data[::remaining_reduction, ::remaining_reduction]
+        if is_16bits:
+            img_data = img_data.astype(np.uint16, copy=False)
+        elif img.mode == "I" and precision is None:
+            # signed 32 bits data: normalize the positive range
+            precision = 31
+        return Image.convert_dtype(img_data, precision=precision, dtype=dtype)
 
     @staticmethod
-    def load_image(path: Path, precision=8, backend=None) -> np.ndarray:
+    def is_16bits_PIL(img) -> bool:
+        for tile in img.tile:
+            args = tile[-1]
+            rawmode = args[0] if isinstance(args, tuple) else args
+            if isinstance(rawmode, str) and ";16" in rawmode:
+                return True
+        return False
+
+    @staticmethod
+    def load_image(path: Path, precision=None, backend=None, dtype=None, scale=None) -> np.ndarray:
+        """Load an image from disk.
+        dtype: float dtype of the [0, 1] normalized data (`Image.default_dtype` if None)
+        or IMAGE_DTYPE_NATIVE to keep the file integer data.
+        precision: bit depth used to normalize data (deduced from the file, 8 or 16 bits, when None)
+        scale: decode a reduced resolution proxy, the scale is rounded to 1/2, 1/4 or 1/8 (above the requested scale).
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        if path.suffix in NUMPY_EXTENSIONS:
+            img = Image.load_image_numpy(path)
+            reduction = Image.reduction_factor(scale)
+            if reduction > 1:
+                img = img[::reduction, ::reduction]
+            return Image.convert_dtype(img, precision=precision, dtype=dtype)
         if backend is None:
             backend = IMAGE_BACKEND_PILLOW
         assert backend in IMAGE_BACKENDS
         if backend == IMAGE_BACKEND_OPENCV:
-            return Image.load_image_cv2(path)
+            return Image.load_image_cv2(path, precision, dtype=dtype, scale=scale)
         if backend == IMAGE_BACKEND_PILLOW:
-            return Image.load_image_PIL(path, precision)
+            return Image.load_image_PIL(path, precision, dtype=dtype, scale=scale)
 
     def show(self):
         plt.figure()
@@ -114,3 +307,105 @@ class Image(Data):
         ttl = (f"{self.title} -" if self.title else "") + f"{self.data.shape}"
         plt.title(ttl)
         plt.show()
+
+
+def _save_array(data: np.ndarray, path: Path, precision: int, backend: Optional[str]) -> Path:
+    Image.save_image(data, path, precision, backend)
+    return path
+
+
+def _save_data(data_object: Data, path: Path, kwargs: dict) -> Path:
+    data_object.save(path, **kwargs)
+    # Some Data objects modify the path (like Image title)
+    return getattr(data_object, "path", None) or path
+
+
+class ImageWriter:
+    """Asynchronous writer so images encoding & disk accesses overlap with computations.
+
+    - `.write(array, path)` encodes a numpy array with `Image.save_image`
+    - `.write_data(data_object, path)` saves any `Data` object (Image, Curve...)
+    Both return a future which result is the written path.
+    Encoding happens on a thread (default) or process pool.
+    At most `max_pending` writes are queued, submitting more blocks the caller (backpressure)
+    so memory does not grow if the disk is slower than the computations.
+    Use `.flush()` to wait for all pending writes.
+
+    ```
+    with ImageWriter(max_workers=4) as writer:
+        for idx, img in enumerate(images):
+            writer.write(img, Path(f"out_{idx}.png"))
+    ```
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, process: bool = False):
+        assert max_pending >= 1
+        pool_class = ProcessPoolExecutor if process else ThreadPoolExecutor
+        self.pool = pool_class(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()
+        # Outcome of the writes finished since the last flush
+        self._completed: List[Path] = []
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._all_done = threading.Condition(self._lock)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        self._slots.acquire()
+        try:
+            future = self.pool.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        error = None if future.cancelled() else future.exception()
+        with self._lock:
+            self._pending.discard(future)
+            if error is not None:
+                if self._error is None:
+                    self._error = error
+            elif not future.cancelled():
+                self._completed.append(future.result())
+            self._all_done.notify_all()
+        self._slots.release()
+        if error is not None:
+            logging.error(f"Could not write image: {error}")
+
+    def write(self, data: np.ndarray, path: Path, precision: int = 8, backend: Optional[str] = None) -> Future:
+        return self.submit(_save_array, data, Path(path), precision, backend)
+
+    def write_data(self, data_object: Data, path: Path, **kwargs) -> Future:
+        return self.submit(_save_data, data_object, Path(path), kwargs)
+
+    def flush(self) -> List[Path]:
+        """Wait for all pending writes.
+        Returns the paths written since the last flush, raises the first error encountered since then.
+        """
+        with self._all_done:
+            # Writes are accounted for by their done callback (which runs after the future is done)
+            self._all_done.wait_for(lambda: not self._pending)
+            completed, self._completed = self._completed, []
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+        return completed
+
+    def close(self, wait_pending: bool = True) -> None:
+        if wait_pending:
+            self.flush()
+        self.pool.shutdown(wait=wait_pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # Do not mask the original error with a write error
+            self.pool.shutdown(wait=True)
+            return
+        self.close()
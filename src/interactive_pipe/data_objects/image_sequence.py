@@ -0,0 +1,178 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Union
+import numpy as np
+from interactive_pipe.data_objects.image import Image
+
+
+class ImageSequence(Sequence):
+    """Lazy collection of images decoded on demand.
+
+    - `sequence[index]` decodes the image on first access only,
+    decoded frames are kept in a LRU cache limited to `max_bytes`.
+    - neighbours of the last accessed frame are decoded ahead on a background thread
+    so browsing a folder with a slider does not wait for the decoder.
+    - returned arrays are read-only (they are shared with the cache),
+    so the pipeline engine does not need to copy them.
+    - `sequence.get(index, scale=0.25)` decodes a reduced resolution proxy (see `Image.load_image`),
+    proxies are cached next to the full resolution frames.
+
+    Use it directly as a pipeline input instead of a list of paths.
+    ```
+    def img_selector(images: ImageSequence, index: int = 0):
+        return images[index]
+    ...
+    app(ImageSequence(sorted(Path("images").glob("*.png"))))
+    ```
+    """
+
+    def __init__(
+        self,
+        paths: List[Union[str, Path]],
+        max_bytes: int = 2**30,
+        prefetch: int = 2,
+        num_workers: int = 1,
+        load_fn: Callable = Image.load_image,
+    ):
+        self.paths = [Path(path) for path in paths]
+        self.max_bytes = max_bytes
+        self.prefetch = prefetch
+        self.num_workers = num_workers
+        self.load_fn = load_fn
+        self.__initialize_cache()
+
+    def __initialize_cache(self) -> None:
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_bytes = 0
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.num_workers, thread_name_prefix="image_sequence")
+        return self._pool
+
+    @property
+    def names(self) -> List[str]:
+        return [path.stem for path in self.paths]
+
+    @property
+    def cache_bytes(self) -> int:
+        return self._cache_bytes
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.get(idx) for idx in range(*index.indices(len(self)))]
+        return self.get(index)
+
+    def get(self, index: int, scale: Optional[float] = None) -> np.ndarray:
+        index = self.__check_index(index)
+        key = (index, scale)
+        img = self.__lookup(key)
+        if img is None:
+            img = self.__wait_or_decode(key)
+        self.__prefetch_neighbours(index, scale)
+        return img
+
+    def __check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"image index {index} out of range [0, {len(self)}[")
+        return index
+
+    def __lookup(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            img = self._cache.get(key, None)
+            if img is not None:
+                self._cache.move_to_end(key)
+            return img
+
+    def __wait_or_decode(self, key: Hashable) -> np.ndarray:
+        with self._lock:
+            future = self._in_flight.get(key, None)
+        if future is not None:
+            # Already being decoded in the background
+            return future.result()
+        return self.__decode(key)
+
+    def __decode(self, key: Hashable) -> np.ndarray:
+        index, scale = key
+        if scale is None:
+            img = self.load_fn(self.paths[index])
+        else:
+            img = self.load_fn(self.paths[index], scale=scale)
+        img.setflags(write=False)
+        self.__store(key, img)
+        return img
+
+    def __store(self, key: Hashable, img: np.ndarray) -> None:
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = img
+            self._cache_bytes += img.nbytes
+            # Evict least recently used frames, always keep the latest one
+            while self._cache_bytes > self.max_bytes and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.nbytes
+
+    def __background_decode(self, key: Hashable) -> np.ndarray:
+        try:
+            return self.__decode(key)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def __prefetch_neighbours(self, index: int, scale: Optional[float] = None) -> None:
+        # Forward neighbours first (most common browsing direction)
+        neighbours = [index + offset for offset in range(1, self.prefetch+1)]
+        neighbours += [index - offset for offset in range(1, self.prefetch+1)]
+        for neighbour in neighbours:
+            if not 0 <= neighbour < len(self):
+                continue
+            key = (neighbour, scale)
+            with self._lock:
+                if key in self._cache or key in self._in_flight:
+                    continue
+                future = self.pool.submit(self.__background_decode, key)
+                self._in_flight[key] = future
+            future.add_done_callback(self.__log_prefetch_error)
+
+    @staticmethod
+    def __log_prefetch_error(future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logging.warning(f"Could not prefetch image: {future.exception()}")
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __deepcopy__(self, memo):
+        # Frames are read-only, the pipeline can share the sequence and its cache
+        return self
+
+    def __getstate__(self):
+        # Cache, lock & threads are not sent to other processes
+        state = self.__dict__.copy()
+        for key in ["_cache", "_cache_bytes", "_in_flight", "_lock", "_pool"]:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__initialize_cache()
+
+    def __repr__(self) -> str:
+        return f"ImageSequence({len(self)} images, {self._cache_bytes/2**20:.1f}MB cached)"
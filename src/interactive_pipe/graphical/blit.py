@@ -0,0 +1,121 @@
+from typing import List, Optional
+
+
+class BlitManager:
+    """Redraw only a few artists of a matplotlib canvas on top of a cached background.
+
+    - artists registered with `add_artists` are animated: they are excluded from the full figure draw.
+    - each full draw (`draw`, window resize...) caches the background of the axes holding them.
+    - `update` restores these backgrounds and only draws the animated artists (blitting),
+    the rest of the figure (sliders, ticks, titles) is left untouched.
+    Canvas which do not support blitting fall back to a regular (idle) draw.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.backgrounds = {}
+        self.artists = []
+        self._draw_event_id = canvas.mpl_connect("draw_event", self.on_draw)
+
+    @property
+    def supports_blit(self) -> bool:
+        return getattr(self.canvas, "supports_blit", False)
+
+    @property
+    def background(self):
+        return self.backgrounds if self.backgrounds else None
+
+    def add_artists(self, artists: List) -> None:
+        for artist in artists:
+            if self.supports_blit:
+                artist.set_animated(True)
+            self.artists.append(artist)
+
+    def remove_artists(self, artists: List) -> None:
+        for artist in artists:
+            if artist in self.artists:
+                artist.set_animated(False)
+                self.artists.remove(artist)
+
+    def on_draw(self, event=None) -> None:
+        if not self.supports_blit:
+            return
+        self.backgrounds = {}
+        for artist in self.artists:
+            if artist.axes is not None and artist.axes not in self.backgrounds:
+                self.backgrounds[artist.axes] = self.canvas.copy_from_bbox(
+                    artist.axes.bbox)
+        self.draw_animated()
+
+    def draw_animated(self, artists: Optional[List] = None) -> None:
+        for artist in (self.artists if artists is None else artists):
+            self.canvas.figure.draw_artist(artist)
+
+    def draw(self) -> None:
+        """Full draw, backgrounds are cached again"""
+        self.canvas.draw()
+
+    def update(self, artists: Optional[List] = None) -> None:
+        """Redraw the animated artists only (all of them by default)"""
+        if not self.supports_blit:
+            self.canvas.draw_idle()
+            return
+        if artists is None:
+            artists = self.artists
+        axes = []
+        for artist in artists:
+            if artist.axes not in axes:
+                axes.append(artist.axes)
+        if any(ax not in self.backgrounds for ax in axes):
+            self.draw()
+            return
+        for ax in axes:
+            self.canvas.restore_region(self.backgrounds[ax])
+            # all animated artists of the axes shall be drawn again on top of the background
+            self.draw_animated([artist for artist in self.artists if artist.axes is ax])
+            self.canvas.blit(ax.bbox)
+
+    def redraw_axes(self, ax) -> None:
+        """Redraw a static axes (a slider for instance) without redrawing the whole figure"""
+        if not self.supports_blit:
+            self.canvas.draw_idle()
+            return
+        self.canvas.figure.draw_artist(ax)
+        self.canvas.blit(ax.bbox)
+
+    def disconnect(self) -> None:
+        self.canvas.mpl_disconnect(self._draw_event_id)
+
+
+def curve_artists(plot_object: list) -> list:
+    """Flatten the lines created by `Curve.create_plot`"""
+    return [line for lines in plot_object for line in lines]
+
+
+def axes_state(ax) -> tuple:
+    """Everything which lies outside the animated artists (requires a full draw when modified)"""
+    legend = ax.get_legend()
+    legend_texts = tuple(text.get_text() for text in legend.get_texts()) if legend is not None else ()
+    return (ax.get_xlim(), ax.get_ylim(), ax.get_title(), ax.get_xlabel(), ax.get_ylabel(), legend_texts)
+
+
+def update_curve(curve, plot_object: list, ax) -> bool:
+    """Update the lines of a plotted curve.
+    Axes limits are rescaled to the data unless the curve defines them.
+    Returns True if a full redraw is needed (limits, titles or legend changed).
+    """
+    previous_state = axes_state(ax)
+    curve.update_plot(plot_object, ax=ax)
+    free_axes = [axis for axis in ["x", "y"] if curve.data.get(f"{axis}lim", None) is None]
+    if free_axes:
+        ax.relim()
+        ax.autoscale(enable=True, axis="both" if len(free_axes) == 2 else free_axes[0])
+    return axes_state(ax) != previous_state
+
+
+def refresh_curve(curve, plot_object: list, ax, blit_manager: BlitManager) -> None:
+    """Update a plotted curve, the full canvas is only redrawn when needed, otherwise lines are blitted."""
+    if update_curve(curve, plot_object, ax):
+        blit_manager.draw()
+    else:
+        blit_manager.update(curve_artists(plot_object))
@@ -0,0 +1,45 @@
+import io
+import numpy as np
+from PIL import Image as PILImage
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from interactive_pipe.data_objects.curves import Curve
+from typing import Optional, Tuple
+
+IMAGE_FORMATS = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+
+def to_uint8(img: np.ndarray) -> np.ndarray:
+    """Float images in [0, 1] to uint8, single channel images are squeezed"""
+    img = np.asarray(img)
+    if img.dtype != np.uint8:
+        img = (np.clip(img, 0., 1.) * 255).astype(np.uint8)
+    if img.ndim == 3 and img.shape[-1] == 1:
+        img = img[..., 0]
+    return img
+
+
+def render_curve(curve: Curve, figsize: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    """Rasterize a curve to a RGB uint8 array (no pyplot state involved, safe in worker threads)"""
+    fig = Figure(figsize=figsize)
+    canvas = FigureCanvasAgg(fig)
+    curve.create_plot(ax=fig.add_subplot())
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())[..., :3].copy()
+
+
+def encode_image(img, image_format: str = "jpeg", quality: int = 90, figsize: Optional[Tuple[float, float]] = None) -> bytes:
+    """Encode an output (image or curve) to compressed bytes for the browser"""
+    assert image_format in IMAGE_FORMATS, f"{image_format} shall be among {list(IMAGE_FORMATS.keys())}"
+    if isinstance(img, Curve):
+        img = render_curve(img, figsize=figsize)
+    pil_img = PILImage.fromarray(to_uint8(img))
+    if image_format == "jpeg" and pil_img.mode not in ["L", "RGB"]:
+        pil_img = pil_img.convert("RGB")
+    buffer = io.BytesIO()
+    pil_img.save(buffer, format=image_format.upper(), quality=quality)
+    return buffer.getvalue()
@@ -1,9 +1,12 @@
-from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.pipeline import HeadlessPipeline, GUI_GLOBAL_PARAMS
 from interactive_pipe.data_objects.image import Image
 from interactive_pipe.data_objects.parameters import Parameters
 from interactive_pipe.headless.keyboard import KeyboardControl
+from interactive_pipe.headless.control import Control
+from interactive_pipe.headless.session import SessionRecorder
 import logging
-from typing import Callable, List
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from functools import partial
 
 
@@ -24,12 +27,20 @@ class InteractivePipeGUI():
     `display_graph`, `help`
     Docstring of these methods will be used in the "F1" help descriptions
     - Redefining `print_message` will allow a window popup for instance.
+    - `process_engine=True` runs the filters in a separate compute process
+    (see `ProcessPipelineEngine`), the GUI process only hosts the window.
+    - `record_session="session.jsonl"` records controls changes & key presses
+    (see `SessionRecorder`), the session can be replayed headless with `SessionReplayer`.
 
     Do not re-implement the init function!
     """
 
-    def __init__(self, pipeline: HeadlessPipeline = None, controls=[], name="", custom_end=lambda: None, audio=False, size=None, **kwargs) -> None:
+    def __init__(self, pipeline: HeadlessPipeline = None, controls=[], name="", custom_end=lambda: None, audio=False, size=None, process_engine=False, record_session: Optional[Path] = None, **kwargs) -> None:
         self.pipeline = pipeline
+        if process_engine:
+            from interactive_pipe.core.process_engine import ProcessPipelineEngine
+            self.pipeline.engine = ProcessPipelineEngine.from_engine(
+                self.pipeline.engine, excluded_global_params=GUI_GLOBAL_PARAMS + ["__pipeline"])
         self.custom_end = custom_end
         self.audio = audio
         self.name = name
@@ -39,6 +50,12 @@ class InteractivePipeGUI():
         if hasattr(pipeline, "controls"):
             merged_controls += pipeline.controls
         self.controls = merged_controls
+        self._controls_index = None
+        self.recorder = None
+        if record_session is not None:
+            self.recorder = SessionRecorder(record_session, controls=self.controls)
+            for ctrl in self.controls:
+                ctrl.recorder = self.recorder
         if self.pipeline.outputs:
             if not isinstance(self.pipeline.outputs[0], list):
                 self.pipeline.outputs = [self.pipeline.outputs]
@@ -93,6 +110,8 @@ class InteractivePipeGUI():
             self.pipeline.global_params["__events"][evkey] = False
 
     def on_press(self, key_pressed, refresh_func=None):
+        if self.recorder is not None:
+            self.record_key(key_pressed)
         for key, func in self.key_bindings.items():
             if key_pressed == key:
                 func()  # a GUI level function like reset parameters or export images
@@ -111,6 +130,13 @@ class InteractivePipeGUI():
             refresh_func()
         self.reset_context_events()
 
+    def record_key(self, key_pressed) -> None:
+        actions = [func.__name__ for key, func in self.key_bindings.items()
+                   if key == key_pressed and hasattr(func, "__name__")]
+        events = [event_dict["param_name"] for key, event_dict in self.context_key_bindings.items()
+                  if key == key_pressed]
+        self.recorder.record_key(key_pressed, actions=actions, event=events[0] if events else None)
+
     def bind_keyboard_slider(self, ctrl: KeyboardControl, key_update_parameter_func: Callable):
         assert isinstance(ctrl, KeyboardControl)
         toggle_only = True
@@ -139,6 +165,35 @@ class InteractivePipeGUI():
             self.bind_key(keyboard_key, update_func)
             update_func.__doc__ = doc
 
+    @property
+    def controls_index(self) -> Dict[Tuple[str, str], List[Control]]:
+        """Controls indexed by (filter name, parameter name)"""
+        if self._controls_index is None:
+            self._controls_index = {}
+            for ctrl in self.controls:
+                if ctrl.filter_to_connect is None:
+                    continue
+                key = (ctrl.filter_to_connect.name, ctrl.parameter_name_to_connect)
+                self._controls_index.setdefault(key, []).append(ctrl)
+        return self._controls_index
+
+    def update_parameters(self, parameters: Dict[str, Dict[str, Any]]) -> None:
+        """Apply a whole parameters dictionary {filter_name: {parameter_name: value}} at once.
+        - filters parameters and matching controls are updated in a single pass
+        - widgets are then updated without triggering intermediate runs
+        - the pipeline runs once
+        """
+        self.pipeline.parameters = parameters
+        index = self.controls_index
+        for filter_name, filter_params in parameters.items():
+            for param_name, value in filter_params.items():
+                matched_controls = index.get((filter_name, param_name), [])
+                if not matched_controls:
+                    logging.debug(f"No control for {filter_name} - {param_name}")
+                for ctrl in matched_controls:
+                    ctrl.update(value)
+        self.window.reset_sliders()
+
     # ---------------------------------------------------------------------
     def reset_parameters(self):
         """reset parameters"""
@@ -147,6 +202,8 @@ class InteractivePipeGUI():
     def close(self):
         """quit"""
         logging.debug("Closing gui")
+        if self.recorder is not None:
+            self.recorder.close()
 
     def save_parameters(self):
         """export parameters dictionary to a yaml/json file"""
@@ -164,8 +221,9 @@ class InteractivePipeGUI():
     def save_images(self):
         """save images to disk"""
         pth = Image.check_path(Image.prompt_file(), load=False)
+        # Reuses the buffer of the last run & writes files in the background
         self.pipeline.save(pth, data_wrapper_fn=lambda im: Image(
-            im), save_entire_buffer=True)
+            im), save_entire_buffer=True, blocking=False)
 
     def display_graph(self):
         """display execution graph"""
@@ -45,12 +45,11 @@ class BoolCheckButtonMatplotlibControl(BaseControl):
         assert self.ctrl._type == bool
 
     def create(self):
-        current_state = [self.ctrl.value]
+        checks = CheckButtons(self.ax_control, [self.name], [self.ctrl.value])
 
         def on_click(label):
-            current_state[0] = not current_state[0]
-            self.update_func(self.name, current_state[0])
-        checks = CheckButtons(self.ax_control, [self.name], [self.ctrl.value])
+            # read the widget state (it may be updated in place without callbacks)
+            self.update_func(self.name, checks.get_status()[0])
         checks.on_clicked(on_click)
         return checks
 
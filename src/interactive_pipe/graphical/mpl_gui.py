@@ -5,6 +5,7 @@ from typing import List, Optional, Union, Tuple
 import logging
 from interactive_pipe.graphical.mpl_control import ControlFactory
 from interactive_pipe.graphical.mpl_window import MatplotlibWindow
+from matplotlib.widgets import Slider, CheckButtons, RadioButtons
 
 
 class InteractivePipeMatplotlib(InteractivePipeGUI):
@@ -32,7 +33,7 @@ class InteractivePipeMatplotlib(InteractivePipeGUI):
         }
 
     def run(self) -> list:
-        assert self.pipeline._PipelineCore__initialized_inputs, "Did you forget to initialize the pipeline inputs?"
+        assert self.pipeline.has_inputs, "Did you forget to initialize the pipeline inputs?"
         self.window.refresh()
         if isinstance(self.size, str) and "full" in self.size.lower():
             try:
@@ -50,23 +51,7 @@ class InteractivePipeMatplotlib(InteractivePipeGUI):
     def load_parameters(self):
         """import parameters dictionary from a yaml/json file on disk"""
         super().load_parameters()
-        self.window.need_redraw = True
-        # @TODO: issue #18 - https://github.com/balthazarneveu/interactive_pipe/issues/18
-        # Requires mapping the parameters back into each Control objects
-        print("------------")
-        for widget_idx, widget in self.window.ctrl.items():
-            matched = False
-            for filtname, params in self.pipeline.parameters.items():
-                for param_name in params.keys():
-                    if param_name == widget.parameter_name_to_connect:
-                        print(
-                            f"MATCH & update {filtname} {widget_idx} with {self.pipeline.parameters[filtname][param_name]}")
-                        self.window.ctrl[widget_idx].update(
-                            self.pipeline.parameters[filtname][param_name])
-                        matched = True
-            assert matched, f"could not match widget {widget_idx} with parameter to connect {widget.parameter_name_to_connect}"
-        print("------------")
-        self.window.reset_sliders()
+        self.update_parameters(self.pipeline.parameters)
 
     def reset_parameters(self):
         """reset sliders to default parameters"""
@@ -91,6 +76,8 @@ class InteractivePipeMatplotlib(InteractivePipeGUI):
 
 
 class MainWindow(MatplotlibWindow):
+    use_blit = True
+
     def __init__(self,  controls=[], name="", pipeline=None, size: Optional[Union[str, int, Tuple[int, int]]] = None, style: str = None, rc_params=None, main_gui=None, **kwargs):
         if size is not None and isinstance(size, int):
             size = (size, size)
@@ -106,13 +93,27 @@ class MainWindow(MatplotlibWindow):
         self.init_sliders()
 
     def reset_sliders(self):
-        self.__wipe_sliders()
-        self.init_sliders()
+        """Reflect the controls values into the existing widgets then refresh once"""
+        for slider_name, widget in self.sliders_list.items():
+            self.set_widget_value(widget, self.ctrl[slider_name])
+        self.need_redraw = True
         self.refresh()
 
-    def __wipe_sliders(self):
-        for ax in self.axes_controls:
-            ax.remove()
+    @staticmethod
+    def set_widget_value(widget, ctrl) -> None:
+        """Update a widget in place without triggering its callbacks (no pipeline run)"""
+        widget.eventson = False
+        try:
+            if isinstance(widget, Slider):
+                widget.set_val(ctrl.value)
+            elif isinstance(widget, CheckButtons):
+                if widget.get_status()[0] != ctrl.value:
+                    widget.set_active(0)
+            elif isinstance(widget, RadioButtons):
+                if ctrl.value in ctrl.value_range and widget.value_selected != ctrl.value:
+                    widget.set_active(ctrl.value_range.index(ctrl.value))
+        finally:
+            widget.eventson = True
 
     def init_sliders(self, dry_run_only=False):
         plt.subplots_adjust(left=0, top=1, bottom=0, right=1)
@@ -170,6 +171,8 @@ class MainWindow(MatplotlibWindow):
                 slider_instance = control_factory.create_control(
                     ctrl, self.update_parameter, ax_control=ax_control)
                 slider = slider_instance.create()
+                if self.use_blit and isinstance(slider, Slider):
+                    slider.drawon = False
                 # needed to keep the object alive
                 self.sliders_list[slider_name] = slider
         self.next_slider_position -= self.footer_space
@@ -180,6 +183,9 @@ class MainWindow(MatplotlibWindow):
         self.ctrl[idx].update(value)
         if self.ctrl[idx]._type == bool or self.ctrl[idx]._type == str:
             self.need_redraw = True
+        elif self.use_blit and idx in self.sliders_list:
+            # Only the moved slider is redrawn (sliders do not trigger a full figure draw)
+            self.blit_manager.redraw_axes(self.sliders_list[idx].ax)
         self.refresh()
 
     def key_update_parameter(self, idx, down):
@@ -190,13 +196,3 @@ class MainWindow(MatplotlibWindow):
             self.ctrl[idx].on_key_up()
         self.need_redraw = True
         self.refresh()
-
-    def refresh(self):
-        if not hasattr(self, "need_redraw"):
-            self.need_redraw = False
-        if self.pipeline is not None:
-            out = self.pipeline.run()
-            self.refresh_display(out)
-        if self.need_redraw:
-            plt.draw()
-        self.need_redraw = False
@@ -3,9 +3,13 @@ from interactive_pipe.graphical.window import InteractivePipeWindow
 import numpy as np
 import matplotlib as mpl
 from interactive_pipe.data_objects.curves import Curve
+from interactive_pipe.graphical.blit import BlitManager, axes_state, curve_artists, update_curve
 
 
 class MatplotlibWindow(InteractivePipeWindow):
+    # Blitting: only redraw the images & curves which changed on top of a cached background.
+    # Requires an interactive canvas (not used for static figures displayed in notebooks).
+    use_blit = False
     def __init__(self,  controls=[], name="", pipeline=None, size=None, style: str = None, rc_params=None):
         """
         style: dark_background, seaborn-v0_8-dark
@@ -21,6 +25,9 @@ class MatplotlibWindow(InteractivePipeWindow):
         """
         super().__init__(self, size=size, pipeline=pipeline, name=name)
         self.controls = controls
+        self.need_redraw = False
+        self.changed_artists = []
+        self._blit_manager = None
         if style is not None:
             mpl.style.use(style)
         if rc_params is not None:
@@ -33,9 +40,21 @@ class MatplotlibWindow(InteractivePipeWindow):
         self.image_canvas[row][col] = {"ax": ax_img}
 
     def delete_image_placeholder(self, ax):
+        if self._blit_manager is not None and "data" in ax:
+            self._blit_manager.remove_artists(self.cell_artists(ax["data"]))
         ax["ax"].remove()
         self.need_redraw = True
 
+    @property
+    def blit_manager(self) -> BlitManager:
+        if self._blit_manager is None:
+            self._blit_manager = BlitManager(self.fig.canvas)
+        return self._blit_manager
+
+    @staticmethod
+    def cell_artists(data) -> list:
+        return curve_artists(data) if isinstance(data, list) else [data]
+
     def update_style(self, ax: plt.Axes, style: dict = {}):
         if style is None:
             return
@@ -54,27 +73,53 @@ class MatplotlibWindow(InteractivePipeWindow):
         img = self.convert_image(image_array)
         current_style = self.get_current_style(row, col)
         data = ax_dict.get("data", None)
+        previous_state = axes_state(ax_dict["ax"])
         if data:
             if isinstance(img, np.ndarray):
+                if data.get_array().shape != img.shape:
+                    # image extent needs to be updated
+                    data.set_extent((-0.5, img.shape[1]-0.5, img.shape[0]-0.5, -0.5))
+                    self.need_redraw = True
                 data.set_data(img)
             elif isinstance(img, Curve):
-                img.update_plot(data, ax=ax_dict["ax"])
+                if self.use_blit:
+                    self.need_redraw |= update_curve(img, data, ax_dict["ax"])
+                else:
+                    img.update_plot(data, ax=ax_dict["ax"])
         else:
             if isinstance(img, np.ndarray):
                 ax_dict["data"] = ax_dict["ax"].imshow(img)
             elif isinstance(img, Curve):
                 ax_dict["data"] = img.create_plot(ax=ax_dict["ax"])
-        if not (isinstance(img, Curve) and img.data["title"] is not None):
+            if self.use_blit:
+                self.blit_manager.add_artists(self.cell_artists(ax_dict["data"]))
+            self.need_redraw = True
+        # Curves with their own title are not styled by the output styles
+        ax_dict["styled"] = not (isinstance(img, Curve) and img.data["title"] is not None)
+        if ax_dict["styled"]:
             self.update_style(ax_dict["ax"], style=current_style)
+        if axes_state(ax_dict["ax"]) != previous_state:
+            self.need_redraw = True
+        self.changed_artists.extend(self.cell_artists(ax_dict["data"]))
+
+    def update_cell_style(self, row, col):
+        ax_dict = self.image_canvas[row][col]
+        if not ax_dict.get("styled", False):
+            return
+        previous_state = axes_state(ax_dict["ax"])
+        self.update_style(ax_dict["ax"], style=self.get_current_style(row, col))
+        if axes_state(ax_dict["ax"]) != previous_state:
+            self.need_redraw = True
 
     def refresh(self):
-        if not hasattr(self, "need_redraw"):
-            self.need_redraw = False
+        self.changed_artists = []
         if self.pipeline is not None:
             out = self.pipeline.run()
             self.refresh_display(out)
         if self.need_redraw:
             plt.draw()
+        elif self.use_blit and self.changed_artists:
+            self.blit_manager.update(self.changed_artists)
         self.need_redraw = False
 
     def convert_image(self, img):
@@ -1,23 +1,37 @@
 from interactive_pipe.graphical.gui import InteractivePipeGUI
+import asyncio
+import time
 import matplotlib.pyplot as plt
 from interactive_pipe.headless.control import Control
+from interactive_pipe.graphical.encoding import encode_image
 from typing import List
 from interactive_pipe.graphical.nb_control import ControlFactory
 
 from IPython.display import display
-from ipywidgets import interact
+from ipywidgets import interact, HBox, VBox, Label
+from ipywidgets import Image as ImageWidget
 from interactive_pipe.graphical.mpl_window import MatplotlibWindow
+from interactive_pipe.graphical.window import InteractivePipeWindow
 from typing import Optional, Tuple, Union
 
 
 class InteractivePipeJupyter(InteractivePipeGUI):
-    def init_app(self, **kwargs):
-        self.window = MainWindow(controls=self.controls, name=self.name,
-                                 pipeline=self.pipeline, size=self.size, **kwargs)
+    def init_app(self, fast_display: bool = False, **kwargs):
+        """`fast_display=True` sends the outputs to the browser as encoded images
+        (one `ipywidgets.Image` per cell) instead of rasterizing a matplotlib figure at each change.
+        """
+        self.fast_display = fast_display
+        window_class = ImageWidgetsWindow if fast_display else MainWindow
+        self.window = window_class(controls=self.controls, name=self.name,
+                                   pipeline=self.pipeline, size=self.size, **kwargs)
 
     def run(self) -> None:
-        assert self.pipeline._PipelineCore__initialized_inputs, "Did you forget to initialize the pipeline inputs?"
-        interact(self.window._interact_fn, **self.window.sliders_dict)
+        assert self.pipeline.has_inputs, "Did you forget to initialize the pipeline inputs?"
+        if self.fast_display:
+            self.window.refresh()
+            display(self.window.widget)
+        else:
+            interact(self.window._interact_fn, **self.window.sliders_dict)
         return None  # do not return arrays in a jupyter notebook
 
 # You will need %matplotlib inline
@@ -64,3 +78,127 @@ class MainWindow(MatplotlibWindow):
             out = self.pipeline.run()
             self.create_figure()
             self.refresh_display(out)
+
+
+class ImageWidgetsWindow(InteractivePipeWindow):
+    """Notebook window displaying each output cell in its own `ipywidgets.Image`.
+
+    - outputs are encoded (JPEG/PNG) from the uint8 buffer, no matplotlib figure is rasterized.
+    - only the cells whose output changed are encoded & sent to the browser.
+    - sliders update continuously but pipeline runs are throttled to one every `throttle` seconds,
+    the last value is always rendered.
+    - `cell_size=(h, w)` downscales large images before encoding.
+    - matplotlib styles (`style`, `rc_params`) are not supported, use the default window for them.
+    """
+
+    def __init__(self, controls=[], name="", pipeline=None, size=None,
+                 image_format: str = "jpeg", quality: int = 90, throttle: float = 0.05,
+                 cell_size: Optional[Tuple[int, int]] = None):
+        super().__init__(name=name, pipeline=pipeline, size=size)
+        assert image_format in ["jpeg", "png"], f"{image_format} shall be jpeg or png"
+        self.image_format = image_format
+        self.quality = quality
+        self.throttle = throttle
+        self.cell_size = cell_size
+        self.controls = controls
+        self.canvas_box = VBox([])
+        self._last_refresh = None
+        self._refresh_handle = None
+        self._silent = False
+        self._layout_changed = False
+        self.init_sliders(self.controls)
+        self.widget = VBox(list(self.sliders_dict.values()) + [self.canvas_box])
+
+    def init_sliders(self, controls: List[Control]):
+        self.ctrl = {}
+        control_factory = ControlFactory()
+        self.sliders_dict = {}
+        for ctrl in controls:
+            slider_name = ctrl.name
+            slider_widget = control_factory.create_control(ctrl).create()
+            slider_widget.value = ctrl.value
+            if hasattr(slider_widget, "continuous_update"):
+                slider_widget.continuous_update = True
+            if not slider_widget.description:
+                slider_widget.description = slider_name
+            slider_widget.observe(
+                lambda change, name=slider_name: self.update_parameter(name, change["new"]), names="value")
+            self.sliders_dict[slider_name] = slider_widget
+            self.ctrl[slider_name] = ctrl
+
+    def update_parameter(self, idx, value):
+        self.ctrl[idx].update(value)
+        if not self._silent:
+            self.request_refresh()
+
+    def request_refresh(self):
+        """Refresh now if the last refresh is old enough, otherwise schedule a single trailing refresh"""
+        if self._refresh_handle is not None:
+            # Already scheduled, it will use the latest controls values
+            return
+        now = time.perf_counter()
+        delay = 0. if self._last_refresh is None else self._last_refresh + self.throttle - now
+        if delay <= 0:
+            self.refresh()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (outside of a kernel)
+            self.refresh()
+            return
+        self._refresh_handle = loop.call_later(delay, self.__throttled_refresh)
+
+    def __throttled_refresh(self):
+        self._refresh_handle = None
+        self.refresh()
+
+    def refresh(self):
+        self._last_refresh = time.perf_counter()
+        if self.pipeline is not None:
+            out = self.pipeline.run()
+            self.refresh_display(out)
+
+    def reset_sliders(self):
+        # Widgets are updated silently, the pipeline runs once
+        self._silent = True
+        try:
+            for slider_name, slider_widget in self.sliders_dict.items():
+                slider_widget.value = self.ctrl[slider_name].value
+        finally:
+            self._silent = False
+        self.refresh()
+
+    def display_size(self, row, col) -> Optional[Tuple[int, int]]:
+        return self.cell_size
+
+    def add_image_placeholder(self, row, col):
+        title = Label(self.get_current_style(row, col).get("title", ""))
+        image = ImageWidget(format=self.image_format)
+        self.image_canvas[row][col] = {"title": title, "image": image, "box": VBox([title, image])}
+        self._layout_changed = True
+
+    def delete_image_placeholder(self, img_widget):
+        img_widget["box"].close()
+
+    def set_images(self, image_grid) -> None:
+        super().set_images(image_grid)
+        if self._layout_changed:
+            for row_box in self.canvas_box.children:
+                row_box.close()
+            self.canvas_box.children = [
+                HBox([cell["box"] for cell in row if cell is not None]) for row in self.image_canvas]
+            self._layout_changed = False
+
+    def update_image(self, content, row, col):
+        cell = self.image_canvas[row][col]
+        cell["image"].value = content
+        self.update_cell_style(row, col)
+
+    def update_cell_style(self, row, col):
+        cell = self.image_canvas[row][col]
+        cell["title"].value = self.get_current_style(row, col).get("title", "")
+
+    def convert_image(self, img) -> bytes:
+        """Encode an output (image or curve) to bytes, this runs on the conversion thread pool"""
+        return encode_image(img, image_format=self.image_format, quality=self.quality, figsize=self.size)
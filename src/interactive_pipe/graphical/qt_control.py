@@ -48,6 +48,16 @@ class BaseControl(QWidget):
         raise NotImplementedError(
             "This method should be overridden by subclass to check the right slider control type")
 
+    def reset_silently(self):
+        """Reflect the control value into the widget without emitting signals (no pipeline run)"""
+        widgets = [widget for widget in getattr(self, "control_widgets", [self.control_widget]) if widget is not None]
+        blocked = [widget.blockSignals(True) for widget in widgets]
+        try:
+            self.reset()
+        finally:
+            for widget, was_blocked in zip(widgets, blocked):
+                widget.blockSignals(was_blocked)
+
 
 class ControlFactory:
     @staticmethod
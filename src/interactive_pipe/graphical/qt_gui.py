@@ -9,13 +9,14 @@ from interactive_pipe.graphical.qt_control import ControlFactory
 from interactive_pipe.graphical.window import InteractivePipeWindow
 from interactive_pipe.graphical.gui import InteractivePipeGUI
 from interactive_pipe.headless.control import Control
+from interactive_pipe.headless.stream import StreamPlayer
 import logging
 PYQTVERSION = None
 MPL_SUPPORT = False
 
 try:
     from PySide6.QtWidgets import QApplication, QWidget, QLabel, QFormLayout, QGridLayout, QHBoxLayout, QVBoxLayout, QHBoxLayout, QMessageBox
-    from PySide6.QtCore import QUrl, Qt
+    from PySide6.QtCore import QUrl, Qt, QTimer
     from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
     from PySide6.QtGui import QPixmap, QImage, QIcon
     PYQTVERSION = 6
@@ -25,7 +26,7 @@ except:
 if not PYQTVERSION:
     try:
         from PyQt6.QtWidgets import QApplication, QWidget, QLabel, QFormLayout, QGridLayout, QHBoxLayout, QVBoxLayout, QHBoxLayout, QMessageBox
-        from PyQt6.QtCore import QUrl, Qt
+        from PyQt6.QtCore import QUrl, Qt, QTimer
         from PyQt6.QtMultimedia import QAudioOutput, QMediaPlayer
         from PyQt6.QtGui import QPixmap, QImage, QIcon
         PYQTVERSION = 6
@@ -33,7 +34,7 @@ if not PYQTVERSION:
         logging.warning("Cannot import PyQt 6")
         try:
             from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QFormLayout, QGridLayout, QHBoxLayout, QVBoxLayout, QHBoxLayout, QMessageBox
-            from PyQt5.QtCore import QUrl, Qt
+            from PyQt5.QtCore import QUrl, Qt, QTimer
             from PyQt5.QtGui import QPixmap, QImage, QIcon
             from PyQt5.QtMultimedia import QMediaPlayer, QAudioOutput, QMediaContent
             PYQTVERSION = 5
@@ -46,6 +47,7 @@ try:
         FigureCanvas, NavigationToolbar2QT as NavigationToolbar)
     from matplotlib.figure import Figure
     from interactive_pipe.data_objects.curves import Curve
+    from interactive_pipe.graphical.blit import BlitManager, curve_artists, refresh_curve
     MPL_SUPPORT = True
 except:
     logging.warning("No support for Matplotlib widgets for Qt")
@@ -66,16 +68,35 @@ class InteractivePipeQT(InteractivePipeGUI):
         self.set_default_key_bindings()
 
     def run(self) -> list:
-        assert self.pipeline._PipelineCore__initialized_inputs, "Did you forget to initialize the pipeline inputs?"
+        assert self.pipeline.has_inputs, "Did you forget to initialize the pipeline inputs?"
+        self.stream = StreamPlayer(self.pipeline)
+        if self.stream.active:
+            self.play_stream()
         self.window.refresh()
         ret = self.app.exec()
         self.custom_end()
         return self.pipeline.results
 
+    def play_stream(self):
+        """Play frame sources inputs at their frame rate, late frames are dropped"""
+        self.stream.start()
+        self.stream_timer = QTimer(self.window)
+        self.stream_timer.setInterval(max(int(1000 / self.stream.fps), 1))
+        self.stream_timer.timeout.connect(self.play_next_frame)
+        self.stream_timer.start()
+
+    def play_next_frame(self):
+        if self.stream.tick():
+            self.window.refresh()
+        if self.stream.finished:
+            self.stream_timer.stop()
+            logging.info(f"End of stream - {self.stream.dropped_frames} dropped frames")
+
     def set_default_key_bindings(self):
         self.key_bindings = {**{
             "f1": self.help,
             "f11": self.toggle_full_screen,
+            "z": self.toggle_full_resolution,
             "r": self.reset_parameters,
             "w": self.save_images,
             "o": self.load_parameters,
@@ -87,6 +108,7 @@ class InteractivePipeQT(InteractivePipeGUI):
 
     def close(self):
         """close GUI"""
+        super().close()
         self.app.quit()
 
     def reset_parameters(self):
@@ -99,19 +121,7 @@ class InteractivePipeQT(InteractivePipeGUI):
     def load_parameters(self):
         """import parameters dictionary from a yaml/json file on disk"""
         super().load_parameters()
-        for widget_idx, widget in self.window.ctrl.items():
-            matched = False
-            for filtname, params in self.pipeline.parameters.items():
-                for param_name in params.keys():
-                    if param_name == widget.parameter_name_to_connect:
-                        print(
-                            f"MATCH & update {filtname} {widget_idx} with {self.pipeline.parameters[filtname][param_name]}")
-                        self.window.ctrl[widget_idx].update(
-                            self.pipeline.parameters[filtname][param_name])
-                        matched = True
-            assert matched, f"could not match widget {widget_idx} with parameter to connect {widget.parameter_name_to_connect}"
-        print("------------")
-        self.window.reset_sliders()
+        self.update_parameters(self.pipeline.parameters)
 
     def print_message(self, message_list: List[str]):
         print("\n".join(message_list))
@@ -134,6 +144,11 @@ class InteractivePipeQT(InteractivePipeGUI):
             else:  # Go back to normal size
                 self.window.update_window()
 
+    def toggle_full_resolution(self):
+        """toggle full resolution images (images are otherwise fitted to the window)"""
+        self.window.full_resolution = not self.window.full_resolution
+        self.window.redisplay()
+
     # ---------------------------- AUDIO FEATURE ----------------------------------------
 
     def audio_player(self):
@@ -211,6 +226,16 @@ class MainWindow(QWidget, InteractivePipeWindow):
         InteractivePipeWindow.__init__(
             self, name=name, pipeline=pipeline, size=size)
         self.main_gui = main_gui
+        self.conversion_buffers = {}
+        # (height, width) available for the images grid, measured on the GUI thread at each refresh
+        self.display_area = None
+        self.title_height = 0
+        self.full_resolution = False
+        self.user_resized = False
+        # Resizing is debounced: images are converted again once the user stops resizing
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.timeout.connect(self.redisplay)
         self.pipeline.global_params["__window"] = self
         self.setWindowTitle(self.name)
 
@@ -238,7 +263,7 @@ class MainWindow(QWidget, InteractivePipeWindow):
             self.layout_obj.addRow(self.image_grid_layout)
 
         self.init_sliders(controls)
-        # if self.pipeline._PipelineCore__initialized_inputs:
+        # if self.pipeline.has_inputs:
         #     # cannot refresh the pipeline if no input has been provided! ... not ok for inputless pipeline though!
         #     self.refresh()
         # # You will refresh the window  at the app level, only when running. no need to run the pipeline engine to initalize the GUI
@@ -258,6 +283,7 @@ class MainWindow(QWidget, InteractivePipeWindow):
             assert "full" in _size.lower() or "max" in _size.lower(
             ), f"size={_size} can only be among (full, fullscreen, maximized, max, maximum)"
         self._size = _size
+        self.invalidate_display()
         self.update_window()
 
     def update_window(self):
@@ -286,6 +312,19 @@ class MainWindow(QWidget, InteractivePipeWindow):
         self.showMaximized()
         self.full_screen_flag = False
 
+    def resizeEvent(self, event):
+        QWidget.resizeEvent(self, event)
+        if event.spontaneous():
+            # Resized by the user or the window manager (not by new images): fit the images to the window
+            self.user_resized = True
+            self.resize_timer.start(100)
+
+    def redisplay(self):
+        """Convert the last results again for the current display size (the pipeline does not run)"""
+        self.invalidate_display()
+        if self.pipeline is not None and self.pipeline.results is not None:
+            self.refresh_display(self.pipeline.results)
+
     def keyPressEvent(self, event):
         mapped_str = None
 
@@ -415,6 +454,8 @@ class MainWindow(QWidget, InteractivePipeWindow):
         for obj_key, img_widget in img_widget_dict.items():
             if obj_key == "plot_object":
                 img_widget = None
+            elif obj_key == "blit" and img_widget is not None:
+                img_widget.disconnect()
             elif obj_key == "ax_placeholder" and img_widget is not None:
                 img_widget.remove()
             elif img_widget is not None:
@@ -422,52 +463,108 @@ class MainWindow(QWidget, InteractivePipeWindow):
 
     def update_image(self, image_array_original, row, col):
         if isinstance(image_array_original, np.ndarray):
-            if len(image_array_original.shape) == 2:
+            image_array = np.ascontiguousarray(image_array_original)
+            if len(image_array.shape) == 2:
                 # Consider black & white
-                image_array = image_array_original.copy()
-                c = 3
-                image_array = np.expand_dims(image_array, axis=-1)
-                image_array = np.repeat(image_array, c, axis=-1)
-            elif len(image_array_original.shape) == 3:
-                assert isinstance(image_array_original, np.ndarray)
-                assert (image_array_original.shape[-1]) == 3
-                image_array = image_array_original
+                h, w = image_array.shape
+                image = QImage(image_array.data, w, h, w,
+                               QImage.Format.Format_Grayscale8)
+            elif len(image_array.shape) == 3:
+                assert (image_array.shape[-1]) == 3
+                h, w, c = image_array.shape
+                bytes_per_line = c * w
+                image = QImage(image_array.data, w, h, bytes_per_line,
+                               QImage.Format.Format_RGB888)
             else:
                 raise NotImplementedError(
                     f"{image_array_original.shape}4 dimensions image or more like burst are not supported")
-            h, w, c = image_array.shape
-            bytes_per_line = c * w
-            image = QImage(image_array.data, w, h, bytes_per_line,
-                           QImage.Format.Format_RGB888)
+            # QPixmap copies the data, conversion buffers can be reused
             pixmap = QPixmap.fromImage(image)
             image_label = self.image_canvas[row][col]["image"]
             image_label.setPixmap(pixmap)
         else:
             image_array = image_array_original
             if MPL_SUPPORT and isinstance(image_array, Curve):
-                image_label = FigureCanvas(Figure(figsize=(10, 10)))
                 if self.image_canvas[row][col]["ax_placeholder"] is None:
+                    # A single persistent canvas per cell
+                    image_label = FigureCanvas(Figure(figsize=(10, 10)))
                     ax_placeholder = image_label.figure.subplots()
                     self.image_canvas[row][col]["image"] = image_label
                     self.image_grid_layout.addWidget(
                         image_label, 2*row+1, col, alignment=Qt.AlignCenter)
                     self.image_canvas[row][col]["ax_placeholder"] = ax_placeholder
+                    self.image_canvas[row][col]["blit"] = BlitManager(image_label)
                 ax = self.image_canvas[row][col]["ax_placeholder"]
+                blit_manager = self.image_canvas[row][col]["blit"]
                 plt_obj = self.image_canvas[row][col].get("plot_object", None)
                 if plt_obj is None:
-                    self.image_canvas[row][col]["plot_object"] = image_array.create_plot(
-                        ax=ax)
+                    plt_obj = image_array.create_plot(ax=ax)
+                    self.image_canvas[row][col]["plot_object"] = plt_obj
+                    blit_manager.add_artists(curve_artists(plt_obj))
+                    blit_manager.draw()
                 else:
-                    image_array.update_plot(plt_obj, ax=ax)
-                    ax.figure.canvas.draw()
+                    # Only the lines are redrawn unless axes limits or texts changed
+                    refresh_curve(image_array, plt_obj, ax, blit_manager)
+        self.update_cell_style(row, col)
 
+    def update_cell_style(self, row, col):
         text_label = self.image_canvas[row][col]["title"]
         text_label.setText(self.get_current_style(row, col).get("title", ""))
 
+    def refresh_display(self, _out) -> None:
+        # Qt objects shall only be queried from the GUI thread (cells are converted on a thread pool)
+        self.display_area = self.available_display_area()
+        self.title_height = self.fontMetrics().height()
+        super().refresh_display(_out)
+
+    def available_display_area(self):
+        """(height, width) available for the images grid, None to display images at full resolution.
+        The window area once its size is set (given size, maximized, full screen, resized by the user),
+        otherwise the screen area: the window then grows with the images.
+        """
+        if self.full_resolution:
+            return None
+        if self.size is not None or self.user_resized:
+            # Space used by the sliders below the images
+            controls_height = max(self.layout_obj.sizeHint().height() - self.image_grid_layout.sizeHint().height(), 0)
+            return (max(self.height() - controls_height, 1), max(self.width(), 1))
+        screen = QApplication.primaryScreen()
+        if screen is None:
+            return None
+        geometry = screen.availableGeometry()
+        return (geometry.height(), geometry.width())
+
+    def display_size(self, row, col):
+        if self.display_area is None or self.image_canvas is None:
+            return None
+        rows = len(self.image_canvas)
+        cols = max([len(image_row) for image_row in self.image_canvas])
+        return (max(self.display_area[0] // rows - self.title_height, 1), max(self.display_area[1] // cols, 1))
+
+    def convert_cell(self, out_im, row, col):
+        if not isinstance(out_im, np.ndarray):
+            return out_im
+        out_im = self.fit_to_display(out_im, row, col)
+        # Reuse the conversion buffers of the cell from one frame to the next
+        buffers = self.conversion_buffers.get((row, col), None)
+        if buffers is None or buffers[0].shape != out_im.shape:
+            buffers = (np.empty(out_im.shape, dtype=np.float32),
+                       np.empty(out_im.shape, dtype=np.uint8))
+            self.conversion_buffers[(row, col)] = buffers
+        return self.convert_image(out_im, *buffers)
+
     @staticmethod
-    def convert_image(out_im):
+    def convert_image(out_im, scratch=None, converted=None):
+        """[0, 1] float image to uint8 using in-place operations (no temporary arrays)"""
         if isinstance(out_im, np.ndarray):
-            return (out_im.clip(0., 1.) * 255).astype(np.uint8)
+            if scratch is None:
+                scratch = np.empty(out_im.shape, dtype=np.float32)
+            if converted is None:
+                converted = np.empty(out_im.shape, dtype=np.uint8)
+            np.clip(out_im, 0., 1., out=scratch, casting="unsafe")
+            scratch *= 255.
+            np.copyto(converted, scratch, casting="unsafe")
+            return converted
         else:
             return out_im
 
@@ -477,8 +574,9 @@ class MainWindow(QWidget, InteractivePipeWindow):
             self.refresh_display(out)
 
     def reset_sliders(self):
+        """Reflect the controls values into the widgets then refresh once"""
         for widget_idx, ctrl in self.ctrl.items():
             if widget_idx in self.widget_list.keys():
-                self.widget_list[widget_idx].reset()
+                self.widget_list[widget_idx].reset_silently()
             self.update_label(widget_idx)
         self.refresh()
@@ -0,0 +1,547 @@
+from interactive_pipe.graphical.gui import InteractivePipeGUI
+from interactive_pipe.graphical.window import InteractivePipeWindow
+from interactive_pipe.graphical.websocket import WebSocketConnection, accept_key, handshake_error, OPCODE_TEXT, MAX_MESSAGE_SIZE
+from interactive_pipe.graphical.encoding import encode_image, IMAGE_FORMATS
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.control import Control
+from interactive_pipe.headless.keyboard import KeyboardControl
+from interactive_pipe.data_objects.image import Image
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: sans-serif; background: #222; color: #ddd; margin: 8px; }
+#controls div { margin: 2px 0; }
+#controls label { display: inline-block; min-width: 200px; }
+#controls input[type=range] { width: 400px; vertical-align: middle; }
+#canvas { margin-top: 8px; }
+.row { display: flex; justify-content: center; gap: 8px; }
+.cell { text-align: center; }
+.cell img { max-width: 100%; }
+#message { white-space: pre-wrap; }
+</style>
+</head>
+<body>
+<div id="controls"></div>
+<div id="canvas"></div>
+<pre id="message"></pre>
+<script>
+const KEYS = {ArrowUp: "up", ArrowDown: "down", ArrowLeft: "left", ArrowRight: "right",
+              PageUp: "pageup", PageDown: "pagedown"};
+const ws = new WebSocket(`ws://${location.host}/ws`);
+ws.binaryType = "arraybuffer";
+let mime = "image/jpeg";
+let cells = {};
+let inputs = {};
+
+function send(message) {
+  if (ws.readyState === WebSocket.OPEN) ws.send(JSON.stringify(message));
+}
+
+function sendViewport() {
+  const canvas = document.getElementById("canvas");
+  send({type: "resize", width: canvas.clientWidth,
+        height: Math.max(window.innerHeight - canvas.getBoundingClientRect().top, 1)});
+}
+
+function buildControls(controls) {
+  const container = document.getElementById("controls");
+  container.innerHTML = "";
+  inputs = {};
+  for (const ctrl of controls) {
+    const row = document.createElement("div");
+    const label = document.createElement("label");
+    label.textContent = ctrl.name;
+    row.appendChild(label);
+    let input;
+    if (ctrl.type === "str") {
+      input = document.createElement("select");
+      for (const option of ctrl.options) input.add(new Option(option, option));
+      input.onchange = () => send({type: "control", name: ctrl.name, value: input.value});
+    } else if (ctrl.type === "bool") {
+      input = document.createElement("input");
+      input.type = "checkbox";
+      input.onchange = () => send({type: "control", name: ctrl.name, value: input.checked});
+    } else {
+      input = document.createElement("input");
+      input.type = "range";
+      input.min = ctrl.min;
+      input.max = ctrl.max;
+      input.step = ctrl.step;
+      const value = document.createElement("span");
+      input.oninput = () => {
+        value.textContent = input.value;
+        send({type: "control", name: ctrl.name, value: Number(input.value)});
+      };
+      input.valueLabel = value;
+    }
+    row.appendChild(input);
+    if (input.valueLabel) row.appendChild(input.valueLabel);
+    container.appendChild(row);
+    inputs[ctrl.name] = input;
+  }
+  setValues(Object.fromEntries(controls.map((ctrl) => [ctrl.name, ctrl.value])));
+}
+
+function setValues(values) {
+  for (const [name, value] of Object.entries(values)) {
+    const input = inputs[name];
+    if (input === undefined) continue;
+    if (input.type === "checkbox") input.checked = value;
+    else input.value = value;
+    if (input.valueLabel) input.valueLabel.textContent = value;
+  }
+}
+
+function buildLayout(layout) {
+  mime = layout.mime;
+  const canvas = document.getElementById("canvas");
+  const previous = cells;
+  canvas.innerHTML = "";
+  cells = {};
+  layout.rows.forEach((titles, row) => {
+    const rowDiv = document.createElement("div");
+    rowDiv.className = "row";
+    titles.forEach((title, col) => {
+      if (title === null) return;
+      const key = `${row},${col}`;
+      const cell = document.createElement("div");
+      cell.className = "cell";
+      const caption = document.createElement("div");
+      caption.textContent = title;
+      const img = (previous[key] || {}).img || document.createElement("img");
+      cell.appendChild(caption);
+      cell.appendChild(img);
+      rowDiv.appendChild(cell);
+      cells[key] = {img: img};
+    });
+    canvas.appendChild(rowDiv);
+  });
+}
+
+function showCell(buffer) {
+  const view = new DataView(buffer);
+  const cell = cells[`${view.getUint16(0)},${view.getUint16(2)}`];
+  if (cell === undefined) return;
+  const previousUrl = cell.url;
+  cell.url = URL.createObjectURL(new Blob([buffer.slice(4)], {type: mime}));
+  cell.img.src = cell.url;
+  if (previousUrl) URL.revokeObjectURL(previousUrl);
+}
+
+ws.onopen = sendViewport;
+ws.onclose = () => { document.getElementById("message").textContent = "Disconnected"; };
+ws.onmessage = (event) => {
+  if (typeof event.data !== "string") {
+    showCell(event.data);
+    return;
+  }
+  const message = JSON.parse(event.data);
+  if (message.type === "controls") buildControls(message.controls);
+  else if (message.type === "layout") buildLayout(message);
+  else if (message.type === "values") setValues(message.values);
+  else if (message.type === "message") document.getElementById("message").textContent = message.text;
+};
+window.onresize = sendViewport;
+window.onkeydown = (event) => {
+  const target = event.target;
+  if (target.tagName === "SELECT" || (target.tagName === "INPUT" && target.type === "range" && event.key in KEYS)) return;
+  const key = KEYS[event.key] || event.key.toLowerCase();
+  if (event.key in KEYS || /^f[0-9]+$/.test(key) || key === " ") event.preventDefault();
+  send({type: "key", key: key});
+};
+</script>
+</body>
+</html>
+"""
+
+
+class InteractivePipeWeb(InteractivePipeGUI):
+    """Browser based GUI served by a local HTTP server (standard library only).
+
+    Useful to tune pipelines running on a remote/headless machine:
+    open `http://host:port/` (ssh port forwarding works well).
+    - controls are built in the page from the `Control` objects
+    - outputs are encoded (`image_format` jpeg/png/webp) & streamed over a WebSocket
+    - only the cells which changed are sent
+    - controls changes received while the pipeline runs are coalesced: only the latest values are rendered
+    - images & parameters are saved to `save_folder` on the server (no file prompt, the console is not reachable)
+    """
+
+    def init_app(self, host: str = "127.0.0.1", port: int = 8000, save_folder: Union[str, Path] = ".", **kwargs):
+        self.host = host
+        self.port = port
+        self.save_folder = Path(save_folder)
+        self.server = None
+        self._stopped = threading.Event()
+        self.window = WebWindow(controls=self.controls, name=self.name,
+                                pipeline=self.pipeline, size=self.size, main_gui=self, **kwargs)
+        self.set_default_key_bindings()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self) -> str:
+        """Start the server & the rendering thread in the background, returns the page url"""
+        assert self.pipeline.has_inputs, "Did you forget to initialize the pipeline inputs?"
+        self.server = ThreadingHTTPServer((self.host, self.port), WebRequestHandler)
+        self.server.daemon_threads = True
+        self.server.window = self.window
+        self.port = self.server.server_address[1]
+        self._stopped.clear()
+        self.window.start()
+        self.window.request_refresh()
+        threading.Thread(target=self.server.serve_forever, name="web_server", daemon=True).start()
+        return self.url
+
+    def run(self) -> list:
+        url = self.start()
+        print(f"Interactive pipe {self.name} available at {url}")
+        try:
+            self._stopped.wait()
+        except KeyboardInterrupt:
+            self.close()
+        self.custom_end()
+        return self.pipeline.results
+
+    def set_default_key_bindings(self):
+        self.key_bindings = {**{
+            "f1": self.help,
+            "r": self.reset_parameters,
+            "w": self.save_images,
+            "e": self.save_parameters,
+            "i": self.print_parameters,
+            "q": self.close,
+        }, **self.key_bindings}
+
+    def close(self):
+        """close GUI"""
+        super().close()
+        if self.server is not None:
+            server, self.server = self.server, None
+            # shutdown waits for serve_forever, it shall not run in the server thread itself
+            threading.Thread(target=lambda: (server.shutdown(), server.server_close()), daemon=True).start()
+        self.window.stop()
+        self._stopped.set()
+
+    def save_path(self, suffix: str) -> Path:
+        return self.save_folder/f"{self.name or 'pipeline'}_{time.strftime('%Y%m%d_%H%M%S')}{suffix}"
+
+    def save_images(self):
+        """save images to disk"""
+        path = self.save_path(".png")
+        self.pipeline.save(path, data_wrapper_fn=lambda im: Image(
+            im), save_entire_buffer=True, blocking=False)
+        self.print_message([f"Saving images {path.with_name(path.stem + '_*' + path.suffix)}"])
+
+    def save_parameters(self):
+        """export parameters dictionary to a yaml file"""
+        path = self.save_path(".yaml")
+        self.pipeline.export_tuning(path, override=True)
+        self.print_message([f"Parameters saved to {path}"])
+
+    def reset_parameters(self):
+        """reset sliders to default parameters"""
+        super().reset_parameters()
+        for widget_idx, ctrl in self.window.ctrl.items():
+            ctrl.value = ctrl.value_default
+        self.window.reset_sliders()
+
+    def print_message(self, message_list: List[str]):
+        print("\n".join(message_list))
+        self.window.broadcast_message("\n".join(message_list))
+
+
+class WebWindow(InteractivePipeWindow):
+    """Streams the outputs to the connected browsers.
+
+    The pipeline only runs in a dedicated rendering thread:
+    messages received from the browsers are queued, controls values overwrite each other (latest wins)
+    so a slow pipeline never accumulates a backlog of intermediate values.
+    Each frame, only the cells whose output changed are encoded & sent (`[row, col]` header + encoded image).
+    """
+
+    def __init__(self, controls=[], name="", pipeline: HeadlessPipeline = None, size=None, style=None, main_gui=None,
+                 image_format: str = "jpeg", quality: int = 85):
+        super().__init__(name=name, pipeline=pipeline, size=size, style=style)
+        assert image_format in IMAGE_FORMATS, f"{image_format} shall be among {list(IMAGE_FORMATS.keys())}"
+        self.main_gui = main_gui
+        self.image_format = image_format
+        self.quality = quality
+        self.clients: List[WebSocketConnection] = []
+        # last encoded frame of each cell & layout, sent to browsers connecting later
+        self.encoded_cells = {}
+        self.layout = None
+        self.viewport = None
+        self._clients_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pending_controls = {}
+        self._pending_keys = []
+        self._pending_viewport = None
+        self._refresh_requested = False
+        # refresh requests are deferred while a batch of messages is applied: the pipeline runs once
+        self._batching = False
+        self._refresh_pending = False
+        self._render_thread = None
+        self.pipeline.global_params["__window"] = self
+        self.init_sliders(controls)
+
+    def init_sliders(self, controls: List[Control]):
+        self.ctrl = {}
+        for ctrl in controls:
+            self.ctrl[ctrl.name] = ctrl
+            if isinstance(ctrl, KeyboardControl):
+                self.main_gui.bind_keyboard_slider(ctrl, self.key_update_parameter)
+
+    def controls_description(self) -> List[dict]:
+        description = []
+        for name, ctrl in self.ctrl.items():
+            if isinstance(ctrl, KeyboardControl):
+                continue
+            ctrl_description = {"name": name, "type": ctrl._type.__name__, "value": ctrl.value}
+            if ctrl._type == str:
+                ctrl_description["options"] = list(ctrl.value_range)
+            elif ctrl._type in [int, float]:
+                ctrl_description["min"], ctrl_description["max"] = ctrl.value_range
+                step = ctrl.step
+                if step is None:
+                    step = 1 if ctrl._type == int else (ctrl.value_range[1] - ctrl.value_range[0]) / 1000
+                ctrl_description["step"] = step
+            description.append(ctrl_description)
+        return description
+
+    # --------------------------------------------------------------------- Messages (any thread)
+    def handle_message(self, message: dict) -> None:
+        message_type = message.get("type", None)
+        if message_type == "control":
+            with self._pending_lock:
+                self._pending_controls[message["name"]] = message["value"]
+        elif message_type == "key":
+            with self._pending_lock:
+                self._pending_keys.append(message["key"])
+        elif message_type == "resize":
+            with self._pending_lock:
+                self._pending_viewport = (int(message["height"]), int(message["width"]))
+        else:
+            logging.warning(f"Unknown message {message}")
+            return
+        self._wake.set()
+
+    def request_refresh(self) -> None:
+        with self._pending_lock:
+            self._refresh_requested = True
+        self._wake.set()
+
+    # --------------------------------------------------------------------- Rendering thread
+    def start(self) -> None:
+        self._stop.clear()
+        self._render_thread = threading.Thread(target=self.render_loop, name="web_render", daemon=True)
+        self._render_thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        with self._clients_lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            client.close()
+
+    def render_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait()
+            with self._pending_lock:
+                self._wake.clear()
+                controls, self._pending_controls = self._pending_controls, {}
+                keys, self._pending_keys = self._pending_keys, []
+                refresh, self._refresh_requested = self._refresh_requested, False
+                viewport, self._pending_viewport = self._pending_viewport, None
+            if self._stop.is_set():
+                break
+            if viewport is not None and viewport != self.viewport:
+                self.viewport = viewport
+                # All cells shall be converted again at the new size
+                self.invalidate_display()
+                refresh = True
+            try:
+                self._batching = True
+                self._refresh_pending = bool(controls or refresh)
+                try:
+                    for name, value in controls.items():
+                        self.update_parameter(name, value)
+                    for key in keys:
+                        # key events are only set during the run they trigger, it can't be deferred
+                        self.main_gui.on_press(key, refresh_func=self.render)
+                finally:
+                    self._batching = False
+                # a key event run already rendered the updates applied before it
+                if self._refresh_pending:
+                    self.render()
+            except Exception as exc:
+                logging.exception("Pipeline failure")
+                self.broadcast_message(f"{type(exc).__name__}: {exc}")
+
+    def update_parameter(self, idx, value):
+        if idx not in self.ctrl:
+            logging.warning(f"Unknown control {idx}")
+            return
+        self.ctrl[idx].update(self.ctrl[idx]._type(value))
+
+    def key_update_parameter(self, idx, down):
+        """Required implementation for keyboard sliders update"""
+        if down:
+            self.ctrl[idx].on_key_down()
+        else:
+            self.ctrl[idx].on_key_up()
+        self.refresh()
+
+    def refresh(self):
+        if self._batching:
+            self._refresh_pending = True
+            return
+        self.render()
+
+    def render(self):
+        self._refresh_pending = False
+        if self.pipeline is not None:
+            out = self.pipeline.run()
+            self.refresh_display(out)
+
+    def reset_sliders(self):
+        self.broadcast_text(json.dumps({"type": "values", "values": {
+            ctrl_description["name"]: ctrl_description["value"] for ctrl_description in self.controls_description()}}))
+        self.refresh()
+
+    # --------------------------------------------------------------------- Display
+    def display_size(self, row, col) -> Optional[Tuple[int, int]]:
+        if self.viewport is None or self.image_canvas is None:
+            return None
+        rows, cols = len(self.image_canvas), max(len(image_row) for image_row in self.image_canvas)
+        title_height = 20
+        return (max(self.viewport[0] // rows - title_height, 1), max(self.viewport[1] // cols, 1))
+
+    def convert_image(self, img) -> bytes:
+        return encode_image(img, image_format=self.image_format, quality=self.quality, figsize=self.size)
+
+    def add_image_placeholder(self, row, col):
+        self.image_canvas[row][col] = {"row": row, "col": col}
+
+    def delete_image_placeholder(self, img_widget):
+        with self._clients_lock:
+            self.encoded_cells.pop((img_widget["row"], img_widget["col"]), None)
+
+    def current_layout(self) -> dict:
+        rows = [[None if cell is None else self.get_current_style(row, col).get("title", "")
+                 for col, cell in enumerate(image_row)] for row, image_row in enumerate(self.image_canvas)]
+        return {"type": "layout", "mime": IMAGE_FORMATS[self.image_format], "rows": rows}
+
+    def set_images(self, image_grid) -> None:
+        self.set_image_canvas(image_grid)
+        # The browser shall know the cells before receiving their content
+        layout = self.current_layout()
+        if layout != self.layout:
+            with self._clients_lock:
+                self.layout = layout
+                self.__send_all(json.dumps(layout), OPCODE_TEXT)
+        super().set_images(image_grid)
+
+    def update_image(self, content, row, col):
+        with self._clients_lock:
+            self.encoded_cells[(row, col)] = content
+            self.__send_all(self.cell_message(content, row, col))
+
+    @staticmethod
+    def cell_message(content: bytes, row: int, col: int) -> bytes:
+        return struct.pack(">HH", row, col) + content
+
+    # --------------------------------------------------------------------- Clients
+    def add_client(self, client: WebSocketConnection) -> None:
+        with self._clients_lock:
+            self.clients.append(client)
+            client.send_text(json.dumps({"type": "controls", "controls": self.controls_description()}))
+            if self.layout is not None:
+                client.send_text(json.dumps(self.layout))
+            for (row, col), content in self.encoded_cells.items():
+                client.send_binary(self.cell_message(content, row, col))
+
+    def remove_client(self, client: WebSocketConnection) -> None:
+        with self._clients_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def broadcast_text(self, text: str) -> None:
+        with self._clients_lock:
+            self.__send_all(text, OPCODE_TEXT)
+
+    def broadcast_message(self, text: str) -> None:
+        self.broadcast_text(json.dumps({"type": "message", "text": text}))
+
+    def __send_all(self, payload, opcode=None) -> None:
+        # Requires the clients lock
+        for client in self.clients:
+            if opcode == OPCODE_TEXT:
+                client.send_text(payload)
+            else:
+                client.send_binary(payload)
+        self.clients = [client for client in self.clients if not client.closed]
+
+
+class WebRequestHandler(BaseHTTPRequestHandler):
+    """Serves the page (`/`) and the WebSocket (`/ws`) of the window attached to the server"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        window: WebWindow = self.server.window
+        if self.path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+            self.serve_websocket(window)
+        elif self.path in ["/", "/index.html"]:
+            page = PAGE.replace("__TITLE__", window.name or "interactive pipe").encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+        else:
+            self.send_error(404)
+
+    def serve_websocket(self, window: WebWindow):
+        error = handshake_error(self.headers)
+        if error is not None:
+            self.send_error(*error)
+            return
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept_key(self.headers["Sec-WebSocket-Key"]))
+        self.end_headers()
+        self.wfile.flush()
+        client = WebSocketConnection(self.rfile, self.wfile, max_message_size=MAX_MESSAGE_SIZE)
+        window.add_client(client)
+        try:
+            while True:
+                message = client.receive()
+                if message is None:
+                    break
+                opcode, payload = message
+                if opcode == OPCODE_TEXT:
+                    window.handle_message(json.loads(payload.decode()))
+        finally:
+            window.remove_client(client)
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
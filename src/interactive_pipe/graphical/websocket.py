@@ -0,0 +1,199 @@
+import base64
+import hashlib
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import BinaryIO, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Minimal RFC 6455 implementation (standard library only), enough to talk to a browser on a local network.
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+CLOSE_MESSAGE_TOO_BIG = 1009
+# Browsers only send small json messages (controls, keys), larger messages are refused
+MAX_MESSAGE_SIZE = 1 << 20
+
+
+class MessageTooBig(ValueError):
+    pass
+
+
+def accept_key(key: str) -> str:
+    """Sec-WebSocket-Accept value answering a client Sec-WebSocket-Key"""
+    digest = hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+    return base64.b64encode(digest).decode()
+
+
+def handshake_error(headers: Mapping[str, str]) -> Optional[Tuple[int, str]]:
+    """Validate the headers of a client upgrade request, returns (status code, reason) if it shall be rejected.
+    Browsers always send an Origin, cross site pages (another Origin than the served page Host) are rejected.
+    """
+    key = headers.get("Sec-WebSocket-Key", None)
+    try:
+        valid_key = key is not None and len(base64.b64decode(key, validate=True)) == 16
+    except ValueError:
+        valid_key = False
+    if not valid_key:
+        return 400, "Missing or invalid Sec-WebSocket-Key"
+    if headers.get("Sec-WebSocket-Version", None) != "13":
+        return 400, "Unsupported Sec-WebSocket-Version"
+    if "upgrade" not in headers.get("Connection", "").lower():
+        return 400, "Missing Connection: Upgrade"
+    origin = headers.get("Origin", None)
+    if origin is not None and urlsplit(origin).netloc.lower() != headers.get("Host", "").lower():
+        return 403, "Origin does not match Host"
+    return None
+
+
+def _read_exactly(rfile: BinaryIO, size: int) -> bytes:
+    data = rfile.read(size)
+    if data is None or len(data) < size:
+        raise ConnectionError("WebSocket connection closed")
+    return data
+
+
+def read_frame(rfile: BinaryIO, max_payload: Optional[int] = None) -> Tuple[bool, int, bytes]:
+    """Read a single frame, returns (fin, opcode, unmasked payload)
+    Raises MessageTooBig before reading a payload larger than `max_payload` bytes.
+    """
+    first, second = _read_exactly(rfile, 2)
+    fin = bool(first & 0x80)
+    opcode = first & 0x0F
+    masked = bool(second & 0x80)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", _read_exactly(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", _read_exactly(rfile, 8))[0]
+    if max_payload is not None and length > max_payload:
+        raise MessageTooBig(f"{length} bytes frame exceeds {max_payload} bytes")
+    mask = _read_exactly(rfile, 4) if masked else None
+    payload = _read_exactly(rfile, length) if length else b""
+    if mask is not None:
+        payload = _apply_mask(payload, mask)
+    return fin, opcode, payload
+
+
+def _apply_mask(payload: bytes, mask: bytes) -> bytes:
+    # XOR the whole payload at once with a repeated mask (much faster than byte per byte)
+    repeated_mask = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated_mask, "big")).to_bytes(len(payload), "big")
+
+
+def encode_frame(payload: bytes, opcode: int = OPCODE_BINARY, mask: bool = False) -> bytes:
+    """Encode a single (final) frame. Servers send unmasked frames, clients shall mask them."""
+    header = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header += bytes([mask_bit | length])
+    elif length < 2**16:
+        header += bytes([mask_bit | 126]) + struct.pack(">H", length)
+    else:
+        header += bytes([mask_bit | 127]) + struct.pack(">Q", length)
+    if mask:
+        mask_key = os.urandom(4)
+        return header + mask_key + _apply_mask(payload, mask_key)
+    return header + payload
+
+
+class WebSocketConnection:
+    """Message level WebSocket connection over file-like socket objects.
+
+    - `send_text`/`send_binary` can be called from any thread (writes are serialized).
+    - `receive` returns complete (reassembled) text or binary messages, answers pings
+    and returns None once the connection is closed.
+    Messages larger than `max_message_size` bytes close the connection (status 1009).
+    """
+
+    def __init__(self, rfile: BinaryIO, wfile: BinaryIO, mask: bool = False, max_message_size: Optional[int] = None):
+        self.rfile = rfile
+        self.wfile = wfile
+        self.mask = mask
+        self.max_message_size = max_message_size
+        self.closed = False
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, host: str, port: int, path: str = "/ws", timeout: Optional[float] = None) -> "WebSocketConnection":
+        """Client side connection (used to drive the web backend from scripts & tests)"""
+        sock = socket.create_connection((host, port), timeout=timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        )
+        sock.sendall(request.encode())
+        rfile = sock.makefile("rb")
+        status_line = rfile.readline().decode()
+        headers = {}
+        for line in iter(rfile.readline, b"\r\n"):
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if " 101 " not in status_line or headers.get("sec-websocket-accept") != accept_key(key):
+            sock.close()
+            raise ConnectionError(f"WebSocket handshake failed: {status_line.strip()}")
+        connection = cls(rfile, sock.makefile("wb"), mask=True)
+        connection.socket = sock
+        return connection
+
+    def send(self, payload: bytes, opcode: int) -> None:
+        frame = encode_frame(payload, opcode=opcode, mask=self.mask)
+        with self._write_lock:
+            if self.closed:
+                return
+            try:
+                self.wfile.write(frame)
+                self.wfile.flush()
+            except (OSError, ValueError):
+                self.closed = True
+
+    def send_text(self, text: str) -> None:
+        self.send(text.encode(), OPCODE_TEXT)
+
+    def send_binary(self, payload: bytes) -> None:
+        self.send(payload, OPCODE_BINARY)
+
+    def receive(self) -> Optional[Tuple[int, bytes]]:
+        """Next complete message (opcode, payload), None when the connection is closed"""
+        message_opcode, fragments, received = None, [], 0
+        while not self.closed:
+            max_payload = None if self.max_message_size is None else self.max_message_size - received
+            try:
+                fin, opcode, payload = read_frame(self.rfile, max_payload=max_payload)
+            except MessageTooBig as exc:
+                logging.warning(f"Closing WebSocket connection: {exc}")
+                self.close(CLOSE_MESSAGE_TOO_BIG)
+                return None
+            except (ConnectionError, OSError, ValueError):
+                self.closed = True
+                return None
+            if opcode == OPCODE_CLOSE:
+                self.close()
+                return None
+            if opcode == OPCODE_PING:
+                self.send(payload, OPCODE_PONG)
+                continue
+            if opcode == OPCODE_PONG:
+                continue
+            if opcode != OPCODE_CONTINUATION:
+                message_opcode = opcode
+            fragments.append(payload)
+            received += len(payload)
+            if fin:
+                return message_opcode, b"".join(fragments)
+        return None
+
+    def close(self, status: Optional[int] = None) -> None:
+        if not self.closed:
+            self.send(b"" if status is None else struct.pack(">H", status), OPCODE_CLOSE)
+        self.closed = True
+        if hasattr(self, "socket"):
+            self.socket.close()
@@ -1,6 +1,7 @@
 import logging
 import numpy as np
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
 
 class InteractivePipeWindow():
@@ -11,7 +12,11 @@ class InteractivePipeWindow():
     - It deals with the graphical refresh
     - It allows to refreshes the canvas 
     (displaying two images side by side or four images in a 2x2 square fashion for instance.)
+
+    Output cells are converted for display concurrently on a thread pool
+    (numpy releases the GIL), widgets are only updated from the calling (GUI) thread.
     """
+    conversion_workers = 4
 
     def __init__(self, *args, name=None, pipeline=None, size=None, style=None, **kwargs) -> None:
         self.name = name
@@ -20,6 +25,22 @@ class InteractivePipeWindow():
         if style is not None:
             logging.info("no support for style in Qt backend")
         self.pipeline = pipeline
+        # (buffer name, buffer version) currently displayed in each cell, used to skip unchanged cells
+        self.displayed_buffers = {}
+        self._conversion_pool = None
+
+    @property
+    def conversion_pool(self) -> ThreadPoolExecutor:
+        if self._conversion_pool is None:
+            self._conversion_pool = ThreadPoolExecutor(
+                max_workers=self.conversion_workers, thread_name_prefix="display_conversion")
+        return self._conversion_pool
+
+    def __getstate__(self) -> dict:
+        # The window may be referenced by the pipeline global params: copying a pipeline shall not copy threads
+        state = self.__dict__.copy()
+        state["_conversion_pool"] = None
+        return state
 
     @property
     def size(self):
@@ -28,6 +49,11 @@ class InteractivePipeWindow():
     @size.setter
     def size(self, _size):
         self._size = _size
+        self.invalidate_display()
+
+    def invalidate_display(self) -> None:
+        """Redraw all cells at the next refresh (display size, zoom... changed)"""
+        self.displayed_buffers = {}
 
     def add_image_placeholder(self, row, col):
         raise NotImplementedError
@@ -38,6 +64,52 @@ class InteractivePipeWindow():
     def update_image(self, content, row, col):
         raise NotImplementedError
 
+    def update_cell_style(self, row, col):
+        """Refresh the title & style of a cell whose content is unchanged (styles may change without a new image)"""
+        pass
+
+    def convert_cell(self, content, row, col):
+        """Convert an output buffer for display.
+        Backends can override it to reuse a buffer per cell."""
+        return self.convert_image(self.fit_to_display(content, row, col))
+
+    def display_size(self, row, col) -> Optional[Tuple[int, int]]:
+        """Maximum (height, width) in screen pixels available for a cell, None if unknown"""
+        return None
+
+    @staticmethod
+    def pyramid_factor(shape: tuple, max_size: Tuple[int, int]) -> int:
+        """Smallest power of 2 downscaling factor so that an image fits in max_size"""
+        factor = 1
+        while (shape[0] // factor > max_size[0] or shape[1] // factor > max_size[1]) \
+                and 2 * factor <= min(shape[0], shape[1]):
+            factor *= 2
+        return factor
+
+    @staticmethod
+    def area_downscale(img: np.ndarray, factor: int) -> np.ndarray:
+        """Average factor x factor blocks (pixels at the bottom & right borders may be dropped)
+        The image dtype is kept (integer images are rounded) so the conversion to display is unchanged."""
+        if factor <= 1:
+            return img
+        h, w = img.shape[0] // factor, img.shape[1] // factor
+        blocks = img[:h*factor, :w*factor].reshape(
+            (h, factor, w, factor) + img.shape[2:])
+        averaged = blocks.mean(axis=(1, 3), dtype=np.float32)
+        if np.issubdtype(img.dtype, np.integer):
+            return np.rint(averaged, out=averaged).astype(img.dtype)
+        return averaged.astype(img.dtype, copy=False)
+
+    def fit_to_display(self, content, row, col):
+        """Downscale images larger than the space available on screen before converting them,
+        so the display cost depends on the screen size, not on the image size."""
+        if not isinstance(content, np.ndarray) or content.ndim < 2:
+            return content
+        max_size = self.display_size(row, col)
+        if max_size is None:
+            return content
+        return self.area_downscale(content, self.pyramid_factor(content.shape, max_size))
+
     def get_current_style(self, row, col):
         img_name = self.pipeline.outputs[row][col]
         current_style = self.pipeline.global_params["__output_styles"].get(img_name, {
@@ -62,6 +134,7 @@ class InteractivePipeWindow():
         # Check if the layout has been updated!
         self.check_image_canvas_changes(expected_image_canvas_shape)
         if self.image_canvas is None:
+            self.invalidate_display()
             self.image_canvas = np.empty(expected_image_canvas_shape).tolist()
             for row, image_row in enumerate(image_grid):
                 for col, image_array in enumerate(image_row):
@@ -79,22 +152,66 @@ class InteractivePipeWindow():
                     continue
                 self.update_image(image_array, row, col)
 
+    def output_name(self, row, col):
+        """Name of the pipeline buffer displayed in a cell (None if unknown)"""
+        outputs = getattr(self.pipeline, "outputs", None)
+        if outputs is None:
+            outputs = self.pipeline.filters[-1].outputs
+        if outputs and not isinstance(outputs[0], list):
+            outputs = [outputs]
+        try:
+            return outputs[row][col]
+        except (IndexError, TypeError):
+            return None
+
+    def buffer_version(self, row, col) -> Optional[tuple]:
+        """(name, version) of the buffer displayed in a cell, None if the engine does not track it"""
+        # Only the engine knows if a buffer has been recomputed: filters may write in place
+        # into a preallocated array and return it, the same object then holds new content
+        versions = getattr(self.pipeline, "buffer_versions", None)
+        if not versions:
+            return None
+        name = self.output_name(row, col)
+        if name is None or name not in versions:
+            return None
+        return (name, versions[name])
+
+    def is_displayed(self, row, col) -> bool:
+        """Check if the current version of an output buffer is already displayed in a cell"""
+        version = self.buffer_version(row, col)
+        return version is not None and self.displayed_buffers.get((row, col), None) == version
+
     def refresh_display(self, _out) -> None:
-        out = deepcopy(_out)
         # In case no canvas has been provided
-        if isinstance(out, tuple):
-            out = [list(out)]
-        if out is None:
+        if isinstance(_out, tuple):
+            _out = [list(_out)]
+        if _out is None:
             logging.warning("No output to display")
             return
-        ny, nx = len(out), 0
+        # Shallow copy of the grid, output buffers are not copied
+        out = [list(img_row) if isinstance(img_row, list) else [img_row] for img_row in _out]
+        ny, nx = len(out), max([len(img_row) for img_row in out])
+        self.set_image_canvas(out)
+        to_convert, skipped = [], []
         for idy, img_row in enumerate(out):
-            if isinstance(img_row, list):
-                for idx, _out_img in enumerate(img_row):
-                    if out[idy][idx] is not None:
-                        out[idy][idx] = self.convert_image(out[idy][idx])
-                nx = len(img_row)
-            else:
-                out[idy] = [self.convert_image(out[idy])]
+            for idx, out_img in enumerate(img_row):
+                if out_img is None:
+                    continue
+                if self.is_displayed(idy, idx):
+                    # Same buffer version as the one displayed (served from cache), nothing to redraw
+                    out[idy][idx] = None
+                    skipped.append((idy, idx))
+                    continue
+                self.displayed_buffers[(idy, idx)] = self.buffer_version(idy, idx)
+                to_convert.append((idy, idx))
+        if len(to_convert) > 1 and self.conversion_workers > 1:
+            converted = list(self.conversion_pool.map(
+                lambda cell: self.convert_cell(out[cell[0]][cell[1]], *cell), to_convert))
+        else:
+            converted = [self.convert_cell(out[idy][idx], idy, idx) for idy, idx in to_convert]
+        for (idy, idx), converted_img in zip(to_convert, converted):
+            out[idy][idx] = converted_img
         logging.info(f"{ny} x {nx} figures")
         self.set_images(out)
+        for idy, idx in skipped:
+            self.update_cell_style(idy, idx)
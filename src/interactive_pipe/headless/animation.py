@@ -0,0 +1,134 @@
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+from interactive_pipe.data_objects.image import Image
+
+try:
+    from PIL import Image as PilImage
+except:
+    PilImage = None
+    logging.info("PIL is not available, won't be able to write GIF animations")
+
+try:
+    import cv2
+except:
+    cv2 = None
+    logging.info("cv2 is not available, won't be able to write videos")
+
+GIF_EXTENSIONS = [".gif"]
+VIDEO_FOURCC = {".mp4": "mp4v", ".avi": "MJPG"}
+FRAME_PATTERN = "frame_{:05d}.png"
+
+
+class AnimationWriter:
+    """Encode frames in order on a writer thread, the format is deduced from `out`:
+    - `.gif`: animated GIF (requires PIL), frames are kept until `close`.
+    - `.mp4`/`.avi`: video (requires opencv).
+    - path without extension: PNG sequence in the `out` folder (`frame_00000.png`, ...).
+
+    At most `max_pending` frames wait to be encoded, `write` blocks the caller beyond (backpressure).
+    Encoding errors are raised by the next `write` or by `close`.
+    ```
+    with AnimationWriter("sweep.gif", fps=10) as writer:
+        for frame in frames:
+            writer.write(frame)
+    ```
+    """
+
+    def __init__(self, out: Union[str, Path], fps: float = 25., max_pending: int = 8, loop: int = 0):
+        assert max_pending >= 1
+        self.out = Path(out)
+        self.suffix = self.out.suffix.lower()
+        assert self.suffix in GIF_EXTENSIONS + list(VIDEO_FOURCC.keys()) + [""], \
+            f"Unsupported animation format {self.suffix}"
+        if self.suffix in GIF_EXTENSIONS:
+            assert PilImage is not None, "Writing GIF animations requires PIL"
+        if self.suffix in VIDEO_FOURCC:
+            assert cv2 is not None, "Writing videos requires opencv"
+        self.fps = fps
+        self.loop = loop
+        self.frames_count = 0
+        self.error: Optional[BaseException] = None
+        self._frames = queue.Queue(maxsize=max_pending)
+        self._gif_frames = []
+        self._video = None
+        self._thread = threading.Thread(target=self._encode, name="animation_writer", daemon=True)
+        self._thread.start()
+
+    def write(self, frame: np.ndarray) -> None:
+        if self.error is not None:
+            raise self.error
+        self._frames.put(frame)
+
+    def close(self) -> Path:
+        """Wait for all frames to be encoded, returns the output path"""
+        if self._thread.is_alive():
+            self._frames.put(None)
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.out
+
+    def __enter__(self) -> "AnimationWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._frames.put(None)
+            self._thread.join()
+
+    def _encode(self) -> None:
+        while True:
+            frame = self._frames.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                continue  # keep draining so writers are never blocked
+            try:
+                self._encode_frame(frame)
+                self.frames_count += 1
+            except BaseException as exc:
+                logging.error(f"Could not encode frame {self.frames_count}: {exc}")
+                self.error = exc
+        if self.error is None:
+            try:
+                self._finish()
+            except BaseException as exc:
+                self.error = exc
+        elif self._video is not None:
+            self._video.release()
+
+    def _encode_frame(self, frame: np.ndarray) -> None:
+        if self.suffix == "":
+            if self.frames_count == 0:
+                self.out.mkdir(parents=True, exist_ok=True)
+            Image.save_image(frame, self.out/FRAME_PATTERN.format(self.frames_count))
+            return
+        frame = Image.quantize(np.asarray(frame), precision=8)
+        if self.suffix in GIF_EXTENSIONS:
+            self._gif_frames.append(PilImage.fromarray(frame))
+            return
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        else:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR if frame.shape[-1] == 4 else cv2.COLOR_RGB2BGR)
+        if self._video is None:
+            self.out.parent.mkdir(parents=True, exist_ok=True)
+            self._video = cv2.VideoWriter(str(self.out), cv2.VideoWriter_fourcc(*VIDEO_FOURCC[self.suffix]),
+                                          self.fps, (frame.shape[1], frame.shape[0]))
+            assert self._video.isOpened(), f"Could not open {self.out} for writing"
+        self._video.write(frame)
+
+    def _finish(self) -> None:
+        if self._video is not None:
+            self._video.release()
+        if self._gif_frames:
+            self.out.parent.mkdir(parents=True, exist_ok=True)
+            self._gif_frames[0].save(self.out, save_all=True, append_images=self._gif_frames[1:],
+                                     duration=int(round(1000./self.fps)), loop=self.loop)
+            self._gif_frames = []
@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from interactive_pipe.data_objects.image import Image, ImageWriter
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.manifest import Manifest
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+EXECUTORS = [EXECUTOR_THREAD, EXECUTOR_PROCESS]
+
+_worker = threading.local()
+
+
+def _initialize_worker(pipeline: HeadlessPipeline) -> None:
+    # Each worker (thread or process) owns its own copy of the pipeline (filters values, cache, inputs)
+    _worker.pipeline = deepcopy(pipeline)
+
+
+def _run_worker_pipeline(item: Tuple[str, Optional[list], Optional[dict]]) -> Tuple[str, Any, Optional[dict]]:
+    name, inputs, signature = item
+    if inputs is None:  # up to date, nothing to process
+        return name, None, signature
+    pipeline = _worker.pipeline
+    pipeline.inputs = inputs
+    return name, pipeline.run(), signature
+
+
+def bounded_map(executor: Executor, fn: Callable, iterable: Iterable, max_in_flight: int) -> Iterator:
+    """Lazy ordered `executor.map` keeping at most `max_in_flight` pending tasks.
+
+    Items are pulled from `iterable` only when there's room,
+    so chaining several bounded maps keeps memory flat.
+    """
+    assert max_in_flight >= 1
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def flatten_outputs(outputs: Union[list, tuple, None]) -> list:
+    """Flatten a canvas of outputs (list of rows) and remove empty slots"""
+    if outputs is None:
+        return []
+    flat = []
+    for out in outputs:
+        if isinstance(out, list):
+            flat.extend([elt for elt in out if elt is not None])
+        elif out is not None:
+            flat.append(out)
+    return flat
+
+
+class BatchRunner:
+    """Batch process many inputs with a HeadlessPipeline.
+
+    - inputs are decoded ahead in background threads (paths are loaded with `load_fn`, arrays are kept as is)
+    - processing happens on a thread or process pool, each worker owns a copy of the pipeline
+    - outputs are written asynchronously by an `ImageWriter`
+    Each stage keeps a bounded amount of items in flight so memory stays flat whatever the amount of inputs.
+
+    Outputs are named after the input file name, or after its path relative to `input_root`
+    when inputs from several folders share names (the folders structure is kept in the output folder).
+
+    When a `manifest` path is provided, items whose outputs are already up to date
+    (same input content, tuning and pipeline code) are skipped, so interrupted jobs restart cheaply.
+
+    ```
+    runner = BatchRunner(pipeline, tuning="tuning.yaml", executor="process", manifest="results/manifest.json")
+    stats = runner.run(sorted(Path("images").glob("*.png")), "results")
+    runner = BatchRunner(pipeline, input_root="dataset")
+    stats = runner.run(sorted(Path("dataset").glob("**/*.png")), "results")
+    ```
+    """
+
+    def __init__(
+        self,
+        pipeline: HeadlessPipeline,
+        tuning: Optional[Union[str, Path]] = None,
+        executor: str = EXECUTOR_THREAD,
+        num_workers: int = 4,
+        num_decoders: int = 2,
+        num_writers: int = 2,
+        prefetch: int = 4,
+        load_fn: Callable = Image.load_image,
+        data_wrapper_fn: Optional[Callable] = lambda x: Image(x),
+        manifest: Optional[Union[str, Path]] = None,
+        manifest_save_interval: int = 100,
+        input_root: Optional[Union[str, Path]] = None,
+    ):
+        assert executor in EXECUTORS, f"{executor} shall be among {EXECUTORS}"
+        self.pipeline = pipeline
+        if tuning is not None:
+            self.pipeline.import_tuning(tuning)
+        self.executor = executor
+        self.num_workers = num_workers
+        self.num_decoders = num_decoders
+        self.num_writers = num_writers
+        self.prefetch = prefetch
+        self.load_fn = load_fn
+        self.data_wrapper_fn = data_wrapper_fn
+        self.manifest = None if manifest is None else Manifest(manifest)
+        self.manifest_save_interval = manifest_save_interval
+        self.input_root = None if input_root is None else Path(input_root)
+        self.static_hashes = None
+        self.output_folder = None
+        self.suffix = None
+
+    def item_name(self, index: int, item: Any) -> str:
+        """Unique name of an item within the batch: path relative to `input_root` (without suffix),
+        file name or index"""
+        first = item[0] if isinstance(item, (list, tuple)) and len(item) > 0 else item
+        if isinstance(first, (str, Path)):
+            if self.input_root is not None:
+                return Path(first).relative_to(self.input_root).with_suffix("").as_posix()
+            return Path(first).stem
+        return f"{index:05d}"
+
+    def manifest_key(self, name: str) -> str:
+        return str(self.output_folder/name)
+
+    def decode(self, named_item: Tuple[str, Any]) -> Tuple[str, Optional[list], Optional[dict]]:
+        name, item = named_item
+        signature = None
+        if self.manifest is not None:
+            signature = Manifest.signature(
+                Manifest.hash_input(item), *self.static_hashes)
+            if self.manifest.is_up_to_date(self.manifest_key(name), signature):
+                logging.debug(f"batch: {name} is up to date, skipping")
+                return name, None, signature
+        items = list(item) if isinstance(item, (list, tuple)) else [item]
+        inputs = [self.load_fn(Path(inp)) if isinstance(inp, (str, Path)) else inp
+                  for inp in items]
+        return name, inputs, signature
+
+    def write(self, name: str, outputs: Any, writer: ImageWriter) -> List[Future]:
+        """Submit all outputs of an item to the asynchronous writer"""
+        futures = []
+        output_names = flatten_outputs(self.pipeline.outputs)
+        for out_name, res_current in zip(output_names, flatten_outputs(outputs)):
+            if res_current is None or (isinstance(res_current, list) and len(res_current) == 0):
+                continue
+            current_path = self.output_folder/f"{name}_{out_name}{self.suffix}"
+            if self.data_wrapper_fn is not None and isinstance(res_current, np.ndarray):
+                res_current = self.data_wrapper_fn(res_current)
+            assert hasattr(res_current, "save")
+            futures.append(writer.write_data(res_current, current_path))
+        return futures
+
+    def __worker_pipeline(self) -> HeadlessPipeline:
+        # Controls & GUI objects are not sent to the workers (they hold non picklable callbacks)
+        return self.pipeline.headless_copy()
+
+    def run(self, inputs: Iterable, output_folder: Union[str, Path], suffix: str = ".png") -> dict:
+        """Process all inputs and write outputs to `output_folder`.
+
+        The inputs are listed upfront to check that their names are unique before processing anything.
+        Returns throughput statistics.
+        """
+        self.output_folder = Path(output_folder)
+        self.suffix = suffix
+        pool_class = ThreadPoolExecutor if self.executor == EXECUTOR_THREAD else ProcessPoolExecutor
+        count = 0
+        written = 0
+        skipped = 0
+        if self.manifest is not None:
+            self.pipeline.update_parameters_from_controls()
+            self.static_hashes = (
+                Manifest.hash_tuning(self.pipeline.parameters),
+                Manifest.hash_code(self.pipeline)
+            )
+        tic = time.perf_counter()
+        pending_writes = deque()
+        recorded = 0
+        # Names are checked before any work is submitted: colliding items would overwrite each other's outputs
+        named_items = [(self.item_name(index, item), item) for index, item in enumerate(inputs)]
+        names = set()
+        for name, _ in named_items:
+            if name in names:
+                raise ValueError(
+                    f"batch: several inputs are named {name}, provide an input_root to keep them apart")
+            names.add(name)
+
+        def record_written_item(name: str, futures: List[Future], signature: Optional[dict]) -> int:
+            # Image may modify the path (title), written paths are provided by the futures
+            paths = [future.result() for future in futures]
+            if self.manifest is not None:
+                self.manifest.record(self.manifest_key(name), signature, paths)
+            return len(paths)
+        with ThreadPoolExecutor(max_workers=self.num_decoders) as decode_pool, \
+                pool_class(max_workers=self.num_workers, initializer=_initialize_worker,
+                           initargs=(self.__worker_pipeline(),)) as compute_pool, \
+                ImageWriter(max_workers=self.num_writers, max_pending=2*self.num_writers) as writer:
+            decoded = bounded_map(decode_pool, self.decode,
+                                  named_items, self.prefetch)
+            processed = bounded_map(
+                compute_pool, _run_worker_pipeline, decoded, 2*self.num_workers)
+            try:
+                for name, outputs, signature in processed:
+                    count += 1
+                    if outputs is None:
+                        skipped += 1
+                    else:
+                        pending_writes.append(
+                            (name, self.write(name, outputs, writer), signature))
+                    while pending_writes and all(future.done() for future in pending_writes[0][1]):
+                        written += record_written_item(
+                            *pending_writes.popleft())
+                        recorded += 1
+                        if self.manifest is not None and recorded % self.manifest_save_interval == 0:
+                            self.manifest.save()
+                    logging.info(f"batch: {count} items processed")
+                writer.flush()
+                while pending_writes:
+                    written += record_written_item(*pending_writes.popleft())
+            finally:
+                if self.manifest is not None:
+                    self.manifest.save()
+        elapsed = time.perf_counter() - tic
+        stats = {
+            "items": count,
+            "files": written,
+            "skipped": skipped,
+            "elapsed": elapsed,
+            "throughput": count/elapsed if elapsed > 0 else float("inf"),
+        }
+        logging.info(
+            f"batch: {count} items in {elapsed:.2f}s - {stats['throughput']:.2f} items/s")
+        return stats
@@ -87,6 +87,8 @@ class Control():
 
         self.parameter_name_to_connect = parameter_name_to_connect
         self.filter_to_connect = filter_to_connect
+        # SessionRecorder logging the updates (set by the GUI when recording a session)
+        self.recorder = None
 
     def check_value(self, value):
         if isinstance(value, int) and self._type == float:
@@ -129,6 +131,8 @@ class Control():
     def update(self, new_value):
         # Plug button
         self.value = new_value
+        if self.recorder is not None:
+            self.recorder.record_control(self.name, self.value)
         if self.update_param_func is not None:
             self.update_param_func(self.value)
 
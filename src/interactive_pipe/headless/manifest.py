@@ -0,0 +1,114 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from interactive_pipe.data_objects.parameters import Parameters
+
+
+class Manifest:
+    """Keeps track of what has already been produced by batch runs & saves.
+
+    For each item (usually named after the input), the manifest stores
+    - a signature made of the hashes of the input content, the tuning and the pipeline code
+    - the paths of the produced outputs.
+
+    An item is up to date if its signature did not change and all its outputs still exist on disk,
+    so re-running an interrupted job (or after a small tuning change) only processes what's needed.
+    The manifest is stored as a json file, written atomically.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.entries: Dict[str, dict] = {}
+        if self.path.is_file():
+            self.entries = Parameters.load_json(self.path)
+
+    @staticmethod
+    def hash_input(inp: Any) -> str:
+        """Hash the content of an input: file content for paths, raw bytes for arrays"""
+        hasher = hashlib.sha1()
+        items = inp if isinstance(inp, (list, tuple)) else [inp]
+        for item in items:
+            if isinstance(item, (str, Path)):
+                with open(item, "rb") as handle:
+                    for chunk in iter(lambda: handle.read(1 << 20), b""):
+                        hasher.update(chunk)
+            elif isinstance(item, np.ndarray):
+                hasher.update(f"{item.dtype}{item.shape}".encode())
+                hasher.update(np.ascontiguousarray(item).data)
+            else:
+                hasher.update(repr(item).encode())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def hash_content(obj: Any, hasher=None) -> str:
+        """Hash nested containers content, arrays are hashed entirely (their repr is truncated)"""
+        if hasher is None:
+            hasher = hashlib.sha1()
+        if isinstance(obj, np.ndarray) and obj.dtype != object:
+            hasher.update(f"{obj.dtype}{obj.shape}".encode())
+            hasher.update(np.ascontiguousarray(obj).data)
+        elif isinstance(obj, np.ndarray):
+            Manifest.hash_content(obj.tolist(), hasher)
+        elif isinstance(obj, dict):
+            hasher.update(b"{")
+            for key, val in obj.items():
+                hasher.update(repr(key).encode())
+                Manifest.hash_content(val, hasher)
+            hasher.update(b"}")
+        elif isinstance(obj, (list, tuple)):
+            hasher.update(b"[")
+            for val in obj:
+                Manifest.hash_content(val, hasher)
+            hasher.update(b"]")
+        else:
+            hasher.update(repr(obj).encode())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def hash_tuning(parameters: dict) -> str:
+        return hashlib.sha1(json.dumps(parameters, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def hash_code(pipeline) -> str:
+        """Hash the filters source code & routing"""
+        hasher = hashlib.sha1()
+        for filt in pipeline.filters:
+            try:
+                source = inspect.getsource(filt.apply)
+            except (OSError, TypeError):
+                source = getattr(filt.apply, "__qualname__", repr(filt.apply))
+            hasher.update(source.encode())
+            hasher.update(repr(filt).encode())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def signature(input_hash: str, tuning_hash: str, code_hash: str) -> dict:
+        return {"input": input_hash, "tuning": tuning_hash, "code": code_hash}
+
+    def is_up_to_date(self, key: str, signature: dict) -> bool:
+        entry = self.entries.get(key, None)
+        if entry is None or entry["signature"] != signature:
+            return False
+        return all(Path(out).exists() for out in entry["outputs"])
+
+    def outputs(self, key: str) -> List[Path]:
+        return [Path(out) for out in self.entries.get(key, {}).get("outputs", [])]
+
+    def record(self, key: str, signature: dict, outputs: List[Path]) -> None:
+        self.entries[key] = {
+            "signature": signature,
+            "outputs": [str(out) for out in outputs]
+        }
+
+    def save(self, path: Optional[Path] = None) -> None:
+        path = self.path if path is None else Path(path)
+        path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        Parameters.save_json(self.entries, tmp_path)
+        os.replace(tmp_path, path)
+        logging.debug(f"manifest saved {path} - {len(self.entries)} items")
@@ -1,12 +1,24 @@
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy, deepcopy
+from itertools import islice
 from pathlib import Path
-from typing import Any, Optional, Callable
+from typing import Any, Optional, Callable, Dict, Iterable, Iterator, List, Tuple
 from interactive_pipe.core.filter import FilterCore
 from interactive_pipe.core.pipeline import PipelineCore
 from interactive_pipe.data_objects.parameters import Parameters
+from interactive_pipe.data_objects.image import ImageWriter
 from interactive_pipe.core.graph import get_call_graph
 from interactive_pipe.core.filter import analyze_apply_fn_signature
+from interactive_pipe.headless.animation import AnimationWriter
 from interactive_pipe.headless.control import Control
+from interactive_pipe.headless.manifest import Manifest
+from interactive_pipe.headless.stream import as_frames, prefetch
+
+# Global params holding graphical objects (set by the GUI backends)
+GUI_GLOBAL_PARAMS = ["__app", "__window", "__player",
+                     "__set_audio", "__play", "__pause", "__stop"]
 
 
 class HeadlessPipeline(PipelineCore):
@@ -18,7 +30,18 @@ class HeadlessPipeline(PipelineCore):
     - saving output images
     - printing current parameters in the terminal
     - graph representation
+    - evaluating parameters sweeps
+
+    The full buffer of the last run is retained (up to `max_retained_buffer_bytes`)
+    so `.save` does not need to re-run the pipeline if nothing changed since then
+    (same inputs objects, same parameters & global params content).
+    Inputs modified in place are not detected: set `.inputs` again (like for the cache).
     """
+    max_retained_buffer_bytes = 2**30  # set to 0 to disable buffer retention
+    _last_buffer = None
+    _last_buffer_state = None
+    _writer = None
+
     @staticmethod
     def routing_indexes(inputs_names, all_variables):
         if inputs_names:
@@ -148,6 +171,7 @@ class HeadlessPipeline(PipelineCore):
         """Open a json/yaml tuning file and set parameters
         """
         self.parameters = Parameters.from_file(path).data
+        self.update_controls_from_parameters()
 
     def __repr__(self):
         """Print tuning parameters
@@ -174,9 +198,82 @@ class HeadlessPipeline(PipelineCore):
             self.parameters = {ctrl.filter_to_connect.name: {
                 ctrl.parameter_name_to_connect:  ctrl.value}}
 
+    def update_controls_from_parameters(self):
+        """Reflect the filters parameters into the controls values
+        (otherwise controls would override the parameters at the next run)"""
+        if not hasattr(self, "controls"):
+            return
+        parameters = self.parameters
+        for ctrl in self.controls:
+            if ctrl.filter_to_connect is None:
+                continue
+            filter_params = parameters.get(ctrl.filter_to_connect.name, {})
+            if ctrl.parameter_name_to_connect in filter_params:
+                ctrl.value = filter_params[ctrl.parameter_name_to_connect]
+
+    def headless_copy(self) -> "HeadlessPipeline":
+        """Deep copy of the pipeline detached from any graphical interface
+        (GUI objects in global params & controls are not copied) so it can be sent to workers.
+        Current controls values are frozen into the filters parameters.
+        """
+        self.update_parameters_from_controls()
+        shallow_copy = copy(self)
+        shallow_copy.controls = []
+        gui_keys = [key for key in GUI_GLOBAL_PARAMS if key in self.global_params]
+        # GUI objects are replaced by None wherever they are referenced
+        memo = {id(self.global_params[key]): None for key in gui_keys}
+        headless = deepcopy(shallow_copy, memo)
+        for key in gui_keys:
+            headless.global_params.pop(key, None)
+        return headless
+
     def __run(self):
         self.update_parameters_from_controls()
         result_full = super().run()
+        self.__retain_buffer(result_full)
+        return self.__select_outputs(result_full)
+
+    def __buffer_state(self) -> tuple:
+        # Inputs are compared by identity (hashing them at each run would cost as much as a light filter),
+        # parameters & global params are small: their content is hashed (arrays reprs are truncated)
+        inputs = self.inputs
+        inputs_ids = None if inputs is None else tuple(
+            (key, id(val)) for key, val in inputs.items())
+        global_params = {key: val for key, val in self.global_params.items()
+                         if key not in GUI_GLOBAL_PARAMS + ["__pipeline"]}
+        return (id(inputs), inputs_ids, Manifest.hash_content((self.parameters, global_params)))
+
+    @staticmethod
+    def buffer_size(result_full: dict) -> int:
+        size = 0
+        for buffer in result_full.values():
+            buffer = getattr(buffer, "data", buffer)
+            size += getattr(buffer, "nbytes", 0)
+        return size
+
+    def __retain_buffer(self, result_full: dict) -> None:
+        if result_full is not None and self.buffer_size(result_full) <= self.max_retained_buffer_bytes:
+            self._last_buffer = result_full
+            # inputs are kept alive so their ids can't be reused by new objects
+            self._last_buffer_state = (self.inputs, self.__buffer_state())
+        else:
+            self._last_buffer = None
+            self._last_buffer_state = None
+
+    def last_buffer(self) -> Optional[dict]:
+        """Full buffer of the last run if it is still valid (same inputs, parameters & global params), None otherwise"""
+        if self._last_buffer is None or self._last_buffer_state[1] != self.__buffer_state():
+            return None
+        return self._last_buffer
+
+    def __getstate__(self) -> dict:
+        # Retained buffers & background writer are not copied nor pickled
+        state = self.__dict__.copy()
+        for transient_key in ["_last_buffer", "_last_buffer_state", "_writer"]:
+            state.pop(transient_key, None)
+        return state
+
+    def __select_outputs(self, result_full: dict):
         if self.outputs is not None:
             output_indexes = self.outputs
         else:
@@ -192,8 +289,145 @@ class HeadlessPipeline(PipelineCore):
         self.results = self.__run()
         return self.results
 
-    def save(self, path: Path = None, data_wrapper_fn: Callable = None, output_indexes: list = None, save_entire_buffer=False) -> Path:
+    def run_stream(self, frames: Iterable, input_name: Optional[str] = None, max_buffered: int = 2,
+                   pipelined: bool = False) -> Iterator[Tuple[float, Any]]:
+        """Process a stream of frames (`FrameSource`, or any iterable of frames), yields (timestamp, outputs).
+
+        Each frame is fed to the `input_name` input (the first input by default),
+        the other inputs keep their current value.
+        Frames are read ahead in a background thread, at most `max_buffered` decoded frames are waiting.
+        `pipelined=True` runs each filter in its own thread on consecutive frames
+        (see `PipelineEngine.run_pipelined`), outputs are still yielded in order.
+        ```
+        for timestamp, (out,) in pipeline.run_stream(FrameSource.from_video("clip.mp4")):
+            ...
+        ```
+        """
+        if input_name is None:
+            assert len(self.inputs_routing) > 0, "The pipeline has no input to stream frames to"
+            input_name = self.inputs_routing[0]
+        assert input_name in self.inputs_routing, f"{input_name} is not among {self.inputs_routing}"
+        static_inputs = {}
+        if self.has_inputs and self.inputs is not None:
+            static_inputs = {name: val for name, val in self.inputs.items() if name != input_name}
+        if pipelined:
+            self.update_parameters_from_controls()
+            imglst_stream = ((frame.timestamp, {**static_inputs, input_name: frame.data})
+                             for frame in as_frames(frames))
+            for timestamp, result_full in self.engine.run_pipelined(self.filters, imglst_stream, max_buffered=max_buffered):
+                self.results = self.__select_outputs(result_full)
+                yield timestamp, self.results
+            return
+        for frame in prefetch(as_frames(frames), max_buffered=max_buffered):
+            self.inputs = {**static_inputs, input_name: frame.data}
+            yield frame.timestamp, self.run()
+
+    def sweep(self, parameters: Dict[str, Dict[str, list]] = {}, **kwargs) -> List[Any]:
+        """Evaluate the pipeline for K parameters settings at once.
+
+        ```
+        pipeline.sweep({"gamma": {"coeff": [0.5, 1., 2.]}})
+        pipeline.sweep(coeff=[0.5, 1., 2.])  # keyword args are matched with filters parameters
+        ```
+        Filters declared with `vectorize=True` evaluate all settings in a single vectorized call,
+        the other impacted filters run once per setting. Filters upstream of the sweep run only once.
+        Returns a list of K outputs (similar to what `.run()` returns).
+        Current parameters are left untouched.
+        """
+        self.update_parameters_from_controls()
+        sweep = {filter_name: dict(params)
+                 for filter_name, params in parameters.items()}
+        for filter_name, params in self.parameters_from_keyword_args(**kwargs).items():
+            sweep.setdefault(filter_name, {}).update(params)
+        results_full = self.engine.run_sweep(
+            self.filters, imglst=self.inputs, sweep=sweep)
+        return [self.__select_outputs(result_full) for result_full in results_full]
+
+    def render_animation(self, control=None, values=None, out: Path = None, fps: float = 25.,
+                         output_index: int = 0, batch_size: int = 8, max_workers: int = 4, **kwargs) -> Path:
+        """Sweep one or more controls along a timeline and encode the frames (GIF, MP4 or PNG sequence).
+
+        ```
+        pipeline.render_animation(control=gamma_control, values=np.linspace(0.5, 2., 50), out="gamma.gif")
+        pipeline.render_animation(control=["coeff", "angle"], values=[coeffs, angles], out="clip.mp4")
+        pipeline.render_animation(out="frames", coeff=np.linspace(0., 1., 100))  # PNG sequence
+        ```
+        - controls are given as `Control` objects, control names or filters parameters names
+        (keyword args are matched like in `sweep`).
+        - filters upstream of the animated parameters are computed once and shared by all frames.
+        - frames are evaluated by chunks of `batch_size` settings (see `sweep`),
+        up to `max_workers` chunks are evaluated in parallel threads (filters shall not modify shared state).
+        - frames are encoded in order on a writer thread (see `AnimationWriter`).
+        `output_index` selects the rendered output (among the flattened outputs).
+        Current parameters are left untouched, returns the output path.
+        """
+        assert out is not None, "Please provide an output path"
+        self.update_parameters_from_controls()
+        sweep = self.__animation_sweep(control, values, **kwargs)
+        num_frames = len(next(iter(next(iter(sweep.values())).values())))
+        upstream = self.engine.run_upstream(self.filters, imglst=self.inputs, swept_filters=sweep.keys())
+
+        def render_chunk(start: int) -> List[Any]:
+            chunk = {filter_name: {param_name: param_values[start:start+batch_size]
+                                   for param_name, param_values in params.items()}
+                     for filter_name, params in sweep.items()}
+            results_full = self.engine.run_sweep(self.filters, sweep=chunk, upstream=upstream)
+            return [self.__animation_frame(result_full, output_index) for result_full in results_full]
+
+        with AnimationWriter(out, fps=fps, max_pending=batch_size) as writer, \
+                ThreadPoolExecutor(max_workers=max_workers) as pool:
+            starts = iter(range(0, num_frames, batch_size))
+            # Bounded amount of chunks in flight, frames are written in order
+            pending = deque(pool.submit(render_chunk, start) for start in islice(starts, max_workers))
+            while pending:
+                frames = pending.popleft().result()
+                for start in islice(starts, 1):
+                    pending.append(pool.submit(render_chunk, start))
+                for frame in frames:
+                    writer.write(frame)
+        return writer.out
+
+    def __animation_sweep(self, control=None, values=None, **kwargs) -> Dict[str, Dict[str, list]]:
+        sweep = {}
+        if control is not None:
+            controls, controls_values = (control, values) if isinstance(control, (list, tuple)) \
+                else ([control], [values])
+            assert values is not None and len(controls) == len(controls_values), \
+                "Please provide a list of values for each animated control"
+            for ctrl, ctrl_values in zip(controls, controls_values):
+                if isinstance(ctrl, str):
+                    named_controls = [c for c in getattr(self, "controls", []) if c.name == ctrl]
+                    if not named_controls:
+                        parameters = self.parameters_from_keyword_args(**{ctrl: list(ctrl_values)})
+                        assert parameters, f"{ctrl} is neither a control nor a filter parameter"
+                        for filter_name, params in parameters.items():
+                            sweep.setdefault(filter_name, {}).update(params)
+                        continue
+                    ctrl = named_controls[0]
+                assert isinstance(ctrl, Control) and ctrl.filter_to_connect is not None, \
+                    f"{ctrl} is not connected to a filter"
+                sweep.setdefault(ctrl.filter_to_connect.name, {})[ctrl.parameter_name_to_connect] = list(ctrl_values)
+        for filter_name, params in self.parameters_from_keyword_args(**kwargs).items():
+            sweep.setdefault(filter_name, {}).update({name: list(vals) for name, vals in params.items()})
+        assert sweep, "Nothing to animate"
+        return sweep
+
+    def __animation_frame(self, result_full: dict, output_index: int):
+        outputs = self.__select_outputs(result_full)
+        assert outputs, "The pipeline has no output to render"
+        if isinstance(outputs[0], list):
+            outputs = [out for row in outputs for out in row]
+        return outputs[output_index]
+
+    def save(self, path: Path = None, data_wrapper_fn: Callable = None, output_indexes: list = None, save_entire_buffer=False, manifest: Optional[Path] = None, blocking: bool = True) -> Path:
         """Save images
+
+        The buffer of the last run is reused when still valid, otherwise the pipeline is executed.
+        When a `manifest` path is provided, saving is skipped if the outputs recorded for `path`
+        are up to date (same inputs content, tuning and pipeline code).
+        With `blocking=False`, files are written by the background `.writer` and the function returns
+        without waiting for them, unless the writer queue is full (backpressure, see `ImageWriter`).
+        `.writer.flush()` returns the written paths (the manifest path included once it is recorded).
         """
         if output_indexes is None:
             if self.outputs is not None:
@@ -202,28 +436,91 @@ class HeadlessPipeline(PipelineCore):
                 output_indexes = self.filters[-1].outputs
         if save_entire_buffer:
             output_indexes = None  # you may force specific buffer index you'd like to save
-        result_full = super().run()
-        if result_full is None:
-            return None
         if not isinstance(path, Path):
             path = Path(path)
+        if manifest is not None:
+            manifest = Manifest(manifest)
+            self.update_parameters_from_controls()
+            signature = Manifest.signature(
+                Manifest.hash_input(
+                    [] if self.inputs is None else list(self.inputs.values())),
+                Manifest.hash_tuning(self.parameters),
+                Manifest.hash_code(self)
+            )
+            if manifest.is_up_to_date(str(path), signature):
+                logging.info(f"{path} is up to date, skip saving")
+                return path
+        result_full = self.last_buffer()
+        if result_full is None:
+            result_full = super().run()
+            self.__retain_buffer(result_full)
+        else:
+            logging.debug("Saving the buffer of the last run")
+        if result_full is None:
+            return None
         self.export_tuning(path.with_suffix(".yaml"))
         assert isinstance(result_full, dict)
+        to_save = []
         for num, res_current in result_full.items():
             if output_indexes is not None and not num in output_indexes:
                 continue
             current_name = path.with_name(
                 path.stem + "_" + str(num) + path.suffix)
             if res_current is not None and not (isinstance(res_current, list) and len(res_current) == 0):
-                if data_wrapper_fn is not None:
-                    data_wrapper_fn(res_current).save(current_name)
-                else:
-                    assert hasattr(res_current, "save")
-                    res_current.save(current_name)
-            # @ TODO: handle proper output suffixes namings
-            logging.info("saved image %s" % current_name)
+                to_save.append((res_current, current_name))
+
+        if blocking:
+            saved_paths = [path.with_suffix(".yaml")]
+            for res_current, current_name in to_save:
+                saved_paths.append(self.__save_buffer(
+                    res_current, current_name, data_wrapper_fn))
+                # @ TODO: handle proper output suffixes namings
+                logging.info("saved image %s" % current_name)
+            if manifest is not None:
+                manifest.record(str(path), signature, saved_paths)
+                manifest.save()
+        else:
+            futures = [self.writer.submit(self.__save_buffer, res_current, current_name, data_wrapper_fn)
+                       for res_current, current_name in to_save]
+            if manifest is not None:
+                def record_manifest() -> Path:
+                    saved_paths = [path.with_suffix(".yaml")] + \
+                        [future.result() for future in futures]
+                    manifest.record(str(path), signature, saved_paths)
+                    manifest.save()
+                    return manifest.path
+                self.writer.submit(record_manifest)
         return path
 
+    @staticmethod
+    def __save_buffer(res_current: Any, current_name: Path, data_wrapper_fn: Optional[Callable] = None) -> Path:
+        if data_wrapper_fn is not None:
+            res_current = data_wrapper_fn(res_current)
+        assert hasattr(res_current, "save")
+        res_current.save(current_name)
+        return getattr(res_current, "path", None) or current_name
+
+    @property
+    def writer(self) -> ImageWriter:
+        """Background writer used by non blocking saves. `.writer.flush()` waits for pending writes."""
+        if self._writer is None:
+            self._writer = ImageWriter(max_workers=2)
+        return self._writer
+
+    def run_batch(self, inputs, output_folder: Path, tuning: Optional[Path] = None, suffix: str = ".png", **kwargs) -> dict:
+        """Batch process an iterable of inputs (paths or arrays) and write outputs to `output_folder`
+        See `BatchRunner` for the available options (executor, num_workers, prefetch...)
+        """
+        from interactive_pipe.headless.batch import BatchRunner
+        return BatchRunner(self, tuning=tuning, **kwargs).run(inputs, output_folder, suffix=suffix)
+
+    def replay_session(self, path: Path, realtime: bool = False) -> dict:
+        """Replay a GUI session recorded with `record_session=...` and measure latencies
+        See `SessionReplayer` for the returned statistics (per event latency, per filter time, cache hit rate)
+        """
+        from interactive_pipe.headless.session import SessionReplayer
+        return SessionReplayer(self, realtime=realtime).run(path)
+
     def parameters_from_keyword_args(self, **kwargs) -> dict:
         new_param_dict = {}
         for key, value in kwargs.items():
@@ -0,0 +1,193 @@
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+from interactive_pipe.headless.keyboard import KeyboardControl
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+
+SESSION_VERSION = 1
+ACTION_RESET = "reset_parameters"
+
+
+class SessionRecorder:
+    """Record a GUI session as a compact JSON lines log.
+
+    - the first line is a header with the initial controls values.
+    - then one line per event, `t` is the time in seconds since the recording started:
+        - `{"t": 1.25, "control": "gamma", "value": 0.8}` for each `Control.update`
+        - `{"t": 2.5, "key": "r", "actions": ["reset_parameters"], "event": "..."}` for each key press
+        (`actions` lists the GUI functions bound to the key, `event` the triggered context event if any).
+
+    Lines are flushed as soon as they are written so a crashed session can still be replayed.
+    Use `InteractivePipeGUI(..., record_session="session.jsonl")` to record a GUI session,
+    `SessionReplayer` to replay it headless.
+    """
+
+    def __init__(self, path: Union[str, Path], controls: list = [], clock=time.perf_counter):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+        self.closed = False
+        self._lock = threading.Lock()
+        self._file = open(self.path, "w")
+        self._start = self.clock()
+        self._write({"session": SESSION_VERSION, "controls": {ctrl.name: ctrl.value for ctrl in controls}})
+
+    def __getstate__(self) -> dict:
+        # Copies sent to other processes do not record
+        state = self.__dict__.copy()
+        state["_file"] = None
+        state["_lock"] = None
+        state["closed"] = True
+        return state
+
+    def __deepcopy__(self, memo) -> "SessionRecorder":
+        # Pipeline copies still record to the same log
+        return self
+
+    def _write(self, entry: dict) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    def timestamp(self) -> float:
+        return round(self.clock() - self._start, 4)
+
+    def record_control(self, name: str, value: Any) -> None:
+        self._write({"t": self.timestamp(), "control": name, "value": value})
+
+    def record_key(self, key: str, actions: List[str] = [], event: Optional[str] = None) -> None:
+        entry = {"t": self.timestamp(), "key": key}
+        if actions:
+            entry["actions"] = actions
+        if event is not None:
+            entry["event"] = event
+        self._write(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self.closed:
+                self.closed = True
+                self._file.close()
+
+
+def load_session(path: Union[str, Path]) -> Iterator[dict]:
+    with open(path, "r") as session_file:
+        for line in session_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class SessionReplayer:
+    """Replay a recorded GUI session on a HeadlessPipeline (no display required) to benchmark it.
+
+    Controls are matched by name with `pipeline.controls`. Events are applied in order:
+    - control changes set the control value.
+    - key presses move the keyboard controls bound to the key, trigger the recorded context event
+    and reset the parameters when the key was bound to the GUI reset.
+    Other GUI actions (help, saving...) do not run the pipeline and are skipped.
+    The pipeline runs after each applied event, like the GUI refreshes.
+
+    `realtime=True` waits between events as during the recording (latency under a realistic pace),
+    otherwise events are replayed back to back.
+
+    ```
+    stats = SessionReplayer(pipeline).run("session.jsonl")
+    ```
+    """
+
+    def __init__(self, pipeline: HeadlessPipeline, realtime: bool = False):
+        self.pipeline = pipeline
+        self.realtime = realtime
+        self.controls = {ctrl.name: ctrl for ctrl in getattr(pipeline, "controls", [])}
+
+    def apply(self, entry: dict) -> bool:
+        """Apply a single event, returns True if the pipeline shall run"""
+        if "control" in entry:
+            ctrl = self.controls.get(entry["control"], None)
+            if ctrl is None:
+                logging.warning(f"Unknown control {entry['control']}, event skipped")
+                return False
+            ctrl.update(entry["value"])
+            return True
+        applied = False
+        if ACTION_RESET in entry.get("actions", []):
+            for ctrl in self.controls.values():
+                ctrl.reset()
+            applied = True
+        for ctrl in self.controls.values():
+            if isinstance(ctrl, KeyboardControl):
+                if ctrl.keydown == entry["key"]:
+                    ctrl.on_key_down()
+                    applied = True
+                elif ctrl.keyup == entry["key"]:
+                    ctrl.on_key_up()
+                    applied = True
+        event = entry.get("event", None)
+        if event is not None:
+            self.pipeline.global_params.setdefault("__events", {})[event] = True
+            self.pipeline.reset_cache()
+            applied = True
+        return applied
+
+    def __run_event(self, entry: dict) -> Optional[Dict[str, Any]]:
+        if not self.apply(entry):
+            return None
+        tic = time.perf_counter()
+        self.pipeline.run()
+        latency = time.perf_counter() - tic
+        event = entry.get("event", None)
+        if event is not None:
+            self.pipeline.global_params["__events"][event] = False
+        engine = self.pipeline.engine
+        return {"latency": latency, "filter_timings": dict(engine.filter_timings),
+                "cached_filters": set(engine.cached_filters)}
+
+    def run(self, path: Union[str, Path]) -> dict:
+        """Replay a session log, returns latency & cache statistics"""
+        entries = load_session(path)
+        header = next(entries, None)
+        assert header is not None and header.get("session", None) == SESSION_VERSION, f"{path} is not a session log"
+        for name, value in header["controls"].items():
+            if name in self.controls:
+                self.controls[name].value = value
+        # The initial display is not part of the measurements
+        self.pipeline.run()
+        latencies, skipped = [], 0
+        filter_times: Dict[str, List[float]] = {}
+        hits, evaluations = 0, 0
+        start = time.perf_counter()
+        for entry in entries:
+            if self.realtime:
+                time.sleep(max(0., entry["t"] - (time.perf_counter() - start)))
+            measure = self.__run_event(entry)
+            if measure is None:
+                skipped += 1
+                continue
+            latencies.append(measure["latency"])
+            for filter_name, elapsed in measure["filter_timings"].items():
+                evaluations += 1
+                if filter_name in measure["cached_filters"]:
+                    hits += 1
+                else:
+                    filter_times.setdefault(filter_name, []).append(elapsed)
+        stats = {
+            "events": len(latencies),
+            "skipped": skipped,
+            "latencies": latencies,
+            "mean_latency": sum(latencies)/len(latencies) if latencies else 0.,
+            "max_latency": max(latencies, default=0.),
+            "filter_times": {
+                filter_name: {"runs": len(times), "total": sum(times), "mean": sum(times)/len(times)}
+                for filter_name, times in filter_times.items()
+            },
+            "cache_hit_rate": hits/evaluations if evaluations else 0.,
+        }
+        logging.info(
+            f"replay: {stats['events']} events - mean latency {1000.*stats['mean_latency']:.1f}ms"
+            f" - max {1000.*stats['max_latency']:.1f}ms - cache hit rate {100.*stats['cache_hit_rate']:.0f}%")
+        return stats
@@ -0,0 +1,122 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from interactive_pipe.data_objects.frame_source import Frame, FrameSource
+
+_END_OF_STREAM = object()
+
+
+def prefetch(iterable: Iterable, max_buffered: int = 2) -> Iterator:
+    """Iterate in a background thread, at most `max_buffered` items wait to be consumed.
+    Decoding the next frames overlaps with processing the current one while memory stays bounded.
+    """
+    assert max_buffered >= 1
+    items = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+
+    def put(item, exc=None) -> bool:
+        # Never block forever: the consumer may have stopped while the queue is full
+        while not stop.is_set():
+            try:
+                items.put((item, exc), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END_OF_STREAM)
+        except BaseException as exc:
+            put(_END_OF_STREAM, exc)
+
+    reader = threading.Thread(target=read, name="stream_prefetch", daemon=True)
+    reader.start()
+    try:
+        while True:
+            item, exc = items.get()
+            if item is _END_OF_STREAM:
+                if exc is not None:
+                    raise exc
+                return
+            yield item
+    finally:
+        # Consumer stopped early (generator closed): release the reader
+        stop.set()
+        reader.join()
+
+
+def as_frames(frames: Iterable) -> Iterable[Frame]:
+    if isinstance(frames, FrameSource):
+        return frames
+    return FrameSource(frames)
+
+
+class StreamPlayer:
+    """Plays the frame sources inputs of a pipeline in real time (GUI agnostic).
+
+    Call `start` then `tick` periodically (from a GUI timer):
+    the pipeline inputs are set to the latest frames due at the current time,
+    frames which became outdated while the pipeline was computing are dropped.
+    """
+
+    def __init__(self, pipeline, clock: Callable[[], float] = time.perf_counter):
+        self.pipeline = pipeline
+        self.clock = clock
+        inputs = pipeline.inputs if pipeline.has_inputs else None
+        inputs = inputs if inputs is not None else {}
+        self.sources: Dict[str, FrameSource] = {
+            name: val for name, val in inputs.items() if isinstance(val, FrameSource)}
+        self.static_inputs = {name: val for name, val in inputs.items() if name not in self.sources}
+        self.current: Dict[str, Frame] = {}
+        self.dropped_frames = 0
+        self.start_time = None
+        self._iterators = {}
+        self._next_frames: Dict[str, Optional[Frame]] = {}
+        self._first_timestamps = {}
+
+    @property
+    def active(self) -> bool:
+        return len(self.sources) > 0
+
+    @property
+    def fps(self) -> float:
+        return max(source.fps for source in self.sources.values())
+
+    @property
+    def finished(self) -> bool:
+        return self.active and all(frame is None for frame in self._next_frames.values())
+
+    def start(self) -> None:
+        """(Re)start playing from the first frames"""
+        self._iterators = {name: iter(source) for name, source in self.sources.items()}
+        self._next_frames = {name: next(iterator, None) for name, iterator in self._iterators.items()}
+        self._first_timestamps = {name: frame.timestamp for name, frame in self._next_frames.items()
+                                  if frame is not None}
+        self.current = {}
+        self.dropped_frames = 0
+        self.start_time = self.clock()
+        self.tick()
+
+    def tick(self) -> bool:
+        """Move to the frames due now, returns True if the pipeline inputs changed (refresh needed)"""
+        elapsed = self.clock() - self.start_time
+        changed = False
+        for name in self.sources.keys():
+            advanced = False
+            while self._next_frames[name] is not None and \
+                    self._next_frames[name].timestamp - self._first_timestamps[name] <= elapsed:
+                if advanced:
+                    # The pipeline is too slow for this frame, only the latest due frame is processed
+                    self.dropped_frames += 1
+                self.current[name] = self._next_frames[name]
+                self._next_frames[name] = next(self._iterators[name], None)
+                advanced = True
+            changed |= advanced
+        if changed:
+            self.pipeline.inputs = {**self.static_inputs, **{name: frame.data for name, frame in self.current.items()}}
+        return changed
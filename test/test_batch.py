@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+from sample_functions import get_sample_image
+from interactive_pipe.core.filter import FilterCore
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.batch import BatchRunner, EXECUTOR_THREAD, EXECUTOR_PROCESS
+from interactive_pipe.data_objects.image import Image
+from interactive_pipe.data_objects.parameters import Parameters
+
+
+def darken(img, coeff=0.5):
+    return img*coeff
+
+
+def get_pipeline():
+    filt = FilterCore(apply_fn=darken, inputs=["img"], outputs=["dark"])
+    return HeadlessPipeline(filters=[filt], inputs=["img"], outputs=["dark"])
+
+
+@pytest.mark.parametrize("executor", [EXECUTOR_THREAD, EXECUTOR_PROCESS])
+def test_batch_runner(tmp_path, executor):
+    input_image = get_sample_image()
+    paths = []
+    for idx in range(3):
+        path = tmp_path/"inputs"/f"img_{idx}.png"
+        Image(input_image*(idx+1)/3).save(path)
+        paths.append(path)
+    tuning = tmp_path/"tuning.yaml"
+    Parameters({"darken": {"coeff": 0.25}}).save(tuning)
+    runner = BatchRunner(get_pipeline(), tuning=tuning,
+                         executor=executor, num_workers=2, prefetch=2)
+    stats = runner.run(paths + [input_image], tmp_path/"outputs")
+    assert stats["items"] == 4
+    assert stats["files"] == 4
+    assert stats["throughput"] > 0
+    out = Image.from_file(tmp_path/"outputs"/"img_2_dark.png").data
+    np.testing.assert_allclose(out, 0.25*input_image, atol=1/255)
+    assert (tmp_path/"outputs"/"00003_dark.png").is_file()
+
+
+def test_batch_runner_manifest(tmp_path):
+    input_image = get_sample_image()
+    inputs = [input_image, 0.5*input_image]
+    manifest = tmp_path/"outputs"/"manifest.json"
+    pipeline = get_pipeline()
+    stats = BatchRunner(pipeline, manifest=manifest).run(
+        inputs, tmp_path/"outputs")
+    assert stats["skipped"] == 0 and stats["files"] == 2
+    assert manifest.is_file()
+    # Resume: everything is up to date
+    stats = BatchRunner(pipeline, manifest=manifest).run(
+        inputs, tmp_path/"outputs")
+    assert stats["skipped"] == 2 and stats["files"] == 0
+    # A missing output is recomputed
+    (tmp_path/"outputs"/"00001_dark.png").unlink()
+    stats = BatchRunner(pipeline, manifest=manifest).run(
+        inputs, tmp_path/"outputs")
+    assert stats["skipped"] == 1 and stats["files"] == 1
+    # Tuning change invalidates all items
+    pipeline.parameters = {"darken": {"coeff": 0.1}}
+    stats = BatchRunner(pipeline, manifest=manifest).run(
+        inputs, tmp_path/"outputs")
+    assert stats["skipped"] == 0 and stats["files"] == 2
+
+
+def test_batch_runner_input_root(tmp_path):
+    input_image = get_sample_image()
+    paths = []
+    for folder in ["a", "b"]:
+        path = tmp_path/"inputs"/folder/"img.png"
+        Image(input_image).save(path)
+        paths.append(path)
+    manifest = tmp_path/"outputs"/"manifest.json"
+    with pytest.raises(ValueError):
+        BatchRunner(get_pipeline(), num_workers=1).run(paths, tmp_path/"outputs")
+    assert not (tmp_path/"outputs").exists()  # nothing was written
+    stats = BatchRunner(get_pipeline(), manifest=manifest, input_root=tmp_path/"inputs").run(
+        paths, tmp_path/"outputs")
+    assert stats["files"] == 2
+    assert (tmp_path/"outputs"/"a"/"img_dark.png").is_file()
+    assert (tmp_path/"outputs"/"b"/"img_dark.png").is_file()
+    stats = BatchRunner(get_pipeline(), manifest=manifest, input_root=tmp_path/"inputs").run(
+        paths, tmp_path/"outputs")
+    assert stats["skipped"] == 2
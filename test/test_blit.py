@@ -0,0 +1,77 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from interactive_pipe.data_objects.curves import Curve
+from interactive_pipe.graphical.blit import BlitManager, curve_artists, refresh_curve
+
+
+class CountingCanvas(FigureCanvasAgg):
+    full_draws = 0
+    blits = 0
+
+    def draw(self):
+        self.full_draws += 1
+        super().draw()
+
+    def blit(self, bbox=None):
+        self.blits += 1
+
+
+def test_refresh_curve_blitting():
+    canvas = CountingCanvas(Figure())
+    ax = canvas.figure.subplots()
+    x = np.linspace(0., 1., 10)
+    curve = Curve([[x, x**2, "r-", "square"]], xlim=(0., 1.), ylim=(0., 1.))
+    blit_manager = BlitManager(canvas)
+    plot_object = curve.create_plot(ax=ax)
+    blit_manager.add_artists(curve_artists(plot_object))
+    blit_manager.draw()
+    assert canvas.full_draws == 1
+    assert blit_manager.background is not None
+    # Same limits & labels: only the lines are blitted
+    refresh_curve(Curve([[x, x**3, "r-", "square"]], xlim=(0., 1.), ylim=(0., 1.)), plot_object, ax, blit_manager)
+    assert canvas.full_draws == 1
+    assert canvas.blits == 1
+    np.testing.assert_allclose(plot_object[0][0].get_ydata(), x**3)
+    # Title change requires a full redraw
+    refresh_curve(Curve([[x, x**3, "r-", "cube"]], xlim=(0., 1.), ylim=(0., 1.)), plot_object, ax, blit_manager)
+    assert canvas.full_draws == 2
+    # No explicit limits: axes follow the data
+    refresh_curve(Curve([[x, 4*x, "r-", "cube"]]), plot_object, ax, blit_manager)
+    assert canvas.full_draws == 3
+    assert ax.get_ylim()[1] >= 4.
+
+
+def test_matplotlib_window_blitting():
+    import matplotlib.pyplot as plt
+    from interactive_pipe.core.filter import FilterCore
+    from interactive_pipe.headless.pipeline import HeadlessPipeline
+    from interactive_pipe.graphical.mpl_window import MatplotlibWindow
+
+    def gain(img, coeff=0.5):
+        return img*coeff
+
+    def offset(img, bias=0.1):
+        return img+bias
+
+    class BlitWindow(MatplotlibWindow):
+        use_blit = True
+
+    filt1 = FilterCore(apply_fn=gain, inputs=["img"], outputs=["gained"])
+    filt2 = FilterCore(apply_fn=offset, inputs=["gained"], outputs=["biased"])
+    pip = HeadlessPipeline(filters=[filt1, filt2], inputs=["img"], outputs=[["gained", "biased"]],
+                           cache=True, global_params={"__output_styles": {}})
+    pip.inputs = [np.ones((8, 8, 3))]
+    window = BlitWindow(pipeline=pip)
+    window.fig, window.ax = plt.subplots()
+    window.fig.canvas = CountingCanvas(window.fig)
+    window.refresh()
+    assert len(window.blit_manager.artists) == 2
+    assert not window.need_redraw
+    pip.parameters = {"offset": {"bias": 0.3}}
+    window.refresh()
+    # Only the second image has been recomputed & redrawn
+    assert window.changed_artists == [window.image_canvas[0][1]["data"]]
+    assert window.fig.canvas.blits == 1
+    np.testing.assert_allclose(window.image_canvas[0][1]["data"].get_array(), 0.8)
+    plt.close(window.fig)
@@ -1,4 +1,5 @@
-from interactive_pipe.core.cache import StateChange
+from interactive_pipe.core.cache import StateChange, safe_copy
+import numpy as np
 
 
 def test_initial_state():
@@ -31,3 +32,14 @@ def test_has_changed_with_different_params():
     assert sc.has_changed({'param1': 'value2'}) is True
     assert sc.update_needed is True
     assert repr(sc) == 'Sample_Filter: needs update'
+
+
+def test_safe_copy_shares_read_only_arrays():
+    writable = np.zeros((4, 4))
+    read_only = np.ones((4, 4))
+    read_only.setflags(write=False)
+    copied = safe_copy([writable, (read_only, 1), {"key": read_only}])
+    assert copied[0] is not writable
+    np.testing.assert_array_equal(copied[0], writable)
+    assert copied[1][0] is read_only
+    assert copied[2]["key"] is read_only
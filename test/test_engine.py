@@ -134,3 +134,50 @@ def test_engine(cache, engine_flag):
     if cache:
         assert not filt1.cache_mem.state_change.update_needed
         assert not filt2.cache_mem.state_change.update_needed
+
+
+def gain(img, coeff=1.):
+    return img*coeff
+
+
+@pytest.mark.parametrize("vectorize", [True, False])
+def test_engine_sweep(vectorize):
+    filt1 = FilterCore(apply_fn=mad, outputs=[2])
+    filt2 = FilterCore(apply_fn=gain, inputs=[2],
+                       outputs=[4], vectorize=vectorize)
+    filt3 = FilterCore(apply_fn=blend, inputs=[0, 4], outputs=[8])
+    engine = PipelineEngine(cache=False)
+    coeffs = [0.5, 1., 2.]
+    results = engine.run_sweep([filt1, filt2, filt3], imglst=[input_image],
+                               sweep={"gain": {"coeff": coeffs}})
+    assert len(results) == len(coeffs)
+    expected_filt1 = 2*input_image - 3
+    for coeff, res in zip(coeffs, results):
+        assert (res[2] == expected_filt1).all()
+        assert np.allclose(res[4], coeff*expected_filt1)
+        assert np.allclose(res[8], 0.4*input_image+0.6*coeff*expected_filt1)
+    # parameters are left untouched
+    assert filt2.values == {"coeff": 1.}
+    with pytest.raises(AssertionError):
+        engine.run_sweep([filt1, filt2, filt3], imglst=[input_image],
+                         sweep={"gain": {"coeff": coeffs}, "mad": {"bias": [0.]}})
+
+
+def test_engine_updated_buffers():
+    filt1 = FilterCore(apply_fn=mad, inputs=[0], outputs=[2])
+    filt2 = FilterCore(apply_fn=blend, inputs=[0, 2], outputs=[8])
+    pip = PipelineCore(filters=[filt1, filt2], cache=True, inputs=[0])
+    assert pip.updated_buffers is None
+    pip.inputs = [input_image]
+    pip.run()
+    assert pip.updated_buffers == {0, 2, 8}
+    pip.run()
+    assert pip.updated_buffers == set()
+    pip.parameters = {"blend": {"blend_coeff": 0.8}}
+    pip.run()
+    assert pip.updated_buffers == {8}
+    # inputs are not modified by the run
+    assert list(pip.inputs.keys()) == [0]
+    pip.inputs = [input_image+1]
+    pip.run()
+    assert pip.updated_buffers == {0, 2, 8}
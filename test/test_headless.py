@@ -165,3 +165,120 @@ def test_headless_pipeline_no_input():
     pip.inputs = []
     out = pip.run()
     assert len(out) == 3
+
+
+def gain(img, coeff=1.):
+    return img*coeff
+
+
+def test_headless_pipeline_sweep():
+    input_image = get_sample_image()
+    filt1 = FilterCore(apply_fn=gain, name="gain", outputs=[
+                       1], vectorize=True)
+    filt2 = FilterCore(apply_fn=blend, inputs=[0, 1], outputs=[6])
+    pip = HeadlessPipeline(filters=[filt1, filt2], inputs=[0], outputs=[6])
+    pip.inputs = [input_image]
+    sweep_out = pip.sweep(coeff=[0.5, 2.])
+    assert len(sweep_out) == 2
+    for coeff, out in zip([0.5, 2.], sweep_out):
+        pip.parameters = {"gain": {"coeff": coeff}}
+        assert np.allclose(pip.run()[0], out[0])
+
+
+@pytest.mark.parametrize("extension", ["", ".gif"])
+def test_headless_pipeline_render_animation(tmp_path, extension):
+    input_image = get_sample_image()
+    upstream_calls = []
+
+    def upstream(img):
+        upstream_calls.append(1)
+        return img*0.5
+
+    filt1 = FilterCore(apply_fn=upstream, name="upstream", inputs=[0], outputs=[1])
+    filt2 = FilterCore(apply_fn=gain, name="gain", inputs=[1], outputs=[2])
+    pip = HeadlessPipeline(filters=[filt1, filt2], inputs=[0], outputs=[2])
+    pip.inputs = [input_image]
+    coeffs = np.linspace(0.2, 2., 7)
+    out = pip.render_animation(values=None, out=tmp_path/f"anim{extension}", fps=10, batch_size=2,
+                               max_workers=3, coeff=coeffs)
+    assert len(upstream_calls) == 1  # shared by all frames
+    assert pip.parameters["gain"]["coeff"] == 1.
+    if extension == "":
+        frames = sorted(out.glob("*.png"))
+        assert len(frames) == len(coeffs)
+        for coeff, frame in zip(coeffs, frames):  # frames are written in order
+            expected = Image.quantize(np.clip(input_image*0.5*coeff, 0., 1.))
+            assert np.abs(Image.load_image(frame, precision=8)*255. - expected).max() <= 1
+    else:
+        from PIL import Image as PilImage
+        with PilImage.open(out) as gif:
+            assert gif.n_frames == len(coeffs)
+
+
+def test_headless_pipeline_save_manifest(tmp_path):
+    input_image = get_sample_image()
+    filt1 = FilterCore(apply_fn=mad, name="mad", outputs=[1])
+    pip = HeadlessPipeline(filters=[filt1], inputs=[0], outputs=[1])
+    pip.inputs = [input_image]
+    manifest = tmp_path/"manifest.json"
+    out_image = tmp_path/"out.png"
+    pip.save(out_image, data_wrapper_fn=lambda x: Image(x), manifest=manifest)
+    saved = tmp_path/"out_1.png"
+    mtime = saved.stat().st_mtime_ns
+    pip.save(out_image, data_wrapper_fn=lambda x: Image(x), manifest=manifest)
+    assert saved.stat().st_mtime_ns == mtime  # up to date, not re-written
+    pip.parameters = {"mad": {"coeff": 0.5}}
+    pip.save(out_image, data_wrapper_fn=lambda x: Image(x), manifest=manifest)
+    assert saved.stat().st_mtime_ns != mtime
+    pip.parameters = {"mad": {"coeff": 0.25}}
+    pip.save(out_image, data_wrapper_fn=lambda x: Image(x), manifest=manifest, blocking=False)
+    assert sorted(pip.writer.flush()) == sorted([saved, manifest])
+
+
+def test_headless_pipeline_save_reuses_last_run(tmp_path):
+    input_image = get_sample_image()
+    calls = []
+
+    def counted_mad(img, coeff=1.):
+        calls.append(coeff)
+        return img*coeff
+    filt1 = FilterCore(apply_fn=counted_mad, name="mad", outputs=[1])
+    pip = HeadlessPipeline(filters=[filt1], inputs=[0], outputs=[1])
+    pip.inputs = [input_image]
+    pip.run()
+    assert len(calls) == 1
+    pip.save(tmp_path/"out.png", data_wrapper_fn=lambda x: Image(x))
+    assert len(calls) == 1  # buffer of the last run was reused
+    pip.parameters = {"mad": {"coeff": 0.5}}
+    pip.save(tmp_path/"out.png", data_wrapper_fn=lambda x: Image(x),
+             save_entire_buffer=True, blocking=False)
+    assert len(calls) == 2  # parameters changed, need to re-run
+    pip.writer.flush()
+    assert (tmp_path/"out_0.png").is_file()
+    assert (tmp_path/"out_1.png").is_file()
+    pip.max_retained_buffer_bytes = 0
+    pip.run()
+    pip.save(tmp_path/"out.png", data_wrapper_fn=lambda x: Image(x))
+    assert len(calls) == 4
+
+
+def test_headless_pipeline_retained_buffer_invalidation():
+    def mad(img, coeff=1., global_params={}):
+        return img*coeff + global_params.get("bias", 0.)
+    filt1 = FilterCore(apply_fn=mad, name="mad", outputs=[1], cache=False)
+    pip = HeadlessPipeline(filters=[filt1], inputs=[0], outputs=[1], global_params={})
+    input_image = np.zeros((4, 2000))
+    pip.inputs = [input_image]
+    # arrays whose repr are truncated
+    coeff = np.ones(2000)
+    pip.parameters = {"mad": {"coeff": coeff}}
+    pip.run()
+    assert pip.last_buffer() is not None
+    coeff[1000] = 2.
+    assert pip.last_buffer() is None
+    pip.run()
+    pip.global_params["bias"] = 1.
+    assert pip.last_buffer() is None
+    pip.run()
+    pip.inputs = [input_image.copy()]
+    assert pip.last_buffer() is None
@@ -1,10 +1,11 @@
 
 import pytest
 from pathlib import Path
+import time
 import numpy as np
 import shutil
 
-from interactive_pipe.data_objects.image import Image, IMAGE_BACKENDS
+from interactive_pipe.data_objects.image import Image, ImageWriter, IMAGE_BACKENDS, IMAGE_BACKEND_PILLOW, IMAGE_DTYPE_NATIVE
 
 
 @pytest.mark.parametrize("backend_load", IMAGE_BACKENDS)
@@ -22,3 +23,118 @@ def test_save_load(tmp_path, backend_load, backend_save):
     loaded_data = Image.from_file(path, backend=backend_load).data
     # allow for slight differences
     np.testing.assert_allclose(loaded_data, data, atol=1/255)
+
+
+@pytest.mark.parametrize("process", [False, True])
+def test_image_writer(tmp_path, process):
+    data = np.random.rand(20, 30, 3)
+    with ImageWriter(max_workers=2, max_pending=2, process=process) as writer:
+        futures = [writer.write(data, tmp_path/f"img_{idx}.png")
+                   for idx in range(5)]
+        title_future = writer.write_data(
+            Image(data, title="_titled"), tmp_path/"img.png")
+        writer.flush()
+    assert all(future.done() for future in futures)
+    assert title_future.result() == tmp_path/"img_titled.png"
+    for idx in range(5):
+        np.testing.assert_allclose(Image.from_file(
+            tmp_path/f"img_{idx}.png").data, data, atol=1/255)
+
+
+def test_image_writer_flush_reports(tmp_path):
+    data = np.random.rand(8, 8, 3)
+    writer = ImageWriter(max_workers=2, max_pending=4)
+    writer.write(data, tmp_path/"ok_0.png")
+    writer.write(data, tmp_path/"ok_1.png")
+    assert sorted(writer.flush()) == [tmp_path/"ok_0.png", tmp_path/"ok_1.png"]
+    # Failed writes are reported even if they finished before flush
+    failed = writer.write(data, tmp_path/"missing_folder"/"ko.png")
+    while not failed.done():
+        time.sleep(0.01)
+    with pytest.raises(Exception):
+        writer.flush()
+    assert writer.flush() == []
+    writer.close()
+
+
+@pytest.mark.parametrize("backend", IMAGE_BACKENDS)
+def test_load_dtype_policy(tmp_path, backend):
+    data = (np.random.rand(10, 12, 3)*255).astype(np.uint8)
+    path = tmp_path / "test.png"
+    # integer data is written as is
+    Image.save_image(data, path, backend=backend)
+    native = Image.load_image(path, backend=backend, dtype=IMAGE_DTYPE_NATIVE)
+    assert native.dtype == np.uint8
+    np.testing.assert_array_equal(native, data)
+    single = Image.load_image(path, backend=backend, dtype=np.float32)
+    assert single.dtype == np.float32
+    np.testing.assert_allclose(single, data/255., atol=1e-6)
+    assert Image.load_image(path, backend=backend).dtype == np.float64
+    default_dtype = Image.default_dtype
+    try:
+        Image.default_dtype = np.float32
+        assert Image.from_file(path, backend=backend).data.dtype == np.float32
+    finally:
+        Image.default_dtype = default_dtype
+
+
+@pytest.mark.parametrize("backend_load", IMAGE_BACKENDS)
+@pytest.mark.parametrize("extension", [".png", ".tif"])
+@pytest.mark.parametrize("shape", [(20, 30), (20, 30, 3)])
+def test_save_load_16bits(tmp_path, backend_load, extension, shape):
+    data = np.random.rand(*shape)
+    path = tmp_path / f"test{extension}"
+    Image.save_image(data, path, precision=16)
+    native = Image.load_image(path, backend=backend_load, dtype=IMAGE_DTYPE_NATIVE)
+    assert native.dtype == np.uint16
+    assert native.shape == shape
+    # precision is deduced from the file
+    loaded = Image.load_image(path, backend=backend_load)
+    np.testing.assert_allclose(loaded, data, atol=1/65535)
+
+
+def test_load_32bits_PIL(tmp_path):
+    PilImage = pytest.importorskip("PIL.Image")
+    data = np.array([[0, 1000, 70000, 2**31-1]], dtype=np.int32)
+    path = tmp_path / "test.tif"
+    PilImage.fromarray(data).save(path)
+    # 32 bits integers are not wrapped to 16 bits
+    native = Image.load_image(path, backend=IMAGE_BACKEND_PILLOW, dtype=IMAGE_DTYPE_NATIVE)
+    assert native.dtype == np.int32
+    np.testing.assert_array_equal(native, data)
+    loaded = Image.load_image(path, backend=IMAGE_BACKEND_PILLOW)
+    np.testing.assert_allclose(loaded, data/(2.**31-1))
+
+
+@pytest.mark.parametrize("extension", [".npy", ".npz"])
+def test_save_load_numpy(tmp_path, extension):
+    data = np.random.rand(20, 30, 3)
+    img = Image(data, title=None)
+    img.save(tmp_path / f"test{extension}")
+    loaded = Image.from_file(tmp_path / f"test{extension}").data
+    np.testing.assert_array_equal(loaded, data)
+
+
+def test_load_mmap(tmp_path):
+    data = np.random.rand(20, 30, 3).astype(np.float32)
+    path = tmp_path / "test.npy"
+    np.save(path, data)
+    img = Image.from_file(path, mmap=True)
+    assert isinstance(img.data, np.memmap)
+    assert not img.data.flags.writeable
+    assert img.data.dtype == np.float32
+    np.testing.assert_array_equal(img.data, data)
+
+
+@pytest.mark.parametrize("backend", IMAGE_BACKENDS)
+@pytest.mark.parametrize("extension", [".jpg", ".png"])
+def test_load_reduced_scale(tmp_path, backend, extension):
+    data = np.random.rand(101, 203, 3)
+    path = tmp_path / f"test{extension}"
+    Image.save_image(data, path)
+    assert Image.reduction_factor(None) == 1
+    assert Image.reduction_factor(0.3) == 2
+    assert Image.reduction_factor(0.01) == 8
+    proxy = Image.load_image(path, backend=backend, scale=0.25)
+    assert proxy.shape == (26, 51, 3)
+    assert proxy.dtype == Image.default_dtype
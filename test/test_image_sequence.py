@@ -0,0 +1,59 @@
+import pickle
+from copy import deepcopy
+import numpy as np
+import pytest
+from interactive_pipe.data_objects.image import Image
+from interactive_pipe.data_objects.image_sequence import ImageSequence
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for idx in range(5):
+        path = tmp_path/f"img_{idx}.png"
+        Image.save_image(np.full((8, 10, 3), idx/10.), path)
+        paths.append(path)
+    return paths
+
+
+def test_image_sequence(image_paths):
+    decoded = []
+
+    def load_fn(path):
+        decoded.append(path)
+        return Image.load_image(path)
+    sequence = ImageSequence(image_paths, prefetch=1, load_fn=load_fn)
+    assert len(sequence) == 5
+    img = sequence[2]
+    np.testing.assert_allclose(img, 0.2, atol=1/255)
+    assert not img.flags.writeable
+    # cached: same buffer, no new decoding
+    assert sequence[2] is img
+    assert deepcopy(sequence) is sequence
+    sequence.close()
+    # neighbours have been prefetched
+    assert sorted(decoded) == image_paths[1:4]
+    np.testing.assert_allclose(sequence[-1], 0.4, atol=1/255)
+    with pytest.raises(IndexError):
+        sequence[5]
+    sequence.close()
+
+
+def test_image_sequence_budget(image_paths):
+    frame_bytes = 8*10*3*8
+    sequence = ImageSequence(image_paths, max_bytes=2*frame_bytes, prefetch=0)
+    for idx in range(5):
+        sequence[idx]
+    assert sequence.cache_bytes == 2*frame_bytes
+    restored = pickle.loads(pickle.dumps(sequence))
+    assert restored.cache_bytes == 0
+    np.testing.assert_allclose(restored[1], 0.1, atol=1/255)
+
+
+def test_image_sequence_proxy(image_paths):
+    sequence = ImageSequence(image_paths, prefetch=0)
+    full = sequence[1]
+    proxy = sequence.get(1, scale=0.5)
+    assert proxy.shape == (4, 5, 3)
+    assert sequence.get(1, scale=0.5) is proxy
+    assert sequence[1] is full
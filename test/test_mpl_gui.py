@@ -0,0 +1,65 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from interactive_pipe.core.filter import FilterCore
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.control import Control
+from interactive_pipe.graphical.mpl_gui import MainWindow
+
+
+def process(img, coeff=0.5, flip=False, mode="gray"):
+    out = img*coeff
+    return out[::-1] if flip else out
+
+
+def get_window():
+    filt = FilterCore(apply_fn=process, inputs=["img"], outputs=["out"])
+    controls = [
+        Control(0.5, [0., 1.], name="coeff", filter_to_connect=filt, parameter_name_to_connect="coeff"),
+        Control(False, name="flip", filter_to_connect=filt, parameter_name_to_connect="flip"),
+        Control("gray", ["gray", "color"], name="mode", filter_to_connect=filt, parameter_name_to_connect="mode"),
+    ]
+    pip = HeadlessPipeline(filters=[filt], inputs=["img"], outputs=["out"],
+                           global_params={"__output_styles": {}})
+    pip.controls = controls
+    pip.inputs = [np.ones((4, 4, 3))]
+    return MainWindow(controls=controls, pipeline=pip), controls
+
+
+def test_reset_sliders_in_place():
+    window, controls = get_window()
+    runs = []
+    window.pipeline.run = lambda *args, **kwargs: runs.append(1) or HeadlessPipeline.run(window.pipeline)
+    widgets = dict(window.sliders_list)
+    controls[0].value = 0.2
+    controls[1].value = True
+    controls[2].value = "color"
+    window.reset_sliders()
+    # Widgets are updated in place, the pipeline runs once
+    assert window.sliders_list == widgets
+    assert len(runs) == 1
+    assert window.sliders_list["coeff"].val == 0.2
+    assert window.sliders_list["flip"].get_status() == [True]
+    assert window.sliders_list["mode"].value_selected == "color"
+    # Widgets callbacks still work afterwards
+    window.sliders_list["flip"].set_active(0)
+    assert controls[1].value is False
+    assert len(runs) == 2
+    plt.close(window.fig)
+
+
+def test_update_parameters_runs_once():
+    from interactive_pipe.graphical.mpl_gui import InteractivePipeMatplotlib
+    window, controls = get_window()
+    pip = window.pipeline
+    gui = InteractivePipeMatplotlib.__new__(InteractivePipeMatplotlib)
+    gui.pipeline, gui.controls, gui.window, gui._controls_index = pip, controls, window, None
+    runs = []
+    pip.run = lambda *args, **kwargs: runs.append(1) or HeadlessPipeline.run(pip)
+    filter_name = controls[0].filter_to_connect.name
+    gui.update_parameters({filter_name: {"coeff": 0.25, "flip": True}})
+    assert len(runs) == 1
+    assert controls[0].value == 0.25 and controls[1].value is True and controls[2].value == "gray"
+    assert window.sliders_list["coeff"].val == 0.25
+    assert window.sliders_list["flip"].get_status() == [True]
+    assert np.allclose(pip.results[0], 0.25)
+    plt.close(window.fig)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+pytest.importorskip("ipywidgets")
+from interactive_pipe.core.filter import FilterCore
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.control import Control
+from interactive_pipe.data_objects.curves import Curve
+from interactive_pipe.graphical.nb_gui import ImageWidgetsWindow
+
+
+def process(img, coeff=0.5):
+    return img*coeff, Curve([[np.arange(4), np.arange(4)*coeff]])
+
+
+def test_image_widgets_window():
+    filt = FilterCore(apply_fn=process, inputs=["img"], outputs=["out", "curve"])
+    source = FilterCore(apply_fn=lambda img: img, inputs=["img"], outputs=["src"], name="source")
+    ctrl = Control(0.5, [0., 1.], name="coeff", filter_to_connect=filt, parameter_name_to_connect="coeff")
+    pip = HeadlessPipeline(filters=[source, filt], inputs=["img"], outputs=[["src", "out", "curve"]],
+                           global_params={"__output_styles": {}}, cache=True)
+    pip.controls = [ctrl]
+    pip.inputs = [np.ones((8, 8, 3))]
+    window = ImageWidgetsWindow(controls=[ctrl], pipeline=pip, throttle=0.)
+    window.refresh()
+    cells = [cell["image"] for cell in window.image_canvas[0]]
+    values = [cell.value for cell in cells]
+    assert values[0][:2] == b"\xff\xd8"  # JPEG
+    assert len(window.canvas_box.children) == 1 and len(window.canvas_box.children[0].children) == 3
+    window.sliders_dict["coeff"].value = 0.25
+    assert ctrl.value == 0.25
+    # Only the cells depending on the modified parameter are encoded again
+    assert cells[0].value is values[0]
+    assert cells[1].value != values[1]
+    assert cells[2].value != values[2]
+
+
+def test_image_widgets_window_throttling():
+    import asyncio
+    filt = FilterCore(apply_fn=lambda img, coeff=0.5: img*coeff, inputs=["img"], outputs=["out"])
+    ctrl = Control(0.5, [0., 1.], name="coeff", filter_to_connect=filt, parameter_name_to_connect="coeff")
+    pip = HeadlessPipeline(filters=[filt], inputs=["img"], outputs=["out"], global_params={"__output_styles": {}})
+    pip.controls = [ctrl]
+    pip.inputs = [np.ones((8, 8))]
+    window = ImageWidgetsWindow(controls=[ctrl], pipeline=pip, throttle=0.05)
+    runs = []
+    pip.run = lambda: runs.append(ctrl.value) or HeadlessPipeline.run(pip)
+
+    async def move_slider():
+        for value in [0.1, 0.2, 0.3, 0.4]:
+            window.sliders_dict["coeff"].value = value
+        await asyncio.sleep(0.1)
+    asyncio.run(move_slider())
+    # First change is rendered immediately, the following ones are merged into a single run
+    assert runs == [0.1, 0.4]
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
+from interactive_pipe.core.filter import FilterCore
+from interactive_pipe.core.process_engine import ProcessPipelineEngine
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+
+
+def source(img, global_params={}):
+    global_params["pid"] = os.getpid()
+    global_params["__output_styles"]["src"] = {"title": "source"}
+    return img + 1.
+
+
+def scale(img, coeff=0.5, crash=False, fail=False):
+    if crash:
+        os._exit(1)
+    if fail:
+        raise ValueError("filter failure")
+    return img*coeff
+
+
+def get_pipeline():
+    filters = [
+        FilterCore(apply_fn=source, inputs=["img"], outputs=["src"]),
+        FilterCore(apply_fn=scale, inputs=["src"], outputs=["out"]),
+    ]
+    pip = HeadlessPipeline(filters=filters, inputs=["img"], outputs=["src", "out"], cache=True,
+                           global_params={"__output_styles": {}, "__window": lambda: None})
+    pip.engine = ProcessPipelineEngine.from_engine(pip.engine, excluded_global_params=["__window"])
+    pip.inputs = [np.zeros((4, 4, 3), dtype=np.float32)]
+    return pip
+
+
+def test_process_engine():
+    pip = get_pipeline()
+    src, out = pip.run()
+    assert np.allclose(src, 1.) and np.allclose(out, 0.5)
+    # Filters ran in the compute process, global params are synchronized back
+    assert pip.global_params["pid"] != os.getpid()
+    assert pip.global_params["__output_styles"]["src"]["title"] == "source"
+    assert pip.updated_buffers == {"img", "src", "out"}
+    pip.parameters = {"scale": {"coeff": 2.}}
+    src_2, out_2 = pip.run()
+    # Only the modified filter is recomputed
+    assert pip.updated_buffers == {"out"}
+    assert src_2 is src and np.allclose(out_2, 2.)
+    pip.inputs = [np.ones((4, 4, 3), dtype=np.float32)]
+    src, out = pip.run()
+    assert np.allclose(out, 4.)
+    assert pip.updated_buffers == {"img", "src", "out"}
+    pip.engine.stop()
+
+
+def test_process_engine_failures():
+    pip = get_pipeline()
+    _, out = pip.run()
+    pid = pip.global_params["pid"]
+    # A filter exception is reported, previous results are kept
+    pip.parameters = {"scale": {"fail": True}}
+    _, out_failed = pip.run()
+    assert out_failed is out and pip.updated_buffers == set()
+    # A crash of the compute process does not take the GUI process down
+    pip.parameters = {"scale": {"fail": False, "crash": True}}
+    _, out_crashed = pip.run()
+    assert out_crashed is out and not pip.engine.is_running
+    # The compute process is restarted
+    pip.parameters = {"scale": {"crash": False, "coeff": 3.}}
+    _, out = pip.run()
+    assert np.allclose(out, 3.)
+    assert pip.global_params["pid"] != pid
+    pip.engine.stop()
+
+
+def test_gui_process_engine():
+    from interactive_pipe.graphical.web_gui import InteractivePipeWeb
+    filters = [FilterCore(apply_fn=source, inputs=["img"], outputs=["src"])]
+    pip = HeadlessPipeline(filters=filters, inputs=["img"], outputs=["src"], global_params={})
+    pip.inputs = [np.zeros((4, 4, 3))]
+    gui = InteractivePipeWeb(pipeline=pip, port=0, process_engine=True)
+    assert isinstance(pip.engine, ProcessPipelineEngine)
+    gui.window.refresh()
+    # Graphical objects stay in the GUI process
+    assert pip.global_params["__window"] is gui.window
+    assert pip.global_params["pid"] != os.getpid()
+    pip.engine.stop()
+
+
+def test_process_engine_shared_memory_tracking():
+    # Resource trackers report leaked or unknown blocks on stderr when the interpreter exits
+    script = "\n".join([
+        "import numpy as np",
+        "from test_process_engine import get_pipeline",
+        "pip = get_pipeline()",
+        "pip.run()",
+        "pip.inputs = [np.ones((64, 64, 3), dtype=np.float32)]",  # larger buffers: blocks are replaced
+        "pip.run()",
+        "pip.engine.stop()",
+    ])
+    completed = subprocess.run([sys.executable, "-c", script], cwd=Path(__file__).parent,
+                               capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    assert "resource_tracker" not in completed.stderr
+    assert "Traceback" not in completed.stderr
@@ -0,0 +1,67 @@
+import json
+import numpy as np
+from interactive_pipe.core.filter import FilterCore
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.control import Control
+from interactive_pipe.headless.keyboard import KeyboardControl
+from interactive_pipe.graphical.gui import InteractivePipeGUI
+
+
+def smooth(img):
+    return 0.5*(img + img[::-1])
+
+
+def exposure(img, coeff=1., bias=0.):
+    return img*coeff + bias
+
+
+def get_pipeline():
+    filt1 = FilterCore(apply_fn=smooth, name="smooth", inputs=["img"], outputs=["smoothed"])
+    filt2 = FilterCore(apply_fn=exposure, name="exposure", inputs=["smoothed"], outputs=["out"])
+    pip = HeadlessPipeline(filters=[filt1, filt2], inputs=["img"], outputs=["out"], cache=True)
+    pip.controls = [
+        Control(1., [0., 2.], name="coeff", filter_to_connect=filt2, parameter_name_to_connect="coeff"),
+        KeyboardControl(0., [0., 1.], name="bias", step=0.25, keydown="down", keyup="up",
+                        filter_to_connect=filt2, parameter_name_to_connect="bias"),
+    ]
+    pip.inputs = [np.ones((4, 4, 3))]
+    return pip
+
+
+class HeadlessGUI(InteractivePipeGUI):
+    def init_app(self):
+        self.key_bindings = {"r": self.reset_parameters}
+
+
+def test_record_and_replay_session(tmp_path):
+    session = tmp_path/"session.jsonl"
+    gui = HeadlessGUI(pipeline=get_pipeline(), record_session=session)
+    gui.controls[0].update(1.5)
+    gui.on_press("up")
+    gui.on_press("r")
+    gui.on_press("h")  # not bound, nothing to replay
+    gui.controls[0].update(0.5)
+    gui.close()
+    entries = [json.loads(line) for line in session.read_text().splitlines()]
+    assert entries[0]["controls"] == {"coeff": 1., "bias": 0.}
+    assert [entry.get("control", entry.get("key")) for entry in entries[1:]] == ["coeff", "up", "r", "h", "coeff"]
+    assert entries[3]["actions"] == ["reset_parameters"]
+    assert all(later["t"] >= earlier["t"] for earlier, later in zip(entries[1:], entries[2:]))
+
+    pip = get_pipeline()
+    states = []
+    pip_run = pip.run
+    pip.run = lambda: (pip_run(), states.append(dict(pip.parameters["exposure"])))[0]
+    stats = pip.replay_session(session)
+    assert stats["events"] == 4 and stats["skipped"] == 1
+    assert states[1:] == [
+        {"coeff": 1.5, "bias": 0.},
+        {"coeff": 1.5, "bias": 0.25},
+        {"coeff": 1., "bias": 0.},
+        {"coeff": 0.5, "bias": 0.},
+    ]
+    # The upstream filter is served from cache for each event
+    assert stats["cache_hit_rate"] == 0.5
+    assert stats["filter_times"]["exposure"]["runs"] == 4
+    assert "smooth" not in stats["filter_times"]
+    assert len(stats["latencies"]) == 4
@@ -0,0 +1,162 @@
+import threading
+import time
+import pytest
+import numpy as np
+import cv2
+from interactive_pipe.core.filter import FilterCore
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.stream import StreamPlayer, prefetch
+from interactive_pipe.data_objects.frame_source import FrameSource
+from interactive_pipe.data_objects.image import Image
+
+
+def get_pipeline():
+    filt = FilterCore(apply_fn=lambda img, bias=0.: img + bias, inputs=["img", ], outputs=["out"])
+    add = FilterCore(apply_fn=lambda img, other: img + other, inputs=["out", "other"], outputs=["total"])
+    return HeadlessPipeline(filters=[filt, add], inputs=["img", "other"], outputs=["total"])
+
+
+def test_frame_source():
+    source = FrameSource([np.zeros((2, 2)), np.ones((2, 2))], fps=10.)
+    frames = list(source)
+    assert [frame.timestamp for frame in frames] == [0., 0.1]
+    assert [frame.index for frame in frames] == [0, 1]
+    assert len(source) == 2
+    # Sources built from a list can be replayed
+    assert len(list(source)) == 2
+
+
+def test_frame_source_files(tmp_path):
+    paths = []
+    for idx in range(3):
+        paths.append(tmp_path/f"{idx}.png")
+        Image.save_image(np.full((8, 8, 3), idx/4.), paths[-1])
+    frames = list(FrameSource.from_images(paths, fps=5.))
+    assert [frame.timestamp for frame in frames] == [0., 0.2, 0.4]
+    assert np.allclose(frames[2].data, 0.5, atol=1/255.)
+    video_path = tmp_path/"clip.avi"
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 10., (16, 8))
+    for idx in range(4):
+        writer.write(np.full((8, 16, 3), 60*idx, dtype=np.uint8))
+    writer.release()
+    source = FrameSource.from_video(video_path)
+    assert source.fps == 10. and len(source) == 4
+    frames = list(source)
+    assert len(frames) == 4
+    assert frames[1].data.shape == (8, 16, 3) and frames[1].data.dtype.kind == "f"
+    assert np.allclose([frame.timestamp for frame in frames], [0., 0.1, 0.2, 0.3])
+
+
+def test_run_stream():
+    pip = get_pipeline()
+    pip.inputs = [np.zeros(2), np.ones(2)]
+    pip.parameters = {"<lambda>": {"bias": 10.}}
+    outputs = list(pip.run_stream([np.full(2, idx) for idx in range(4)]))
+    assert [timestamp for timestamp, _ in outputs] == [0., 0.04, 0.08, 0.12]
+    assert [out[0][0] for _, out in outputs] == [11., 12., 13., 14.]
+
+
+def test_prefetch_is_bounded():
+    produced = []
+
+    def frames():
+        for idx in range(100):
+            produced.append(idx)
+            yield idx
+    stream = prefetch(frames(), max_buffered=2)
+    assert next(stream) == 0
+    time.sleep(0.05)
+    # 1 consumed + 2 buffered + 1 waiting to be put in the queue
+    assert len(produced) <= 4
+    stream.close()
+
+
+def run_with_timeout(func, timeout=5.):
+    thread = threading.Thread(target=func, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_prefetch_stopped_near_the_end():
+    def stop_early():
+        stream = prefetch([1, 2, 3], max_buffered=2)
+        assert next(stream) == 1
+        time.sleep(0.1)  # the reader has finished the iterable, the queue is full
+        stream.close()
+
+    def break_run_stream():
+        pip = get_pipeline()
+        pip.inputs = [np.zeros(2), np.ones(2)]
+        for _timestamp, _out in pip.run_stream([np.full(2, idx) for idx in range(3)]):
+            time.sleep(0.1)
+            break
+    assert run_with_timeout(stop_early)
+    assert run_with_timeout(break_run_stream)
+
+
+def test_stream_player_drops_late_frames():
+    pip = get_pipeline()
+    now = [0.]
+    pip.inputs = [FrameSource([np.full(2, idx) for idx in range(10)], fps=10.), np.zeros(2)]
+    player = StreamPlayer(pip, clock=lambda: now[0])
+    assert player.active and player.fps == 10.
+    player.start()
+    assert pip.inputs["img"][0] == 0 and pip.inputs["other"][0] == 0
+    now[0] = 0.05
+    assert not player.tick()
+    # The pipeline was too slow: frames 1 & 2 are dropped
+    now[0] = 0.32
+    assert player.tick()
+    assert pip.inputs["img"][0] == 3 and player.dropped_frames == 2
+    now[0] = 2.
+    assert player.tick()
+    assert pip.inputs["img"][0] == 9 and player.finished
+
+
+def slow_stage(img, offset=1):
+    time.sleep(0.02)
+    return img + offset
+
+
+def test_run_stream_pipelined():
+    intervals = {}
+
+    def timed_stage(name):
+        def stage(img, offset=1):
+            start = time.perf_counter()
+            out = slow_stage(img, offset=offset)
+            intervals.setdefault(name, []).append((start, time.perf_counter()))
+            return out
+        return stage
+    filters = [FilterCore(apply_fn=timed_stage(f"stage_{idx}"), name=f"stage_{idx}",
+                          inputs=[f"buf_{idx}"], outputs=[f"buf_{idx+1}"])
+               for idx in range(4)]
+    pip = HeadlessPipeline(filters=filters, inputs=["buf_0"], outputs=["buf_4"])
+    pip.parameters = {"stage_3": {"offset": 10}}
+    frames = [np.full(2, idx) for idx in range(12)]
+    sequential = [out[0][0] for _, out in pip.run_stream(frames)]
+    intervals.clear()
+    pipelined = [out[0][0] for _, out in pip.run_stream(frames, pipelined=True)]
+    # Frames order is preserved
+    assert pipelined == sequential == [idx + 13 for idx in range(12)]
+    # Stages ran concurrently: a stage processed a frame while the next stage processed the previous one
+    assert all(len(stage_intervals) == 12 for stage_intervals in intervals.values())
+    assert any(
+        start < intervals[f"stage_{idx+1}"][frame-1][1] and intervals[f"stage_{idx+1}"][frame-1][0] < end
+        for idx in range(3) for frame, (start, end) in enumerate(intervals[f"stage_{idx}"]) if frame > 0
+    )
+
+
+def test_run_stream_pipelined_error():
+    def failing(img):
+        if img[0] == 2:
+            raise ValueError("bad frame")
+        return img
+    pip = HeadlessPipeline(filters=[FilterCore(apply_fn=failing, inputs=["img"], outputs=["out"])],
+                           inputs=["img"], outputs=["out"])
+    outputs = []
+    with pytest.raises(ValueError):
+        for _, out in pip.run_stream([np.full(2, idx) for idx in range(5)], pipelined=True):
+            outputs.append(out[0][0])
+    assert outputs == [0, 1]
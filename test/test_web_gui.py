@@ -0,0 +1,161 @@
+import http.client
+import json
+import struct
+import time
+import urllib.request
+import numpy as np
+from interactive_pipe.core.filter import FilterCore
+from interactive_pipe.headless.pipeline import HeadlessPipeline
+from interactive_pipe.headless.control import Control
+from interactive_pipe.graphical.websocket import WebSocketConnection, read_frame, OPCODE_TEXT, OPCODE_CLOSE
+from interactive_pipe.graphical.web_gui import InteractivePipeWeb
+from interactive_pipe.helper.choose_backend import get_interactive_pipeline_class
+
+RUNS = []
+
+
+def scale(img, coeff=0.5):
+    RUNS.append(coeff)
+    time.sleep(0.02)
+    return img*coeff
+
+
+def get_gui(**kwargs):
+    source = FilterCore(apply_fn=lambda img: img, inputs=["img"], outputs=["src"], name="source")
+    filt = FilterCore(apply_fn=scale, inputs=["src"], outputs=["out"], name="scale")
+    pip = HeadlessPipeline(filters=[source, filt], inputs=["img"], outputs=[["src", "out"]],
+                           global_params={}, cache=True)
+    pip.controls = [Control(0.5, [0., 1.], name="coeff", filter_to_connect=filt, parameter_name_to_connect="coeff")]
+    pip.inputs = [np.ones((16, 16, 3))]
+    return InteractivePipeWeb(pipeline=pip, name="web_test", port=0, **kwargs)
+
+
+def receive_json(client):
+    opcode, payload = client.receive()
+    assert opcode == OPCODE_TEXT
+    return json.loads(payload.decode())
+
+
+def receive_cell(client):
+    opcode, payload = client.receive()
+    assert opcode != OPCODE_TEXT
+    row, col = struct.unpack(">HH", payload[:4])
+    return (row, col), payload[4:]
+
+
+def test_web_backend_streaming():
+    assert get_interactive_pipeline_class("web") is InteractivePipeWeb
+    gui = get_gui()
+    url = gui.start()
+    try:
+        page = urllib.request.urlopen(url).read().decode()
+        assert "<title>web_test</title>" in page
+        # Wait for the first frame so the new client receives it right after connecting
+        for _ in range(100):
+            if len(gui.window.encoded_cells) == 2:
+                break
+            time.sleep(0.01)
+        client = WebSocketConnection.connect(gui.host, gui.port, timeout=5)
+        controls = receive_json(client)
+        assert controls["controls"][0]["name"] == "coeff"
+        assert controls["controls"][0]["value"] == 0.5
+        layout = receive_json(client)
+        assert layout["rows"] == [["src", "out"]] and layout["mime"] == "image/jpeg"
+        cells = dict(receive_cell(client) for _ in range(2))
+        assert cells[(0, 0)][:2] == b"\xff\xd8"
+        RUNS.clear()
+        # Latest value wins: intermediate values received during a run are skipped
+        for value in [0.1, 0.2, 0.3, 0.4, 0.8]:
+            client.send_text(json.dumps({"type": "control", "name": "coeff", "value": value}))
+        position, content = receive_cell(client)
+        # Only the modified cell is sent
+        assert position == (0, 1)
+        while RUNS[-1] != 0.8:
+            position, content = receive_cell(client)
+            assert position == (0, 1)
+        assert len(RUNS) < 5
+        client.close()
+    finally:
+        gui.close()
+
+
+def test_web_backend_handshake_validation():
+    gui = get_gui()
+    gui.start()
+    host = f"{gui.host}:{gui.port}"
+    upgrade = {"Host": host, "Upgrade": "websocket", "Connection": "Upgrade",
+               "Sec-WebSocket-Key": "dGhlIHNhbXBsZSBub25jZQ==", "Sec-WebSocket-Version": "13"}
+
+    def handshake_status(headers):
+        connection = http.client.HTTPConnection(gui.host, gui.port, timeout=5)
+        connection.putrequest("GET", "/ws", skip_host=True)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders()
+        status = connection.getresponse().status
+        connection.close()
+        return status
+    try:
+        assert handshake_status({key: val for key, val in upgrade.items() if key != "Sec-WebSocket-Key"}) == 400
+        assert handshake_status({**upgrade, "Sec-WebSocket-Key": "not a key"}) == 400
+        assert handshake_status({**upgrade, "Origin": "http://evil.example.com"}) == 403
+        assert handshake_status({**upgrade, "Origin": f"http://{host}"}) == 101
+    finally:
+        gui.close()
+
+
+def test_web_backend_single_run_per_batch(tmp_path):
+    gui = get_gui(save_folder=tmp_path)
+    window = gui.window
+    # A control change & a key press (reset) received together run the pipeline once
+    window.handle_message({"type": "control", "name": "coeff", "value": 0.1})
+    window.handle_message({"type": "key", "key": "r"})
+    RUNS.clear()
+    window.start()
+    try:
+        for _ in range(100):
+            if RUNS and window.encoded_cells:
+                break
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert RUNS == [0.5]
+        # Same with a key triggering a context event (its run renders the control change)
+        gui.bind_key_to_context("x", "flash", "flash")
+        window.stop()
+        window._render_thread.join()
+        window.handle_message({"type": "control", "name": "coeff", "value": 0.2})
+        window.handle_message({"type": "key", "key": "x"})
+        RUNS.clear()
+        window.start()
+        for _ in range(100):
+            if RUNS:
+                break
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert RUNS == [0.2]
+    finally:
+        window.stop()
+    # Saving keys do not prompt on the server console
+    gui.on_press("e")
+    gui.on_press("w")
+    gui.pipeline.writer.flush()
+    assert len(list(tmp_path.glob("web_test_*.yaml"))) >= 1
+    assert len(list(tmp_path.glob("web_test_*_out.png"))) == 1
+
+
+def test_web_backend_message_too_big():
+    gui = get_gui()
+    gui.start()
+    try:
+        client = WebSocketConnection.connect(gui.host, gui.port, timeout=5)
+        # Masked binary frame header announcing a 1TB payload
+        client.wfile.write(bytes([0x82, 0xFF]) + struct.pack(">Q", 1 << 40) + b"mask")
+        client.wfile.flush()
+        while True:
+            fin, opcode, payload = read_frame(client.rfile)
+            if opcode == OPCODE_CLOSE:
+                break
+        assert struct.unpack(">H", payload)[0] == 1009
+        client.close()
+    finally:
+        gui.close()
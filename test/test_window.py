@@ -0,0 +1,126 @@
+import numpy as np
+from interactive_pipe.graphical.window import InteractivePipeWindow
+
+
+class RecordingWindow(InteractivePipeWindow):
+    """Minimal window keeping track of the refreshed cells"""
+
+    def __init__(self):
+        super().__init__(name="test")
+        self.updated = []
+        self.styled = []
+
+    def add_image_placeholder(self, row, col):
+        self.image_canvas[row][col] = {}
+
+    def delete_image_placeholder(self, img_widget):
+        pass
+
+    def update_image(self, content, row, col):
+        self.updated.append((row, col))
+
+    def update_cell_style(self, row, col):
+        self.styled.append((row, col))
+
+    @staticmethod
+    def convert_image(img):
+        return img.clip(0., 1.)
+
+
+class FakePipeline:
+    outputs = [["a", "b"]]
+
+    def __init__(self):
+        self.buffer_versions = {}
+
+    def run(self, updated_buffers):
+        for name in updated_buffers:
+            self.buffer_versions[name] = self.buffer_versions.get(name, 0) + 1
+
+
+def test_refresh_display_without_engine_report():
+    window = RecordingWindow()
+    img_a, img_b = np.zeros((4, 4)), np.ones((4, 4))
+    grid = [[img_a, img_b], [None, img_a]]
+    window.refresh_display(grid)
+    assert window.updated == [(0, 0), (0, 1), (1, 1)]
+    # Same objects may hold new content (filters writing in place): without engine report, cells are redrawn
+    img_a[:] = 1.
+    window.updated = []
+    window.refresh_display(grid)
+    assert window.updated == [(0, 0), (0, 1), (1, 1)]
+
+
+def test_refresh_display_updated_buffers():
+    window = RecordingWindow()
+    window.pipeline = FakePipeline()
+    img_a, img_b = np.zeros((4, 4)), np.ones((4, 4))
+    window.pipeline.run({"a", "b"})
+    window.refresh_display([[img_a, img_b]])
+    assert window.updated == [(0, 0), (0, 1)]
+    window.updated = []
+    # new buffers but the engine reports that only "b" has been recomputed
+    window.pipeline.run({"b"})
+    window.refresh_display([[img_a.copy(), img_b.copy()]])
+    assert window.updated == [(0, 1)]
+    # Unchanged cells still get their title & style refreshed
+    assert window.styled == [(0, 0)]
+    # Several runs between two displays: "a" changed during the first one
+    window.updated = []
+    window.pipeline.run({"a"})
+    window.pipeline.run({"b"})
+    window.refresh_display([[img_a, img_b]])
+    assert window.updated == [(0, 0), (0, 1)]
+    # Display refreshed without a run: nothing to convert again...
+    window.updated = []
+    window.refresh_display([[img_a, img_b]])
+    assert window.updated == []
+    # ...unless the display changed (size, zoom)
+    window.size = (200, 100)
+    window.refresh_display([[img_a, img_b]])
+    assert window.updated == [(0, 0), (0, 1)]
+
+
+def test_fit_to_display():
+    window = RecordingWindow()
+    window.display_size = lambda row, col: (100, 150)
+    img = np.random.rand(403, 300, 3)
+    assert window.pyramid_factor(img.shape, (100, 150)) == 4
+    small = window.fit_to_display(img, 0, 0)
+    assert small.shape == (100, 75, 3)
+    np.testing.assert_allclose(small[0, 0], img[:4, :4].mean(axis=(0, 1)), rtol=1e-5)
+    assert window.fit_to_display(np.zeros((50, 60)), 0, 0).shape == (50, 60)
+
+
+def test_fit_to_display_keeps_integer_images():
+    from interactive_pipe.graphical.encoding import to_uint8
+    window = RecordingWindow()
+    window.display_size = lambda row, col: (100, 150)
+    img = np.random.randint(0, 256, (400, 600, 3), dtype=np.uint8)
+    small = window.fit_to_display(img, 0, 0)
+    assert small.dtype == np.uint8
+    np.testing.assert_array_equal(small[0, 0], np.round(img[:4, :4].mean(axis=(0, 1))))
+    # the displayed image is not saturated
+    np.testing.assert_allclose(to_uint8(small).mean(), img.mean(), atol=1.)
+
+
+def test_refresh_display_parallel_conversion():
+    import threading
+    conversion_threads = set()
+    update_threads = set()
+
+    class ThreadedWindow(RecordingWindow):
+        def convert_cell(self, content, row, col):
+            conversion_threads.add(threading.current_thread().name)
+            return content * 2
+
+        def update_image(self, content, row, col):
+            update_threads.add(threading.current_thread().name)
+            self.updated.append((row, col, content[0, 0]))
+
+    window = ThreadedWindow()
+    grid = [[np.full((8, 8), idx + 3*idy) for idx in range(3)] for idy in range(3)]
+    window.refresh_display(grid)
+    assert window.updated == [(idy, idx, 2*(idx + 3*idy)) for idy in range(3) for idx in range(3)]
+    assert update_threads == {threading.current_thread().name}
+    assert all(name.startswith("display_conversion") for name in conversion_threads)